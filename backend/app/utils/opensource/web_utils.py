@@ -1,9 +1,10 @@
 import requests
 import base64
 import logging
+import os
 from datetime import datetime
 from pathlib import Path
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from urllib.parse import urljoin, urlparse
 from docling.document_converter import DocumentConverter
 from docling.datamodel.base_models import InputFormat
@@ -14,6 +15,11 @@ from markdownify import markdownify
 logging.basicConfig(level=logging.INFO)
 _log = logging.getLogger(__name__)
 
+# lxml (C) parses several times faster than the pure-Python html.parser
+HTML_PARSER = os.getenv("HTML_PARSER", "lxml")
+# Image lookups only need <img> tags; everything else is skipped while parsing
+IMG_ONLY = SoupStrainer("img")
+
 class WebScraper:
     def __init__(self, output_dir):
         self.output_dir = Path(output_dir)
@@ -31,7 +37,7 @@ class WebScraper:
         pattern = r'https?://[^\s<>"]+?\.(?:jpg|jpeg|png|svg|gif)(?=\s|$)'
         matches = re.findall(pattern, text, re.IGNORECASE) or []
         
-        soup = BeautifulSoup(text, "html.parser")
+        soup = BeautifulSoup(text, HTML_PARSER, parse_only=IMG_ONLY)
         for img_tag in soup.find_all("img"):
             img_url = img_tag.get("src")
             if img_url and "images/image_" not in img_url:
@@ -83,7 +89,7 @@ class WebScraper:
 
     def extract_images(self, html_content, base_url):
         """Extract and download images from HTML content."""
-        soup = BeautifulSoup(html_content, "html.parser")
+        soup = BeautifulSoup(html_content, HTML_PARSER, parse_only=IMG_ONLY)
         image_counter = 0
         
         for img_tag in soup.find_all("img"):
@@ -141,14 +147,18 @@ class WebScraper:
         return counter + 1
 
     def replace_image_urls(self, html_content):
-        """Replace image URLs with local paths."""
+        """Replace image URLs with local paths in a single pass over the HTML."""
         try:
-            list_urls = self.find_image_urls(html_content)
-            for img_url in list_urls:
+            replacements = {}
+            for img_url in self.find_image_urls(html_content):
                 image_name = self.extract_image_name(img_url)
                 if image_name:
-                    local_path = f"{self.output_dir}/images/{image_name}"
-                    html_content = html_content.replace(img_url, local_path)
+                    replacements[img_url] = f"{self.output_dir}/images/{image_name}"
+
+            if replacements:
+                # Longest first, so a URL that is a prefix of another does not take its match
+                pattern = re.compile("|".join(re.escape(url) for url in sorted(replacements, key=len, reverse=True)))
+                html_content = pattern.sub(lambda match: replacements[match.group(0)], html_content)
             
             raw_html_path = self.output_dir / "website.html"
             with open(raw_html_path, "w", encoding="utf-8") as f:
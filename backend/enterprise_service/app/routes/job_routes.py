@@ -0,0 +1,151 @@
+import logging
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import Optional, Dict, Any, Callable
+from pathlib import Path
+from app.utils.job_store import JobRunner, get_job_store, SUCCEEDED, FAILED
+from app.utils.admission import run_blocking
+from app.utils.pdf_utils import extract_pdf_content
+from app.utils.pdf_handler import process_zip
+from app.routes.pdf_routes import PDFExtractionRequest, build_extraction_response
+from app.routes.pdf_handler_routes import ZIPProcessRequest, build_zip_response
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EXTRACT_PDF_JOB = "extract-pdf/enterprise"
+PROCESS_ZIP_JOB = "process-zip/enterprise"
+
+# Initialize FastAPI router and the job workers started by the application
+router = APIRouter()
+job_runner = JobRunner(get_job_store())
+
+class JobSubmissionResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+    result_url: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    progress: float
+    attempts: int
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+@job_runner.handler(EXTRACT_PDF_JOB)
+def run_extract_pdf_job(payload: Dict[str, Any], progress: Callable[[float], None]) -> Dict[str, Any]:
+    """Extract a PDF with the enterprise method into a ZIP archive"""
+    Path(payload['output_dir']).mkdir(parents=True, exist_ok=True)
+    zip_path = extract_pdf_content(pdf_path=payload['pdf_path'], output_dir=payload['output_dir'])
+    return {'zip_path': zip_path}
+
+@job_runner.handler(PROCESS_ZIP_JOB)
+def run_process_zip_job(payload: Dict[str, Any], progress: Callable[[float], None]) -> Dict[str, Any]:
+    """Convert an extracted ZIP archive to markdown and upload it"""
+    return {'base_url': process_zip(zip_path=payload['zip_path'])}
+
+def submission_response(job_id: str) -> JobSubmissionResponse:
+    """Describe a newly queued job and where to poll it"""
+    return JobSubmissionResponse(
+        job_id=job_id,
+        status="queued",
+        status_url=f"/jobs/{job_id}",
+        result_url=f"/jobs/{job_id}/result"
+    )
+
+@router.post("/jobs/extract-pdf/enterprise", response_model=JobSubmissionResponse, status_code=202)
+async def submit_extract_pdf_job(request: PDFExtractionRequest) -> JobSubmissionResponse:
+    """
+    Queue a PDF for extraction and return immediately with a job id
+    """
+    pdf_path = Path(request.pdf_path)
+    if not pdf_path.exists():
+        raise HTTPException(
+            status_code=404,
+            detail=f"PDF file not found at path: {pdf_path}"
+        )
+
+    job_id = await run_blocking(
+        job_runner.submit, EXTRACT_PDF_JOB, {'pdf_path': str(pdf_path), 'output_dir': request.output_dir}
+    )
+    logger.info(f"Queued PDF extraction job {job_id} for {pdf_path}")
+    return submission_response(job_id)
+
+@router.post("/jobs/process-zip/enterprise", response_model=JobSubmissionResponse, status_code=202)
+async def submit_process_zip_job(request: ZIPProcessRequest) -> JobSubmissionResponse:
+    """
+    Queue a ZIP archive for processing and return immediately with a job id
+    """
+    zip_path = Path(request.zip_path)
+    if not zip_path.exists():
+        raise HTTPException(
+            status_code=404,
+            detail=f"ZIP file not found at path: {zip_path}"
+        )
+
+    if not zip_path.suffix.lower() == '.zip':
+        raise HTTPException(
+            status_code=400,
+            detail="File must be a ZIP archive"
+        )
+
+    job_id = await run_blocking(job_runner.submit, PROCESS_ZIP_JOB, {'zip_path': str(zip_path)})
+    logger.info(f"Queued ZIP processing job {job_id} for {zip_path}")
+    return submission_response(job_id)
+
+async def get_job_or_404(job_id: str) -> Dict[str, Any]:
+    """Look up a job, raising 404 if it does not exist"""
+    job = await run_blocking(job_runner.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str) -> JobStatusResponse:
+    """
+    Report a job's status and progress
+    """
+    job = await get_job_or_404(job_id)
+    return JobStatusResponse(
+        job_id=job['id'],
+        kind=job['kind'],
+        status=job['status'],
+        progress=job['progress'],
+        attempts=job['attempts'],
+        error=job['error'],
+        created_at=job['created_at'],
+        updated_at=job['updated_at']
+    )
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Return a finished job's result in the same shape as the synchronous endpoint.
+    Presigned URLs are generated at read time so they are always fresh.
+    """
+    job = await get_job_or_404(job_id)
+    if job['status'] not in (SUCCEEDED, FAILED):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job['status']}")
+
+    if job['kind'] == EXTRACT_PDF_JOB:
+        if job['status'] == FAILED:
+            raise HTTPException(status_code=500, detail=f"Error processing PDF: {job['error']}")
+        return build_extraction_response(job['result']['zip_path'])
+
+    if job['status'] == FAILED:
+        raise HTTPException(status_code=500, detail=f"Error processing ZIP file: {job['error']}")
+    try:
+        return await run_blocking(build_zip_response, job['result']['base_url'])
+    except Exception as e:
+        logger.error(f"Error processing ZIP file: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error processing ZIP file: {str(e)}"
+        )
+
+__all__ = ['router', 'job_runner']
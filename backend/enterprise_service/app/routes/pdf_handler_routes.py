@@ -2,9 +2,10 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from pathlib import Path
 import logging
-import boto3
-from botocore.config import Config
 from app.utils.pdf_handler import process_zip
+from app.utils.admission import AdmissionRejected, file_cost, get_admission_controller, run_blocking
+from app.utils.presigner import get_presigner
+from app.utils.storage import get_storage
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,22 +20,24 @@ router = APIRouter()
 class ZIPProcessRequest(BaseModel):
     zip_path: str
 
-def generate_presigned_url(bucket_name: str, object_key: str, expiration: int = 3600):
-    """Generate a presigned URL for an S3 object"""
-    s3_client = boto3.client('s3', config=Config(signature_version='s3v4'))
-    try:
-        url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={
-                'Bucket': bucket_name,
-                'Key': object_key
-            },
-            ExpiresIn=expiration
-        )
-        return url
-    except Exception as e:
-        logger.error(f"Error generating presigned URL: {str(e)}")
-        raise
+def build_zip_response(base_url: str) -> dict:
+    """Build the API response for a processed ZIP, presigning its markdown URL"""
+    # Extract bucket name and key prefix from the base_url
+    bucket_name, base_path = get_storage().parse_url(base_url)
+    
+    # Generate presigned URLs
+    markdown_key = f"{base_path}markdown/content.md"
+    markdown_url = get_presigner().presign(markdown_key, bucket_name)
+    
+    return {
+        "status": "success",
+        "message": "ZIP file processed successfully",
+        "output_locations": {
+            "markdown_file": markdown_url,
+            "base_path": base_path,
+            "bucket": bucket_name
+        }
+    }
 
 @router.post("/process-zip/enterprise")
 async def process_zip_file(request: ZIPProcessRequest):
@@ -55,29 +58,14 @@ async def process_zip_file(request: ZIPProcessRequest):
             )
         
         # Process the ZIP file and get the S3 base path
-        base_url = process_zip(zip_path=str(zip_path))
+        with get_admission_controller().admit(file_cost(zip_path)):
+            base_url = await run_blocking(process_zip, zip_path=str(zip_path))
        
         
-        # Extract bucket name and key prefix from the base_url
-        # Convert https://bucket.s3.amazonaws.com/path to bucket and path
-        bucket_name = "damg7245-datanexus-pro"
-        base_path = base_url.split(f"{bucket_name}.s3.amazonaws.com/")[1]
+        return await run_blocking(build_zip_response, base_url)
         
-        # Generate presigned URLs
-        markdown_key = f"{base_path}markdown/content.md"
-        images_key = f"{base_path}images"
-        
-        markdown_url = generate_presigned_url(bucket_name, markdown_key)
-        
-        return {
-            "status": "success",
-            "message": "ZIP file processed successfully",
-            "output_locations": {
-                "markdown_file": markdown_url,
-                "base_path": base_path,
-                "bucket": bucket_name
-            }
-        }
+    except AdmissionRejected:
+        raise
         
     except Exception as e:
         logger.error(f"Error processing ZIP file: {str(e)}")
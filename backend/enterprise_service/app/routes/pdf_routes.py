@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from pathlib import Path
 import logging
 from app.utils.pdf_utils import extract_pdf_content
+from app.utils.admission import AdmissionRejected, file_cost, get_admission_controller, run_blocking
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -14,6 +15,14 @@ class PDFExtractionRequest(BaseModel):
     pdf_path: str
     output_dir: str
 
+def build_extraction_response(zip_path: str) -> dict:
+    """Build the API response for an extracted PDF"""
+    return {
+        "status": "success",
+        "zip_path": zip_path,
+        "message": "PDF extraction completed successfully"
+    }
+
 @router.post("/extract-pdf/enterprise")
 async def extract_pdf(request: PDFExtractionRequest):
     try:
@@ -31,17 +40,18 @@ async def extract_pdf(request: PDFExtractionRequest):
         # Create output directory if it doesn't exist
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Extract PDF content
-        zip_path = extract_pdf_content(
-            pdf_path=str(pdf_path),
-            output_dir=str(output_dir)
-        )
+        # Extract PDF content off the event loop, once there is capacity for it
+        with get_admission_controller().admit(file_cost(pdf_path)):
+            zip_path = await run_blocking(
+                extract_pdf_content,
+                pdf_path=str(pdf_path),
+                output_dir=str(output_dir)
+            )
+        
+        return build_extraction_response(zip_path)
         
-        return {
-            "status": "success",
-            "zip_path": zip_path,
-            "message": "PDF extraction completed successfully"
-        }
+    except AdmissionRejected:
+        raise
         
     except Exception as e:
         logger.error(f"Error processing PDF: {str(e)}")
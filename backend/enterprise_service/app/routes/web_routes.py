@@ -3,6 +3,7 @@ from fastapi import FastAPI, HTTPException, APIRouter
 from pydantic import BaseModel
 
 from app.utils.web_utils import web_scraping_enterprise as scrape_data
+from app.utils.admission import AdmissionRejected, get_admission_controller, run_blocking
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,7 +24,8 @@ class WebScrapingResponse(BaseModel):
 async def extract_web_data(request: WebScrapingRequest):
     try:
         # Perform web scraping
-        md_path = scrape_data(request.url)
+        with get_admission_controller().admit(1.0):
+            md_path = await run_blocking(scrape_data, request.url)
 
         return WebScrapingResponse(
             status="success",
@@ -31,6 +33,9 @@ async def extract_web_data(request: WebScrapingRequest):
             message="Web scraping completed successfully"
         )
 
+    except AdmissionRejected:
+        raise
+
     except Exception as e:
         logger.error(f"Error processing web scraping: {str(e)}")
         raise HTTPException(
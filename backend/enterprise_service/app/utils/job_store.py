@@ -0,0 +1,293 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Job queue settings (per deployment)
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "jobs/jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "120"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_store_lock = threading.Lock()
+_job_store = None
+
+JobHandler = Callable[[Dict[str, Any], Callable[[float], None]], Dict[str, Any]]
+
+
+class JobStore:
+    """Persistent job queue in a local SQLite database.
+
+    Running jobs hold a lease renewed by their worker's heartbeat; a job whose lease
+    expires (for example because the service restarted) is claimed again, up to
+    JOB_MAX_ATTEMPTS times.
+    """
+
+    def __init__(self, db_path: str = JOB_STORE_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, "
+                "payload TEXT NOT NULL, result TEXT, error TEXT, progress REAL NOT NULL DEFAULT 0, "
+                "attempts INTEGER NOT NULL DEFAULT 0, owner TEXT, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+            # Jobs submitted together share a batch id
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if 'batch_id' not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN batch_id TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch_id)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived autocommit connection; callers manage transactions explicitly"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a job row into a plain dict with decoded JSON columns"""
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def create(self, kind: str, payload: Dict[str, Any]) -> str:
+        """Queue a new job and return its id"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(payload), now, now)
+            )
+        return job_id
+
+    def create_many(self, kind: str, payloads: List[Dict[str, Any]]) -> Tuple[str, List[str]]:
+        """Queue jobs as one batch in a single transaction; returns the batch id and job ids in order"""
+        batch_id = uuid.uuid4().hex
+        job_ids = [uuid.uuid4().hex for _ in payloads]
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO jobs (id, kind, status, payload, batch_id, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(job_id, kind, QUEUED, json.dumps(payload), batch_id, now, now)
+                     for job_id, payload in zip(job_ids, payloads)]
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return batch_id, job_ids
+
+    def batch(self, batch_id: str) -> List[Dict[str, Any]]:
+        """Return a batch's jobs in submission order (empty if the batch does not exist)"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM jobs WHERE batch_id = ? ORDER BY rowid", (batch_id,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job by id, or None if it does not exist"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def claim_next(self, kinds: List[str], owner: str) -> Optional[Dict[str, Any]]:
+        """Atomically claim the oldest queued job, or a running job whose lease has expired"""
+        now = time.time()
+        placeholders = ",".join("?" for _ in kinds)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Abandon jobs that keep losing their worker
+                conn.execute(
+                    f"UPDATE jobs SET status = ?, error = ?, updated_at = ? "
+                    f"WHERE status = ? AND updated_at < ? AND attempts >= ? AND kind IN ({placeholders})",
+                    (FAILED, "Job abandoned after repeated worker loss", now,
+                     RUNNING, now - JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, *kinds)
+                )
+                row = conn.execute(
+                    f"SELECT * FROM jobs WHERE kind IN ({placeholders}) AND "
+                    f"(status = ? OR (status = ? AND updated_at < ?)) ORDER BY created_at, rowid LIMIT 1",
+                    (*kinds, QUEUED, RUNNING, now - JOB_LEASE_SECONDS)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = ?, owner = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (RUNNING, owner, now, row['id'])
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        job = self._to_dict(row)
+        job['status'] = RUNNING
+        job['attempts'] += 1
+        return job
+
+    def heartbeat(self, job_ids: List[str], progress: Optional[Dict[str, float]] = None) -> None:
+        """Renew the lease of running jobs, recording progress where known"""
+        now = time.time()
+        with self._connect() as conn:
+            for job_id in job_ids:
+                if progress and job_id in progress:
+                    conn.execute(
+                        "UPDATE jobs SET updated_at = ?, progress = ? WHERE id = ? AND status = ?",
+                        (now, progress[job_id], job_id, RUNNING)
+                    )
+                else:
+                    conn.execute(
+                        "UPDATE jobs SET updated_at = ? WHERE id = ? AND status = ?", (now, job_id, RUNNING)
+                    )
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        """Mark a job succeeded with its result"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, progress = 1, updated_at = ? WHERE id = ?",
+                (SUCCEEDED, json.dumps(result), time.time(), job_id)
+            )
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Mark a job failed with an error message"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                (FAILED, error, time.time(), job_id)
+            )
+
+
+def get_job_store() -> JobStore:
+    """Return the service's job store"""
+    global _job_store
+    with _store_lock:
+        if _job_store is None:
+            _job_store = JobStore(JOB_STORE_PATH)
+        return _job_store
+
+
+class JobRunner:
+    """Pool of worker threads draining the job store for the registered job kinds"""
+
+    def __init__(self, store: JobStore, workers: int = JOB_WORKERS, poll_interval: float = 1.0):
+        self.store = store
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.handlers: Dict[str, JobHandler] = {}
+        self.active: Dict[str, float] = {}
+        self.active_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.threads: List[threading.Thread] = []
+
+    def handler(self, kind: str) -> Callable[[JobHandler], JobHandler]:
+        """Register a function that runs jobs of the given kind"""
+        def register(func: JobHandler) -> JobHandler:
+            self.handlers[kind] = func
+            return func
+        return register
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> str:
+        """Queue a job and wake an idle worker"""
+        job_id = self.store.create(kind, payload)
+        self.wakeup.set()
+        return job_id
+
+    def submit_many(self, kind: str, payloads: List[Dict[str, Any]]) -> Tuple[str, List[str]]:
+        """Queue a batch of jobs and wake the workers"""
+        batch_id, job_ids = self.store.create_many(kind, payloads)
+        self.wakeup.set()
+        return batch_id, job_ids
+
+    def start(self) -> None:
+        """Start the worker and heartbeat threads"""
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping.clear()
+        self.threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        self.threads.append(threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True))
+        for thread in self.threads:
+            thread.start()
+        logger.info(f"Started {self.workers} job workers for {sorted(self.handlers)}")
+
+    def stop(self) -> None:
+        """Stop taking new jobs; running jobs are resumed elsewhere once their lease expires"""
+        self.stopping.set()
+        self.wakeup.set()
+
+    def _work(self) -> None:
+        """Claim and run jobs until stopped"""
+        while not self.stopping.is_set():
+            try:
+                job = self.store.claim_next(list(self.handlers), self.owner)
+            except Exception as e:
+                logger.error(f"Failed to claim job: {str(e)}")
+                job = None
+            if job is None:
+                self.wakeup.wait(self.poll_interval)
+                self.wakeup.clear()
+                continue
+            self._run(job)
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        """Run one job and record its outcome"""
+        job_id = job['id']
+        with self.active_lock:
+            self.active[job_id] = 0.0
+
+        def report_progress(fraction: float) -> None:
+            with self.active_lock:
+                self.active[job_id] = max(0.0, min(1.0, fraction))
+
+        try:
+            logger.info(f"Running {job['kind']} job {job_id} (attempt {job['attempts']})")
+            result = self.handlers[job['kind']](job['payload'], report_progress)
+            self.store.complete(job_id, result)
+            logger.info(f"Job {job_id} succeeded")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            self.store.fail(job_id, str(e))
+        finally:
+            with self.active_lock:
+                self.active.pop(job_id, None)
+
+    def _heartbeat(self) -> None:
+        """Renew leases and publish progress of running jobs"""
+        while not self.stopping.wait(min(5.0, JOB_LEASE_SECONDS / 4)):
+            with self.active_lock:
+                progress = dict(self.active)
+            if progress:
+                try:
+                    self.store.heartbeat(list(progress), progress)
+                except Exception as e:
+                    logger.error(f"Job heartbeat failed: {str(e)}")
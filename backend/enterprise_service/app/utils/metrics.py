@@ -0,0 +1,263 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from single page stages up to whole large documents
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+THROUGHPUT_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value, writing whole numbers without a fraction"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """A named family of samples keyed by label values.
+
+    Recording only updates a dict under a lock; samples are formatted when /metrics
+    is scraped, so instrumentation costs next to nothing when nobody is scraping.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def drain(self) -> Dict[Tuple[str, ...], object]:
+        """Return the recorded values and start again from zero"""
+        with self.lock:
+            values, self.values = self.values, {}
+        return values
+
+    def merge(self, values: Dict[Tuple[str, ...], object]) -> None:
+        """Add values drained from the same metric in another process"""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Format the family with its HELP and TYPE headers"""
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}", *self.samples()]
+
+
+class Counter(Metric):
+    """Monotonically increasing total"""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def merge(self, values: Dict[Tuple[str, ...], object]) -> None:
+        with self.lock:
+            for key, amount in values.items():
+                self.values[key] = self.values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            values = dict(self.values)
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}" for key, value in sorted(values.items())]
+
+
+class Histogram(Metric):
+    """Distribution of observations over fixed buckets"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                # Per-bucket counts (the last one is +Inf), sum, count
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def merge(self, values: Dict[Tuple[str, ...], object]) -> None:
+        with self.lock:
+            for key, (counts, total, count) in values.items():
+                state = self.values.get(key)
+                if state is None:
+                    state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                state[0] = [mine + theirs for mine, theirs in zip(state[0], counts)]
+                state[1] += total
+                state[2] += count
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of a block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            values = {key: (list(state[0]), state[1], state[2]) for key, state in self.values.items()}
+        lines = []
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{self.name}_bucket{self._labels(key, (('le', le),))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    """The metrics exposed by one service process"""
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def drain(self) -> Dict[str, Dict[Tuple[str, ...], object]]:
+        """Take every metric's values, for a worker process to hand them to the service process"""
+        return {metric.name: metric.drain() for metric in self.metrics}
+
+    def merge(self, drained: Dict[str, Dict[Tuple[str, ...], object]]) -> None:
+        """Add the values a worker process drained from its registry"""
+        for metric in self.metrics:
+            if drained.get(metric.name):
+                metric.merge(drained[metric.name])
+
+    def render(self) -> str:
+        """Format every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "extraction_stage_seconds", "Time spent in each stage of an extraction pipeline", ("pipeline", "stage")
+))
+DOCUMENT_SECONDS = REGISTRY.register(Histogram(
+    "extraction_document_seconds", "End-to-end processing time per document by outcome", ("pipeline", "status")
+))
+DOCUMENTS_TOTAL = REGISTRY.register(Counter(
+    "extraction_documents_total", "Documents processed by outcome", ("pipeline", "status")
+))
+PAGES_TOTAL = REGISTRY.register(Counter(
+    "extraction_pages_total", "Pages processed", ("pipeline",)
+))
+PAGES_PER_SECOND = REGISTRY.register(Histogram(
+    "extraction_pages_per_second", "Per-document page throughput", ("pipeline",), THROUGHPUT_BUCKETS
+))
+BYTES_IN = REGISTRY.register(Counter(
+    "extraction_bytes_in_total", "Bytes of input documents read", ("pipeline",)
+))
+ERRORS_TOTAL = REGISTRY.register(Counter(
+    "extraction_errors_total", "Failed extraction stages", ("pipeline", "stage")
+))
+EXTERNAL_SECONDS = REGISTRY.register(Histogram(
+    "external_request_seconds", "Latency of calls to external services", ("service", "status")
+))
+S3_UPLOAD_SECONDS = REGISTRY.register(Histogram(
+    "s3_upload_seconds", "Duration of individual S3 object and multipart part uploads", ("operation", "status")
+))
+S3_UPLOAD_BYTES = REGISTRY.register(Counter(
+    "s3_upload_bytes_total", "Bytes uploaded to S3", ()
+))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "http_request_seconds", "HTTP request latency", ("method", "route", "status")
+))
+
+
+@contextmanager
+def stage_timer(pipeline: str, stage: str) -> Iterator[None]:
+    """Record a stage's latency, counting it as an error if it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        ERRORS_TOTAL.inc(pipeline=pipeline, stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, pipeline=pipeline, stage=stage)
+
+
+@contextmanager
+def accumulate(timings: Dict[str, float], stage: str) -> Iterator[None]:
+    """Add a block's duration to a stage total, for work timed away from the registry (e.g. in worker processes)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+def observe_stages(pipeline: str, timings: Dict[str, float]) -> None:
+    """Record stage totals collected with accumulate"""
+    for stage, seconds in timings.items():
+        STAGE_SECONDS.observe(seconds, pipeline=pipeline, stage=stage)
+
+
+def observe_document(
+    pipeline: str,
+    status: str,
+    seconds: float,
+    pages: Optional[int] = None,
+    bytes_in: Optional[int] = None
+) -> None:
+    """Record the outcome and throughput of one processed document.
+
+    Time and input bytes are recorded whatever the outcome, since failed documents
+    still cost both; pages and page throughput count successful documents only.
+    """
+    DOCUMENTS_TOTAL.inc(pipeline=pipeline, status=status)
+    DOCUMENT_SECONDS.observe(seconds, pipeline=pipeline, status=status)
+    if bytes_in:
+        BYTES_IN.inc(bytes_in, pipeline=pipeline)
+    if status != "success":
+        return
+    if pages:
+        PAGES_TOTAL.inc(pages, pipeline=pipeline)
+        if seconds > 0:
+            PAGES_PER_SECOND.observe(pages / seconds, pipeline=pipeline)
@@ -5,9 +5,12 @@ import zipfile
 import pandas as pd
 import traceback
 import tempfile
-import boto3
+import time
 import uuid
 from datetime import datetime
+from app.utils.s3_uploader import get_uploader
+from app.utils.storage import get_storage
+from app.utils.metrics import observe_document, stage_timer
 
 logger = logging.getLogger(__name__)
 
@@ -127,8 +130,10 @@ def convert_table_to_markdown(df):
 
 def process_zip(zip_path: str) -> str:
     """Handler function to process the extracted ZIP file and upload to S3"""
-    s3_client = boto3.client('s3')
-    bucket_name = "damg7245-datanexus-pro"
+    start = time.perf_counter()
+    batch = get_uploader().batch()
+    storage = get_storage()
+    bucket_name = storage.bucket_name
     
     # Create unique folder name
     unique_id = str(uuid.uuid4())[:8]
@@ -143,12 +148,15 @@ def process_zip(zip_path: str) -> str:
     # Create temporary directory for processing
     with tempfile.TemporaryDirectory() as temp_dir:
         temp_dir_path = Path(temp_dir)
+        bytes_in = None
         
         try:
             # Extract ZIP contents
             logger.info(f"Extracting ZIP file: {zip_path}")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(temp_dir_path)
+            bytes_in = Path(zip_path).stat().st_size
+            with stage_timer("zip", "unzip"):
+                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                    zip_ref.extractall(temp_dir_path)
 
             final_content = []
 
@@ -163,7 +171,8 @@ def process_zip(zip_path: str) -> str:
                         data = json.load(f)
                         logger.info("JSON structure keys: " + str(list(data.keys())))
                     
-                    markdown_text = convert_json_to_markdown(data)
+                    with stage_timer("zip", "json_to_markdown"):
+                        markdown_text = convert_json_to_markdown(data)
                     if markdown_text.strip():
                         final_content.append(markdown_text)
                         logger.info("Successfully converted JSON to markdown")
@@ -182,14 +191,10 @@ def process_zip(zip_path: str) -> str:
                     if img_file.suffix.lower() in ['.png', '.jpg', '.jpeg']:
                         s3_image_key = f"{images_s3_path}/{img_file.name}"
                         # Upload without ACL since bucket uses Object Ownership
-                        s3_client.upload_file(
-                            str(img_file),
-                            bucket_name,
-                            s3_image_key
-                        )
+                        batch.submit(img_file, bucket_name, s3_image_key)
                         # Generate the full S3 URL for the image
-                        s3_image_url = f"https://{bucket_name}.s3.amazonaws.com/{s3_image_key}"
-                        logger.info(f"Uploaded image: {s3_image_key}")
+                        s3_image_url = storage.public_url(s3_image_key)
+                        logger.info(f"Queued image upload: {s3_image_key}")
                         final_content.append(f"\n![{img_file.stem}]({s3_image_url})\n")
 
             # Process tables
@@ -200,9 +205,10 @@ def process_zip(zip_path: str) -> str:
                 
                 for xlsx_file in tables_dir.glob("*.xlsx"):
                     try:
-                        df = pd.read_excel(xlsx_file)
+                        with stage_timer("zip", "tables"):
+                            df = pd.read_excel(xlsx_file)
+                            table_content = convert_table_to_markdown(df)
                         final_content.append(f"\n### {xlsx_file.stem}\n")
-                        table_content = convert_table_to_markdown(df)
                         final_content.append(table_content + "\n\n")
                     except Exception as e:
                         logger.error(f"Error processing table {xlsx_file.name}: {str(e)}")
@@ -212,11 +218,19 @@ def process_zip(zip_path: str) -> str:
             markdown_content = markdown_content.replace('\r\n', '\n')
             markdown_content = markdown_content.replace('_x000D_', '')
             
-            s3_client.put_object(
-                Bucket=bucket_name,
-                Key=f"{markdown_s3_path}/content.md",
-                Body=markdown_content.encode('utf-8')
-            )
+            # Figures are read from the temp dir, so finish them before it is removed
+            with stage_timer("zip", "upload_wait"):
+                if not batch.wait():
+                    raise RuntimeError("Failed to upload one or more figures to S3")
+            
+            with stage_timer("zip", "markdown_upload"):
+                markdown_upload = get_uploader().submit(
+                    markdown_content.encode('utf-8'),
+                    bucket_name,
+                    f"{markdown_s3_path}/content.md"
+                )
+                if not markdown_upload.result():
+                    raise RuntimeError("Failed to upload markdown to S3")
             logger.info(f"Uploaded markdown to S3: {markdown_s3_path}/content.md")
 
             # Cleanup
@@ -224,8 +238,10 @@ def process_zip(zip_path: str) -> str:
             Path(zip_path).unlink()
             logger.info("Cleanup completed successfully")
 
-            return f"https://{bucket_name}.s3.amazonaws.com/{base_s3_path}/"
+            observe_document("zip", "success", time.perf_counter() - start, bytes_in=bytes_in)
+            return storage.public_url(f"{base_s3_path}/")
 
         except Exception as e:
             logger.error(f"Error processing ZIP file: {str(e)}")
+            observe_document("zip", "error", time.perf_counter() - start, bytes_in=bytes_in)
             raise
\ No newline at end of file
@@ -4,6 +4,7 @@ import logging
 from datetime import datetime
 from pathlib import Path
 import os
+import time
 
 from adobe.pdfservices.operation.auth.service_principal_credentials import ServicePrincipalCredentials
 from adobe.pdfservices.operation.exception.exceptions import ServiceApiException, ServiceUsageException, SdkException
@@ -14,6 +15,8 @@ from adobe.pdfservices.operation.pdfjobs.params.extract_pdf.extract_element_type
 from adobe.pdfservices.operation.pdfjobs.params.extract_pdf.extract_pdf_params import ExtractPDFParams
 from adobe.pdfservices.operation.pdfjobs.params.extract_pdf.extract_renditions_element_type import ExtractRenditionsElementType
 
+from app.utils.metrics import EXTERNAL_SECONDS, observe_document
+
 # from backend.app.utils.enterprise.handler_utils import process_zip  # Import the handler function
 
 logging.basicConfig(level=logging.INFO)
@@ -21,10 +24,13 @@ logger = logging.getLogger(__name__)
 
 def extract_pdf_content(pdf_path: str, output_dir: str = "output") -> str:
     """Extract content from PDF using Adobe PDF Services API"""
+    start = time.perf_counter()
+    bytes_in = None
     try:
         # Read PDF file
         with open(pdf_path, 'rb') as file:
             input_stream = file.read()
+        bytes_in = len(input_stream)
 
         # Get credentials
         credentials = ServicePrincipalCredentials(
@@ -67,6 +73,7 @@ def extract_pdf_content(pdf_path: str, output_dir: str = "output") -> str:
         # Save ZIP file
         result_asset = response.get_result().get_resource()
         stream_asset = pdf_services.get_content(result_asset)
+        EXTERNAL_SECONDS.observe(time.perf_counter() - start, service="adobe", status="success")
         
         # Ensure output directory exists
         output_path = Path(output_dir)
@@ -78,10 +85,13 @@ def extract_pdf_content(pdf_path: str, output_dir: str = "output") -> str:
         
         logger.info(f"Saved ZIP file to: {output_zip}")
         
+        observe_document("adobe_pdf", "success", time.perf_counter() - start, bytes_in=bytes_in)
         return str(output_zip)
 
     except (ServiceApiException, ServiceUsageException, SdkException) as e:
         logger.error(f"Error extracting PDF content: {str(e)}")
+        EXTERNAL_SECONDS.observe(time.perf_counter() - start, service="adobe", status="error")
+        observe_document("adobe_pdf", "error", time.perf_counter() - start, bytes_in=bytes_in)
         raise
 
 def main():
@@ -0,0 +1,227 @@
+import logging
+import os
+import io
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional, Union
+from boto3.s3.transfer import TransferConfig
+from app.utils.metrics import S3_UPLOAD_BYTES, S3_UPLOAD_SECONDS
+from app.utils.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+# Upload pool settings (per deployment)
+S3_UPLOAD_WORKERS = int(os.getenv("S3_UPLOAD_WORKERS", "16"))
+S3_UPLOAD_QUEUE_SIZE = int(os.getenv("S3_UPLOAD_QUEUE_SIZE", "256"))
+S3_MULTIPART_THRESHOLD_MB = int(os.getenv("S3_MULTIPART_THRESHOLD_MB", "8"))
+
+_uploader_lock = threading.Lock()
+_uploader = None
+
+def get_s3_client():
+    """Return the process-wide client of the configured artifact storage (see app.utils.storage)"""
+    return get_storage().client()
+
+def get_uploader() -> "S3Uploader":
+    """Return the process-wide uploader"""
+    global _uploader
+    with _uploader_lock:
+        if _uploader is None or _uploader.pid != os.getpid():
+            _uploader = S3Uploader()
+        return _uploader
+
+
+class S3Uploader:
+    """Bounded pool of upload threads sharing one connection-pooled S3 client"""
+
+    def __init__(self, max_workers: int = S3_UPLOAD_WORKERS, queue_size: int = S3_UPLOAD_QUEUE_SIZE):
+        self.pid = os.getpid()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-upload")
+        # Bounds queued plus in-flight uploads so producers block instead of buffering without limit
+        self.slots = threading.BoundedSemaphore(queue_size)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_THRESHOLD_MB * 1024 * 1024,
+            multipart_chunksize=S3_MULTIPART_THRESHOLD_MB * 1024 * 1024,
+            max_concurrency=4,
+            use_threads=True
+        )
+
+    def batch(self) -> "UploadBatch":
+        """Start a group of uploads that can be awaited together"""
+        return UploadBatch(self)
+
+    def submit(
+        self,
+        source: Union[Path, str, bytes],
+        bucket_name: str,
+        s3_key: str,
+        extra_args: Optional[Dict[str, Any]] = None
+    ) -> Future:
+        """Queue a file path or in-memory body for upload; the future resolves to True on success"""
+        return self.run(self._upload, source, bucket_name, s3_key, extra_args)
+
+    def run(self, fn: Callable[..., Any], *args) -> Future:
+        """Run fn(*args) on an upload thread, blocking while every queue slot is taken"""
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def _upload(
+        self,
+        source: Union[Path, str, bytes],
+        bucket_name: str,
+        s3_key: str,
+        extra_args: Optional[Dict[str, Any]]
+    ) -> bool:
+        """Upload one object; managed transfers switch to multipart above the threshold"""
+        start = time.perf_counter()
+        try:
+            s3_client = get_s3_client()
+            if isinstance(source, bytes):
+                size = len(source)
+                s3_client.upload_fileobj(
+                    io.BytesIO(source), bucket_name, s3_key,
+                    ExtraArgs=extra_args, Config=self.transfer_config
+                )
+            else:
+                if not Path(source).exists():
+                    logger.error(f"File not found: {source}")
+                    return False
+                size = Path(source).stat().st_size
+                s3_client.upload_file(
+                    str(source), bucket_name, s3_key,
+                    ExtraArgs=extra_args, Config=self.transfer_config
+                )
+            S3_UPLOAD_SECONDS.observe(time.perf_counter() - start, operation="object", status="success")
+            S3_UPLOAD_BYTES.inc(size)
+            logger.info(f"Successfully uploaded to s3://{bucket_name}/{s3_key}")
+            return True
+        except Exception as e:
+            S3_UPLOAD_SECONDS.observe(time.perf_counter() - start, operation="object", status="error")
+            logger.error(f"Failed to upload s3://{bucket_name}/{s3_key}: {str(e)}")
+            return False
+
+
+class UploadBatch:
+    """Uploads belonging to one job, awaited before the job's markdown is finalized"""
+
+    def __init__(self, uploader: S3Uploader):
+        self.uploader = uploader
+        self.futures: List[Future] = []
+
+    def submit(
+        self,
+        source: Union[Path, str, bytes],
+        bucket_name: str,
+        s3_key: str,
+        extra_args: Optional[Dict[str, Any]] = None
+    ) -> Future:
+        """Queue an upload as part of this batch"""
+        future = self.uploader.submit(source, bucket_name, s3_key, extra_args)
+        self.futures.append(future)
+        return future
+
+    def wait(self) -> bool:
+        """Block until every upload in the batch has finished; True if all succeeded"""
+        wait(self.futures)
+        return all(future.result() for future in self.futures)
+
+
+class MultipartStream:
+    """Write an object to S3 incrementally, sending a multipart part whenever a part fills up.
+
+    Objects that never fill a single part are sent with one ordinary upload on close.
+    """
+
+    MIN_PART_SIZE = 5 * 1024 * 1024
+
+    def __init__(
+        self,
+        uploader: S3Uploader,
+        bucket_name: str,
+        s3_key: str,
+        extra_args: Optional[Dict[str, Any]] = None
+    ):
+        self.uploader = uploader
+        self.bucket_name = bucket_name
+        self.s3_key = s3_key
+        self.extra_args = extra_args or {}
+        self.part_size = max(self.MIN_PART_SIZE, S3_MULTIPART_THRESHOLD_MB * 1024 * 1024)
+        self.buffer = bytearray()
+        self.upload_id = None
+        self.parts: List[Future] = []
+
+    def write(self, data: bytes) -> None:
+        """Buffer data and send a part once the buffer reaches the part size"""
+        self.buffer += data
+        if len(self.buffer) >= self.part_size:
+            self._send_part()
+
+    def _send_part(self) -> None:
+        """Start the multipart upload if needed and queue the buffered bytes as the next part"""
+        if self.upload_id is None:
+            response = get_s3_client().create_multipart_upload(
+                Bucket=self.bucket_name, Key=self.s3_key, **self.extra_args
+            )
+            self.upload_id = response['UploadId']
+        part_number = len(self.parts) + 1
+        body = bytes(self.buffer)
+        self.buffer.clear()
+        self.parts.append(self.uploader.run(self._upload_part, part_number, body))
+
+    def _upload_part(self, part_number: int, body: bytes) -> Dict[str, Any]:
+        """Upload a single part and return its completion entry"""
+        start = time.perf_counter()
+        try:
+            response = get_s3_client().upload_part(
+                Bucket=self.bucket_name, Key=self.s3_key, UploadId=self.upload_id,
+                PartNumber=part_number, Body=body
+            )
+        except Exception:
+            S3_UPLOAD_SECONDS.observe(time.perf_counter() - start, operation="part", status="error")
+            raise
+        S3_UPLOAD_SECONDS.observe(time.perf_counter() - start, operation="part", status="success")
+        S3_UPLOAD_BYTES.inc(len(body))
+        return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+    def close(self) -> bool:
+        """Flush remaining data and complete the object; True on success"""
+        if self.upload_id is None:
+            body = bytes(self.buffer)
+            self.buffer.clear()
+            return self.uploader.submit(body, self.bucket_name, self.s3_key, self.extra_args or None).result()
+        
+        try:
+            if self.buffer:
+                self._send_part()
+            parts = [future.result() for future in self.parts]
+            get_s3_client().complete_multipart_upload(
+                Bucket=self.bucket_name, Key=self.s3_key, UploadId=self.upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+            logger.info(f"Successfully streamed {len(parts)} parts to s3://{self.bucket_name}/{self.s3_key}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to stream s3://{self.bucket_name}/{self.s3_key}: {str(e)}")
+            self.abort()
+            return False
+
+    def abort(self) -> None:
+        """Discard buffered data and any parts already sent"""
+        self.buffer.clear()
+        if self.upload_id is None:
+            return
+        try:
+            get_s3_client().abort_multipart_upload(
+                Bucket=self.bucket_name, Key=self.s3_key, UploadId=self.upload_id
+            )
+        except Exception as e:
+            logger.error(f"Failed to abort multipart upload for s3://{self.bucket_name}/{self.s3_key}: {str(e)}")
+        self.upload_id = None
@@ -1,12 +1,15 @@
 import re
 import logging
-import boto3
 from pathlib import Path
 import requests
 import os
+import time
 import uuid
 from datetime import datetime
 from urllib.parse import urlparse, unquote
+from app.utils.s3_uploader import get_uploader
+from app.utils.storage import get_storage
+from app.utils.metrics import EXTERNAL_SECONDS, observe_document, stage_timer
 
 # Set up logging
 _log = logging.getLogger(__name__)
@@ -37,10 +40,13 @@ def extract_image_name(url):
 
 def download_and_replace_images(md_path):
     """Download images and replace URLs in Markdown content with S3 paths."""
+    start = time.perf_counter()
+    bytes_in = None
     try:
-        # Initialize S3 client
-        s3_client = boto3.client('s3')
-        bucket_name = "damg7245-datanexus-pro"
+        # Uploads for this document share the process-wide upload pool
+        batch = get_uploader().batch()
+        storage = get_storage()
+        bucket_name = storage.bucket_name
 
         # Read the markdown content
         md_path = Path(md_path)
@@ -49,6 +55,7 @@ def download_and_replace_images(md_path):
             
         with open(md_path, 'r', encoding='utf-8') as f:
             md_content = f.read()
+        bytes_in = md_path.stat().st_size
     
         # Create unique folder name
         unique_id = str(uuid.uuid4())[:8]
@@ -77,6 +84,7 @@ def download_and_replace_images(md_path):
         }
         
         session = requests.Session()  # Use a session for persistent headers
+        pending_uploads = []
         
         # Process each image
         for img_url in matches:
@@ -87,24 +95,25 @@ def download_and_replace_images(md_path):
                 
             try:
                 # Download image
-                response = session.get(img_url, headers=headers, stream=True, allow_redirects=True)
-                response.raise_for_status()
+                download_start = time.perf_counter()
+                try:
+                    response = session.get(img_url, headers=headers, stream=True, allow_redirects=True)
+                    response.raise_for_status()
+                    content = response.content
+                except Exception:
+                    EXTERNAL_SECONDS.observe(time.perf_counter() - download_start, service="image_download", status="error")
+                    raise
+                EXTERNAL_SECONDS.observe(time.perf_counter() - download_start, service="image_download", status="success")
                 
-                # Upload image to S3
+                # Queue image upload to S3
                 s3_image_key = f"{images_s3_path}/{image_name}"
-                s3_client.put_object(
-                    Bucket=bucket_name,
-                    Key=s3_image_key,
-                    Body=response.content,
-                    ContentType=response.headers.get('content-type', 'application/octet-stream')
+                future = batch.submit(
+                    content,
+                    bucket_name,
+                    s3_image_key,
+                    {'ContentType': response.headers.get('content-type', 'application/octet-stream')}
                 )
-                
-                # Generate the full S3 URL for the image
-                s3_image_url = f"https://{bucket_name}.s3.amazonaws.com/{s3_image_key}"
-                
-                # Replace URL in markdown content with S3 URL
-                md_content = md_content.replace(img_url, s3_image_url)
-                _log.info(f"Downloaded and replaced: {img_url} -> {s3_image_url}")
+                pending_uploads.append((img_url, s3_image_key, future))
                 
             except requests.exceptions.HTTPError as http_err:
                 _log.warning(f"HTTP error while downloading image {img_url}: {http_err}")
@@ -113,19 +122,31 @@ def download_and_replace_images(md_path):
             except Exception as e:
                 _log.warning(f"Unexpected error processing image {img_url}: {e}")
         
+        # Wait for image uploads, then point the markdown at the ones that succeeded
+        with stage_timer("markdown_images", "upload_wait"):
+            batch.wait()
+        for img_url, s3_image_key, future in pending_uploads:
+            if future.result():
+                # Generate the full S3 URL for the image
+                s3_image_url = storage.public_url(s3_image_key)
+                
+                # Replace URL in markdown content with S3 URL
+                md_content = md_content.replace(img_url, s3_image_url)
+                _log.info(f"Downloaded and replaced: {img_url} -> {s3_image_url}")
+        
         # Upload markdown content to S3
         markdown_key = f"{markdown_s3_path}/content.md"
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=markdown_key,
-            Body=md_content.encode('utf-8')
-        )
+        with stage_timer("markdown_images", "markdown_upload"):
+            if not get_uploader().submit(md_content.encode('utf-8'), bucket_name, markdown_key).result():
+                raise RuntimeError("Failed to upload markdown to S3")
         
         _log.info(f"Uploaded markdown to S3: {markdown_key}")
         
         # Return the base S3 URL for the processed content
-        return f"https://{bucket_name}.s3.amazonaws.com/{base_s3_path}/"
+        observe_document("markdown_images", "success", time.perf_counter() - start, bytes_in=bytes_in)
+        return storage.public_url(f"{base_s3_path}/")
         
     except Exception as e:
         _log.error(f"Error processing markdown file: {e}")
+        observe_document("markdown_images", "error", time.perf_counter() - start, bytes_in=bytes_in)
         raise
\ No newline at end of file
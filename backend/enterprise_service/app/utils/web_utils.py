@@ -2,7 +2,9 @@ import requests
 from pathlib import Path
 import logging
 import re
+import time
 from urllib.parse import urljoin
+from app.utils.metrics import EXTERNAL_SECONDS, observe_document
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,6 +28,7 @@ def web_scraping_enterprise(url):
         "timeout": 10
     }
 
+    start = time.perf_counter()
     try:
         # Request processed Markdown from Jina AI
         jina_response = requests.get(
@@ -34,6 +37,7 @@ def web_scraping_enterprise(url):
             params=params
         )
         jina_response.raise_for_status()
+        EXTERNAL_SECONDS.observe(time.perf_counter() - start, service="jina", status="success")
         
         # Extract Markdown content
         markdown_content = jina_response.text
@@ -47,8 +51,11 @@ def web_scraping_enterprise(url):
         
         _log.info(f"Markdown content fetched and saved to: {md_path}")
         
+        observe_document("jina", "success", time.perf_counter() - start)
         return md_path
 
     except requests.exceptions.RequestException as e:
+        EXTERNAL_SECONDS.observe(time.perf_counter() - start, service="jina", status="error")
+        observe_document("jina", "error", time.perf_counter() - start)
         _log.error(f"Failed to fetch {url}. Error: {str(e)}")
         raise ValueError(f"Failed to fetch {url}. Error: {str(e)}")
\ No newline at end of file
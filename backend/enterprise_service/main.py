@@ -1,10 +1,17 @@
 # app/main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
 import logging
+import time
 from app.routes.pdf_routes import router as pdf_router
 from app.routes.pdf_handler_routes import router as handler_router
 from app.routes.web_routes import router as web_routes
 from app.routes.web_handler_routes import router as web_handler_routes
+from app.routes.job_routes import router as job_router, job_runner
+from app.routes.storage_routes import router as storage_router
+from app.utils.admission import AdmissionRejected
+from app.utils.metrics import CONTENT_TYPE, HTTP_REQUEST_SECONDS, REGISTRY
+from app.utils.storage import STORAGE_BACKEND
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,6 +29,52 @@ app.include_router(pdf_router)  # Changed from pdf_routes.router
 app.include_router(handler_router)  # Changed from handler_routes.router
 app.include_router(web_routes)  # Changed from web_scraping_routes.router
 app.include_router(web_handler_routes)  # Changed from web_handler_routes.router
+app.include_router(job_router)
+
+# Artifacts on local disk are downloaded from this service instead of S3
+if STORAGE_BACKEND == "local":
+    app.include_router(storage_router)
+
+# Record request latency by route template, keeping label cardinality bounded
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status
+        )
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+# Shed load with 429 instead of queueing work without bound
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+# Run queued jobs for the lifetime of the application
+@app.on_event("startup")
+async def start_job_workers():
+    job_runner.start()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    job_runner.stop()
 
 # Root endpoint
 @app.get("/")
@@ -33,7 +86,12 @@ async def root():
             "/extract-pdf/enterprise": "Extract content from PDF file using enterprise method",
             "/process-zip/enterprise": "Process ZIP file using enterprise method",
             "/web-scraping/enterprise": "Scrape content from website using enterprise method",
-            "/web-process/": "Process Markdown file with images"
+            "/web-process/": "Process Markdown file with images",
+            "/jobs/extract-pdf/enterprise": "Queue PDF extraction and return a job id",
+            "/jobs/process-zip/enterprise": "Queue ZIP processing and return a job id",
+            "/jobs/{job_id}": "Get the status and progress of a queued job",
+            "/jobs/{job_id}/result": "Get the result of a finished job",
+            "/metrics": "Prometheus metrics"
         }
     }
 
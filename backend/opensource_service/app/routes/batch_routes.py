@@ -0,0 +1,218 @@
+import logging
+import shutil
+import uuid
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query
+from pydantic import BaseModel
+from typing import Optional, Dict, Any, List, Callable
+from pathlib import Path
+from app.utils.admission import run_blocking
+from app.utils.batch import BATCH_MAX_DOCUMENTS, BATCH_MAX_UPLOAD_MB, BATCH_WORKERS, batch_stats, get_document_pool
+from app.utils.job_store import JobRunner, get_job_store, SUCCEEDED, FAILED
+from app.utils.pdf_utils import Fidelity
+from app.routes.pdf_routes import (
+    PdfProcessingResponse, build_pdf_response, check_page_range, spool_upload, upload_limit_route
+)
+from app.routes.job_routes import BATCH_PDF_JOB, JOB_UPLOAD_DIR
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Initialize FastAPI router; one job worker per document process keeps the pool saturated
+router = APIRouter(route_class=upload_limit_route(BATCH_MAX_UPLOAD_MB))
+batch_runner = JobRunner(get_job_store(), workers=BATCH_WORKERS)
+
+class BatchKeysRequest(BaseModel):
+    keys: List[str]
+    first_page: int = 1
+    last_page: Optional[int] = None
+    fidelity: Fidelity = "full"
+
+class BatchSubmissionResponse(BaseModel):
+    batch_id: str
+    document_count: int
+    status: str
+    status_url: str
+    results_url: str
+
+class BatchDocumentStatus(BaseModel):
+    job_id: str
+    name: str
+    status: str
+    page_count: Optional[int] = None
+    error: Optional[str] = None
+
+class BatchStatusResponse(BaseModel):
+    batch_id: str
+    status: str
+    document_count: int
+    queued: int
+    running: int
+    succeeded: int
+    failed: int
+    cached: int
+    page_count: int
+    started_at: float
+    finished_at: Optional[float] = None
+    elapsed_seconds: float
+    documents_per_second: float
+    pages_per_second: float
+    documents: List[BatchDocumentStatus]
+
+class BatchDocumentResult(BaseModel):
+    job_id: str
+    name: str
+    result: PdfProcessingResponse
+
+class BatchResultsResponse(BaseModel):
+    batch_id: str
+    document_count: int
+    offset: int
+    documents: List[BatchDocumentResult]
+
+@batch_runner.handler(BATCH_PDF_JOB)
+def run_batch_document(payload: Dict[str, Any], progress: Callable[[float], None]) -> Dict[str, Any]:
+    """Convert one document of a batch in the warm document pool"""
+    source = payload['source']
+    try:
+        result = get_document_pool().convert(source, payload['options'])
+        if result['status'] != 'success':
+            raise RuntimeError(result.get('message', 'Unknown error occurred'))
+        return result
+    finally:
+        if source.get('pdf_path'):
+            shutil.rmtree(Path(source['pdf_path']).parent, ignore_errors=True)
+
+def submit_batch(sources: List[Dict[str, Any]], options: Dict[str, Any]) -> BatchSubmissionResponse:
+    """Queue one job per document and describe the batch"""
+    payloads = [{'name': source.pop('name'), 'source': source, 'options': options} for source in sources]
+    batch_id, _ = batch_runner.submit_many(BATCH_PDF_JOB, payloads)
+    logger.info(f"Queued batch {batch_id} of {len(payloads)} documents")
+    return BatchSubmissionResponse(
+        batch_id=batch_id,
+        document_count=len(payloads),
+        status="queued",
+        status_url=f"/batch/{batch_id}",
+        results_url=f"/batch/{batch_id}/results"
+    )
+
+def check_batch_size(count: int) -> None:
+    """Reject empty batches and batches over the configured limit"""
+    if count == 0:
+        raise HTTPException(status_code=400, detail="A batch needs at least one document")
+    if count > BATCH_MAX_DOCUMENTS:
+        raise HTTPException(status_code=400, detail=f"A batch can hold at most {BATCH_MAX_DOCUMENTS} documents")
+
+@router.post("/batch/pdf-process/opensource", response_model=BatchSubmissionResponse, status_code=202)
+async def submit_pdf_batch(
+    files: List[UploadFile] = File(...),
+    first_page: int = Query(1, ge=1, description="First page to convert (1-based)"),
+    last_page: Optional[int] = Query(None, ge=1, description="Last page to convert (default: end of document)"),
+    fidelity: Fidelity = Query("full", description="text, images (text and embedded images) or full (plus tables and OCR)")
+) -> BatchSubmissionResponse:
+    """
+    Queue many uploaded PDFs as one batch and return immediately with a batch id
+    """
+    check_batch_size(len(files))
+    check_page_range(first_page, last_page)
+    for file in files:
+        if not file.filename.lower().endswith('.pdf'):
+            raise HTTPException(status_code=400, detail=f"File must be a PDF: {file.filename}")
+
+    # Keep the uploads on disk so the batch survives a restart
+    upload_dirs = []
+    sources = []
+    try:
+        for file in files:
+            upload_dir = JOB_UPLOAD_DIR / uuid.uuid4().hex
+            upload_dir.mkdir(parents=True, exist_ok=True)
+            upload_dirs.append(upload_dir)
+            pdf_path = upload_dir / Path(file.filename).name
+            with open(pdf_path, 'wb') as f:
+                await spool_upload(file, f)
+            sources.append({'name': file.filename, 'pdf_path': str(pdf_path)})
+
+        options = {'fidelity': fidelity, 'first_page': first_page, 'last_page': last_page}
+        return await run_blocking(submit_batch, sources, options)
+    except Exception:
+        for upload_dir in upload_dirs:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+        raise
+
+@router.post("/batch/pdf-process/opensource/keys", response_model=BatchSubmissionResponse, status_code=202)
+async def submit_pdf_key_batch(request: BatchKeysRequest) -> BatchSubmissionResponse:
+    """
+    Queue PDFs already in the service's artifact bucket as one batch and return immediately with a batch id
+    """
+    check_batch_size(len(request.keys))
+    if request.first_page < 1:
+        raise HTTPException(status_code=400, detail="first_page must be at least 1")
+    check_page_range(request.first_page, request.last_page)
+
+    sources = [{'name': key, 'storage_key': key} for key in request.keys]
+    options = {'fidelity': request.fidelity, 'first_page': request.first_page, 'last_page': request.last_page}
+    return await run_blocking(submit_batch, sources, options)
+
+async def get_batch_or_404(batch_id: str) -> List[Dict[str, Any]]:
+    """Look up a batch's jobs, raising 404 if it does not exist"""
+    jobs = await run_blocking(batch_runner.store.batch, batch_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail=f"Batch not found: {batch_id}")
+    return jobs
+
+@router.get("/batch/{batch_id}", response_model=BatchStatusResponse)
+async def get_batch_status(batch_id: str) -> BatchStatusResponse:
+    """
+    Report a batch's progress, throughput and per-document status
+    """
+    jobs = await get_batch_or_404(batch_id)
+    documents = [
+        BatchDocumentStatus(
+            job_id=job['id'],
+            name=job['payload']['name'],
+            status=job['status'],
+            page_count=(job['result'] or {}).get('page_count'),
+            error=job['error']
+        )
+        for job in jobs
+    ]
+    return BatchStatusResponse(batch_id=batch_id, documents=documents, **batch_stats(jobs))
+
+@router.get("/batch/{batch_id}/results", response_model=BatchResultsResponse)
+async def get_batch_results(
+    batch_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000)
+) -> BatchResultsResponse:
+    """
+    Return finished documents' results in the shape of the synchronous endpoint, a page at a time.
+    Presigned URLs are generated at read time so they are always fresh.
+    """
+    jobs = await get_batch_or_404(batch_id)
+
+    def build_results() -> List[BatchDocumentResult]:
+        results = []
+        for job in jobs[offset:offset + limit]:
+            if job['status'] == SUCCEEDED:
+                result = build_pdf_response(job['result'])
+            elif job['status'] == FAILED:
+                result = PdfProcessingResponse(
+                    status="error",
+                    markdown_url="",
+                    message="PDF processing failed",
+                    error=job['error']
+                )
+            else:
+                continue
+            results.append(BatchDocumentResult(job_id=job['id'], name=job['payload']['name'], result=result))
+        return results
+
+    return BatchResultsResponse(
+        batch_id=batch_id,
+        document_count=len(jobs),
+        offset=offset,
+        documents=await run_blocking(build_results)
+    )
+
+# Export router
+__all__ = ['router', 'batch_runner']
@@ -0,0 +1,181 @@
+import logging
+import os
+import shutil
+import uuid
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query
+from pydantic import BaseModel
+from typing import Optional, Dict, Any, Callable
+from pathlib import Path
+from app.utils.job_store import JobRunner, get_job_store, SUCCEEDED, FAILED
+from app.utils.admission import run_blocking
+from app.utils.pdf_utils import Fidelity, PdfConverter
+from app.utils.web_handler import process_html_with_docling
+from app.routes.pdf_routes import (
+    PDF_MAX_UPLOAD_MB, PdfProcessingResponse, build_pdf_response, check_page_range, spool_upload, upload_limit_route
+)
+from app.routes.web_handler_routes import WebScrapingRequest, WebScrapingResponse, build_web_response
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Uploaded documents are kept here until their job has run
+JOB_UPLOAD_DIR = Path(os.getenv("JOB_UPLOAD_DIR", "jobs/uploads"))
+
+PDF_JOB = "pdf-process/opensource"
+WEB_JOB = "web-process/opensource"
+# Documents of a batch, run by the batch routes' own workers
+BATCH_PDF_JOB = "batch/pdf-process/opensource"
+
+# Initialize FastAPI router and the job workers started by the application
+router = APIRouter(route_class=upload_limit_route(PDF_MAX_UPLOAD_MB))
+job_runner = JobRunner(get_job_store())
+
+class JobSubmissionResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+    result_url: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    progress: float
+    attempts: int
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+@job_runner.handler(PDF_JOB)
+def run_pdf_job(payload: Dict[str, Any], progress: Callable[[float], None]) -> Dict[str, Any]:
+    """Convert an uploaded PDF in its job's own directory, removing both once the job has finished"""
+    pdf_path = Path(payload['pdf_path'])
+    try:
+        pdf_converter = PdfConverter(
+            fidelity=payload.get('fidelity', "full"),
+            first_page=payload.get('first_page', 1),
+            last_page=payload.get('last_page')
+        )
+        result = pdf_converter.process_pdf(pdf_path, progress=progress, output_dir=pdf_path.parent / "output")
+        if result['status'] != 'success':
+            raise RuntimeError(result.get('message', 'Unknown error occurred'))
+        return result
+    finally:
+        shutil.rmtree(pdf_path.parent, ignore_errors=True)
+
+@job_runner.handler(WEB_JOB)
+def run_web_job(payload: Dict[str, Any], progress: Callable[[float], None]) -> Dict[str, Any]:
+    """Convert a saved HTML page to markdown"""
+    return {'markdown_path': process_html_with_docling(payload['url'])}
+
+def submission_response(job_id: str) -> JobSubmissionResponse:
+    """Describe a newly queued job and where to poll it"""
+    return JobSubmissionResponse(
+        job_id=job_id,
+        status="queued",
+        status_url=f"/jobs/{job_id}",
+        result_url=f"/jobs/{job_id}/result"
+    )
+
+@router.post("/jobs/pdf-process/opensource", response_model=JobSubmissionResponse, status_code=202)
+async def submit_pdf_job(
+    file: UploadFile = File(...),
+    first_page: int = Query(1, ge=1, description="First page to convert (1-based)"),
+    last_page: Optional[int] = Query(None, ge=1, description="Last page to convert (default: end of document)"),
+    fidelity: Fidelity = Query("full", description="text, images (text and embedded images) or full (plus tables and OCR)")
+) -> JobSubmissionResponse:
+    """
+    Queue a PDF for processing and return immediately with a job id
+    """
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="File must be a PDF")
+    check_page_range(first_page, last_page)
+
+    # Keep the upload on disk so the job survives a restart
+    upload_dir = JOB_UPLOAD_DIR / uuid.uuid4().hex
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    pdf_path = upload_dir / Path(file.filename).name
+    try:
+        with open(pdf_path, 'wb') as f:
+            await spool_upload(file, f)
+    except HTTPException:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        raise
+
+    job_id = await run_blocking(
+        job_runner.submit, PDF_JOB, {
+            'pdf_path': str(pdf_path),
+            'filename': file.filename,
+            'fidelity': fidelity,
+            'first_page': first_page,
+            'last_page': last_page
+        }
+    )
+    logger.info(f"Queued PDF job {job_id} for {file.filename}")
+    return submission_response(job_id)
+
+@router.post("/jobs/web-process/opensource", response_model=JobSubmissionResponse, status_code=202)
+async def submit_web_job(request: WebScrapingRequest) -> JobSubmissionResponse:
+    """
+    Queue a web page for processing and return immediately with a job id
+    """
+    job_id = await run_blocking(job_runner.submit, WEB_JOB, {'url': request.url})
+    logger.info(f"Queued web job {job_id} for {request.url}")
+    return submission_response(job_id)
+
+async def get_job_or_404(job_id: str) -> Dict[str, Any]:
+    """Look up a job, raising 404 if it does not exist"""
+    job = await run_blocking(job_runner.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str) -> JobStatusResponse:
+    """
+    Report a job's status and progress
+    """
+    job = await get_job_or_404(job_id)
+    return JobStatusResponse(
+        job_id=job['id'],
+        kind=job['kind'],
+        status=job['status'],
+        progress=job['progress'],
+        attempts=job['attempts'],
+        error=job['error'],
+        created_at=job['created_at'],
+        updated_at=job['updated_at']
+    )
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Return a finished job's result in the same shape as the synchronous endpoint.
+    Presigned URLs are generated at read time so they are always fresh.
+    """
+    job = await get_job_or_404(job_id)
+    if job['status'] not in (SUCCEEDED, FAILED):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job['status']}")
+
+    if job['kind'] in (PDF_JOB, BATCH_PDF_JOB):
+        if job['status'] == FAILED:
+            return PdfProcessingResponse(
+                status="error",
+                markdown_url="",
+                message="PDF processing failed",
+                error=job['error']
+            )
+        return await run_blocking(build_pdf_response, job['result'])
+
+    if job['status'] == FAILED:
+        return WebScrapingResponse(
+            status="error",
+            saved_path="",
+            message="Web scraping failed",
+            error=job['error']
+        )
+    return await run_blocking(build_web_response, job['result']['markdown_path'])
+
+# Export router
+__all__ = ['router', 'job_runner']
@@ -1,20 +1,66 @@
 import logging
-import boto3
+import os
+import shutil
 import tempfile
-from botocore.config import Config
-from fastapi import FastAPI, HTTPException, APIRouter, UploadFile, File
+from fastapi import FastAPI, HTTPException, APIRouter, Request, Response, UploadFile, File, Query
+from fastapi.routing import APIRoute
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
-from app.utils.pdf_utils import PdfConverter
-from urllib.parse import urlparse
+from typing import Optional, Dict, Any, List, Callable, Coroutine, Type
+from app.utils.pdf_utils import Fidelity, PdfConverter
+from app.utils.admission import AdmissionRejected, get_admission_controller, run_blocking
+from app.utils.presigner import get_presigner
 from pathlib import Path
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Uploads are copied to disk in chunks and rejected once they pass this size
+PDF_MAX_UPLOAD_MB = int(os.getenv("PDF_MAX_UPLOAD_MB", "512"))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Room in a request body for the multipart boundaries, part headers and form fields around the files
+MULTIPART_OVERHEAD = 64 * 1024
+
+def upload_limit_route(max_mb: int) -> Type[APIRoute]:
+    """Route class that refuses request bodies over max_mb before they are spooled.
+
+    Starlette reads a whole multipart body into temporary files before the endpoint
+    runs, so a limit checked there comes too late. Requests whose Content-Length is
+    over the limit are rejected with 413 without reading the body, and bodies sent
+    without one are counted as they arrive and cut off once they pass it.
+    """
+    max_bytes = max_mb * 1024 * 1024 + MULTIPART_OVERHEAD
+
+    def too_large() -> HTTPException:
+        return HTTPException(status_code=413, detail=f"Upload exceeds the {max_mb} MB limit")
+
+    class UploadLimitRoute(APIRoute):
+        def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+            handler = super().get_route_handler()
+
+            async def limited_handler(request: Request) -> Response:
+                length = request.headers.get('content-length')
+                if length and length.isdigit() and int(length) > max_bytes:
+                    raise too_large()
+
+                received = 0
+                async def receive():
+                    nonlocal received
+                    message = await request.receive()
+                    if message['type'] == 'http.request':
+                        received += len(message.get('body', b''))
+                        if received > max_bytes:
+                            raise too_large()
+                    return message
+
+                return await handler(Request(request.scope, receive))
+
+            return limited_handler
+
+    return UploadLimitRoute
+
 # Initialize FastAPI router
-router = APIRouter()
+router = APIRouter(route_class=upload_limit_route(PDF_MAX_UPLOAD_MB))
 
 class PdfProcessingResponse(BaseModel):
     status: str
@@ -23,40 +69,97 @@ class PdfProcessingResponse(BaseModel):
     images: Optional[List[Dict[str, str]]] = None
     table_count: Optional[int] = None
     image_count: Optional[int] = None
+    skipped_table_pages: Optional[int] = None
+    ocr_page_count: Optional[int] = None
+    resumed_pages: Optional[int] = None
+    reduced_scale_pages: Optional[int] = None
+    peak_rss_mb: Optional[float] = None
+    first_page: Optional[int] = None
+    last_page: Optional[int] = None
+    fidelity: Optional[str] = None
+    cached: Optional[bool] = None
     message: str
     error: Optional[str] = None
 
-def generate_presigned_url(bucket_name: str, object_key: str, expiration: int = 3600) -> str:
-    """Generate a presigned URL for an S3 object"""
-    s3_client = boto3.client('s3', config=Config(signature_version='s3v4'))
+def check_page_range(first_page: int, last_page: Optional[int]) -> None:
+    """Reject a page range that ends before it starts"""
+    if last_page is not None and last_page < first_page:
+        raise HTTPException(status_code=400, detail=f"last_page ({last_page}) is before first_page ({first_page})")
+
+async def spool_upload(file: UploadFile, destination, max_mb: int = PDF_MAX_UPLOAD_MB) -> int:
+    """Copy an upload into an open file chunk by chunk, enforcing the size limit as it goes"""
+    max_bytes = max_mb * 1024 * 1024
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Uploaded file exceeds the {max_mb} MB limit")
+    
+    size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Uploaded file exceeds the {max_mb} MB limit")
+        await run_blocking(destination.write, chunk)
+    return size
+
+def build_pdf_response(result: Dict[str, Any]) -> PdfProcessingResponse:
+    """Build the API response for a PdfConverter result, presigning every artifact URL"""
+    if result['status'] != 'success':
+        return PdfProcessingResponse(
+            status="error",
+            markdown_url="",
+            message="PDF processing failed",
+            error=result.get('message', 'Unknown error occurred')
+        )
+    
     try:
-        url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={
-                'Bucket': bucket_name,
-                'Key': object_key
-            },
-            ExpiresIn=expiration
+        # Presign the markdown file and every image in one pass
+        images = [dict(image) for image in result.get('images') or []]
+        markdown_url, *image_urls = get_presigner().presign_urls(
+            [result['markdown_s3_url']] + [image['s3_url'] for image in images]
+        )
+        for image, image_url in zip(images, image_urls):
+            image['s3_url'] = image_url
+        
+        return PdfProcessingResponse(
+            status="success",
+            markdown_url=markdown_url,
+            s3_base_path=result['s3_base_path'],
+            images=images or None,
+            table_count=result.get('table_count'),
+            image_count=result.get('image_count'),
+            skipped_table_pages=result.get('skipped_table_pages'),
+            ocr_page_count=result.get('ocr_page_count'),
+            resumed_pages=result.get('resumed_pages'),
+            reduced_scale_pages=result.get('reduced_scale_pages'),
+            peak_rss_mb=result.get('peak_rss_mb'),
+            first_page=result.get('first_page'),
+            last_page=result.get('last_page'),
+            fidelity=result.get('fidelity'),
+            cached=result.get('cached'),
+            message="PDF processing completed successfully"
         )
-        return url
+        
     except Exception as e:
-        logger.error(f"Error generating presigned URL: {str(e)}")
-        raise
-
-def extract_s3_path_components(s3_url: str) -> tuple[str, str]:
-    """Extract bucket name and object key from S3 URL"""
-    parsed = urlparse(s3_url)
-    bucket_name = parsed.netloc.split('.')[0]
-    object_key = parsed.path.lstrip('/')
-    return bucket_name, object_key
+        logger.error(f"Error processing S3 paths: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error generating presigned URLs: {str(e)}"
+        )
 
 @router.post("/pdf-process/opensource", response_model=PdfProcessingResponse)
-async def process_pdf_content(file: UploadFile = File(...)) -> PdfProcessingResponse:
+async def process_pdf_content(
+    file: UploadFile = File(...),
+    first_page: int = Query(1, ge=1, description="First page to convert (1-based)"),
+    last_page: Optional[int] = Query(None, ge=1, description="Last page to convert (default: end of document)"),
+    fidelity: Fidelity = Query("full", description="text, images (text and embedded images) or full (plus tables and OCR)")
+) -> PdfProcessingResponse:
     """
     Endpoint to handle PDF processing requests
     
     Args:
         file: Uploaded PDF file
+        first_page: First page to convert
+        last_page: Last page to convert
+        fidelity: What to extract from each page
         
     Returns:
         PdfProcessingResponse: Processing results
@@ -66,56 +169,27 @@ async def process_pdf_content(file: UploadFile = File(...)) -> PdfProcessingResp
             status_code=400,
             detail="Uploaded file must be a PDF"
         )
+    check_page_range(first_page, last_page)
 
-    pdf_path = None
+    # The upload and the local output files live in a directory of this request's own
+    work_dir = Path(tempfile.mkdtemp(prefix="pdf-"))
     try:
-        # Save uploaded file to temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            pdf_path = Path(tmp_file.name)
+        # Stream uploaded file to a temporary location
+        pdf_path = work_dir / Path(file.filename).name
+        with open(pdf_path, 'wb') as tmp_file:
+            await spool_upload(file, tmp_file)
         
         # Initialize PDF converter
-        pdf_converter = PdfConverter()
-        
-        # Process the PDF
-        result = pdf_converter.process_pdf(pdf_path)
+        pdf_converter = PdfConverter(fidelity=fidelity, first_page=first_page, last_page=last_page)
         
-        if result['status'] != 'success':
-            return PdfProcessingResponse(
-                status="error",
-                markdown_url="",
-                message="PDF processing failed",
-                error=result.get('message', 'Unknown error occurred')
-            )
-        
-        try:
-            # Generate presigned URL for the markdown file
-            bucket_name, markdown_key = extract_s3_path_components(result['markdown_s3_url'])
-            markdown_url = generate_presigned_url(bucket_name, markdown_key)
-            
-            # Generate presigned URLs for images
-            if result.get('images'):
-                for image in result['images']:
-                    _, image_key = extract_s3_path_components(image['s3_url'])
-                    image['s3_url'] = generate_presigned_url(bucket_name, image_key)
-            
-            return PdfProcessingResponse(
-                status="success",
-                markdown_url=markdown_url,
-                s3_base_path=result['s3_base_path'],
-                images=result.get('images'),
-                table_count=result.get('table_count'),
-                image_count=result.get('image_count'),
-                message="PDF processing completed successfully"
-            )
-            
-        except Exception as e:
-            logger.error(f"Error processing S3 paths: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error generating presigned URLs: {str(e)}"
-            )
+        # Process the PDF off the event loop, once there is capacity for it
+        cost = await run_blocking(pdf_converter.estimate_cost, pdf_path)
+        with get_admission_controller().admit(cost):
+            result = await run_blocking(pdf_converter.process_pdf, pdf_path, output_dir=work_dir / "output")
+            return await run_blocking(build_pdf_response, result)
+    
+    except (HTTPException, AdmissionRejected):
+        raise
             
     except Exception as e:
         error_msg = f"Error processing PDF: {str(e)}"
@@ -128,12 +202,8 @@ async def process_pdf_content(file: UploadFile = File(...)) -> PdfProcessingResp
         )
     
     finally:
-        # Clean up temporary file
-        if pdf_path:
-            try:
-                pdf_path.unlink(missing_ok=True)
-            except Exception as e:
-                logger.error(f"Error cleaning up temporary file: {str(e)}")
+        # Clean up the upload and local output files
+        shutil.rmtree(work_dir, ignore_errors=True)
 
 # Export router
 __all__ = ['router']
\ No newline at end of file
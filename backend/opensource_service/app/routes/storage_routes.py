@@ -0,0 +1,35 @@
+import logging
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from app.utils.storage import LOCAL_STORAGE_ROUTE, LocalStorage, get_storage
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Initialize FastAPI router
+router = APIRouter()
+
+# Artifact keys are unique per processing run, so a stored object never changes
+ARTIFACT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+@router.get(LOCAL_STORAGE_ROUTE + "/{bucket_name}/{key:path}", include_in_schema=False)
+async def get_artifact(bucket_name: str, key: str) -> FileResponse:
+    """
+    Serve an artifact written by the local storage backend.
+
+    FileResponse streams the file from disk (with Range and conditional request support),
+    so artifacts never pass through application memory.
+    """
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Artifact storage is not served by this service")
+
+    path = storage.object_path(bucket_name, key)
+    if path is None or not path.is_file():
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    return FileResponse(path, headers={"Cache-Control": ARTIFACT_CACHE_CONTROL})
+
+# Export router
+__all__ = ['router']
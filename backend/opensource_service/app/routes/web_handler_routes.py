@@ -1,11 +1,10 @@
 import logging
-import boto3
-from botocore.config import Config
 from fastapi import FastAPI, HTTPException, APIRouter
 from pydantic import BaseModel
 from typing import Optional
 from app.utils.web_handler import process_html_with_docling
-from urllib.parse import urlparse
+from app.utils.admission import AdmissionRejected, file_cost, get_admission_controller, run_blocking
+from app.utils.presigner import get_presigner
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,22 +22,16 @@ class WebScrapingResponse(BaseModel):
     message: str
     error: Optional[str] = None
 
-def generate_presigned_url(bucket_name: str, object_key: str, expiration: int = 3600):
-    """Generate a presigned URL for an S3 object"""
-    s3_client = boto3.client('s3', config=Config(signature_version='s3v4'))
-    try:
-        url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={
-                'Bucket': bucket_name,
-                'Key': object_key
-            },
-            ExpiresIn=expiration
-        )
-        return url
-    except Exception as e:
-        logger.error(f"Error generating presigned URL: {str(e)}")
-        raise
+def build_web_response(markdown_path: str) -> WebScrapingResponse:
+    """Build the API response for a processed page, presigning its markdown URL"""
+    # Generate presigned URL
+    markdown_url = get_presigner().presign_url(markdown_path)
+    
+    return WebScrapingResponse(
+        status="success",
+        saved_path=markdown_url,
+        message="Web scraping completed successfully"
+    )
 
 @router.post("/web-process/opensource", response_model=WebScrapingResponse)
 async def scrape_web_content(request: WebScrapingRequest):
@@ -46,32 +39,20 @@ async def scrape_web_content(request: WebScrapingRequest):
     Endpoint to handle web scraping requests
     """
     try:
-        # Perform web scraping
-        markdown_path = process_html_with_docling(request.url)
+        # Perform web scraping off the event loop, once there is capacity for it
+        with get_admission_controller().admit(file_cost(request.url)):
+            markdown_path = await run_blocking(process_html_with_docling, request.url)
         logger.info(f"Generated markdown path: {markdown_path}")
         
         try:
-            bucket_name = "damg7245-datanexus-pro"
-            # Extract bucket name and object key
-            base_path = markdown_path.split(f"{bucket_name}.s3.amazonaws.com/")[1]
-            
-            markdown_key = f"{base_path}markdown/content.md"
-            # Clean the base path
-            markdown_url = generate_presigned_url(bucket_name, base_path)
-            
-            
-            # Generate presigned URL
-            
-            
-            return WebScrapingResponse(
-                status="success",
-                saved_path=markdown_url,
-                message="Web scraping completed successfully"
-            )
+            return await run_blocking(build_web_response, markdown_path)
         except Exception as e:
             logger.error(f"Error processing S3 path: {str(e)}")
             raise
             
+    except AdmissionRejected:
+        raise
+            
     except Exception as e:
         error_msg = f"Error processing web scraping: {str(e)}"
         logger.error(error_msg)
@@ -3,6 +3,7 @@ from fastapi import FastAPI, HTTPException, APIRouter
 from pydantic import BaseModel
 
 from app.utils import web_utils as web_scrape
+from app.utils.admission import AdmissionRejected, get_admission_controller, run_blocking
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,7 +25,8 @@ async def extract_web_data(request: WebScrapingRequest):
     try:
         # Perform web scraping
         print("request.url", request.url)
-        html_path = web_scrape.web_scrape(request.url)  # Changed this line
+        with get_admission_controller().admit(1.0):
+            html_path = await run_blocking(web_scrape.web_scrape, request.url)
         print("html_path", html_path)
         return WebScrapingResponse(
             status="success",
@@ -32,6 +34,9 @@ async def extract_web_data(request: WebScrapingRequest):
             message="Web scraping completed successfully"
         )
 
+    except AdmissionRejected:
+        raise
+
     except Exception as e:
         logger.error(f"Error processing web scraping: {str(e)}")
         raise HTTPException(
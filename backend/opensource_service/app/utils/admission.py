@@ -0,0 +1,116 @@
+import asyncio
+import functools
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Union
+
+logger = logging.getLogger(__name__)
+
+# Executor and admission settings (per service process)
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", "8"))
+ADMISSION_MAX_COST = float(os.getenv("ADMISSION_MAX_COST", "1600"))
+ADMISSION_BYTES_PER_COST_UNIT = int(os.getenv("ADMISSION_BYTES_PER_COST_UNIT", str(64 * 1024)))
+ADMISSION_MAX_RETRY_AFTER = int(os.getenv("ADMISSION_MAX_RETRY_AFTER", "300"))
+
+_executor_lock = threading.Lock()
+_blocking_executor = None
+_admission_controller = None
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request would push in-flight work over the service's cost budget"""
+
+    def __init__(self, cost: float, retry_after: int):
+        super().__init__(f"Service is at capacity; retry in {retry_after}s (request cost {cost:.0f})")
+        self.cost = cost
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Limit in-flight work by estimated cost rather than by request count.
+
+    A request is admitted while the total cost in flight stays within max_cost; a
+    request costing more than the whole budget is still admitted when nothing else
+    is running, so it can never be starved. Retry-After hints come from the observed
+    seconds per cost unit of completed requests.
+    """
+
+    def __init__(self, max_cost: float = ADMISSION_MAX_COST):
+        self.max_cost = max_cost
+        self.in_flight = 0.0
+        self.seconds_per_unit = 0.25
+        self.lock = threading.Lock()
+
+    def try_acquire(self, cost: float) -> bool:
+        """Reserve budget for a request; False if it does not fit right now"""
+        with self.lock:
+            if self.in_flight > 0 and self.in_flight + cost > self.max_cost:
+                return False
+            self.in_flight += cost
+            return True
+
+    def release(self, cost: float, elapsed: float) -> None:
+        """Return a finished request's budget and fold its duration into the estimate"""
+        with self.lock:
+            self.in_flight = max(0.0, self.in_flight - cost)
+            if cost > 0:
+                self.seconds_per_unit = 0.8 * self.seconds_per_unit + 0.2 * (elapsed / cost)
+
+    def retry_after(self, cost: float) -> int:
+        """Estimate how long until enough in-flight work drains for a request to fit"""
+        with self.lock:
+            excess = self.in_flight + cost - self.max_cost
+            seconds = math.ceil(max(excess, 1.0) * self.seconds_per_unit)
+        return max(1, min(ADMISSION_MAX_RETRY_AFTER, seconds))
+
+    @contextmanager
+    def admit(self, cost: float) -> Iterator[None]:
+        """Hold budget for the duration of a request, or raise AdmissionRejected"""
+        if not self.try_acquire(cost):
+            retry_after = self.retry_after(cost)
+            logger.warning(f"Rejected request of cost {cost:.1f}; {self.in_flight:.1f} of {self.max_cost:.0f} in flight")
+            raise AdmissionRejected(cost, retry_after)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(cost, time.monotonic() - start)
+
+
+def file_cost(path: Union[Path, str], bytes_per_unit: int = ADMISSION_BYTES_PER_COST_UNIT) -> float:
+    """Estimate the cost of processing a file from its size (at least one unit)"""
+    try:
+        size = Path(path).stat().st_size
+    except OSError:
+        return 1.0
+    return max(1.0, size / bytes_per_unit)
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide admission controller"""
+    global _admission_controller
+    with _executor_lock:
+        if _admission_controller is None:
+            _admission_controller = AdmissionController()
+        return _admission_controller
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """Return the process-wide executor for blocking work called from request handlers"""
+    global _blocking_executor
+    with _executor_lock:
+        if _blocking_executor is None:
+            _blocking_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="blocking")
+        return _blocking_executor
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking call on the blocking executor without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_blocking_executor(), functools.partial(func, *args, **kwargs))
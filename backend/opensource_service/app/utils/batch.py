@@ -0,0 +1,151 @@
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from app.utils.job_store import QUEUED, RUNNING, SUCCEEDED, FAILED
+from app.utils.memory import memory_budget, set_memory_budget
+from app.utils.metrics import REGISTRY
+from app.utils.pdf_utils import PdfConverter
+from app.utils.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+# Batch processing settings (per deployment)
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", os.cpu_count() or 1))
+BATCH_MAX_DOCUMENTS = int(os.getenv("BATCH_MAX_DOCUMENTS", "10000"))
+BATCH_MAX_UPLOAD_MB = int(os.getenv("BATCH_MAX_UPLOAD_MB", "4096"))
+
+_pool_lock = threading.Lock()
+_document_pool = None
+
+def get_document_pool() -> "DocumentPool":
+    """Return the service's warm document pool"""
+    global _document_pool
+    with _pool_lock:
+        if _document_pool is None:
+            _document_pool = DocumentPool(BATCH_WORKERS)
+        return _document_pool
+
+
+class DocumentPool:
+    """Long-lived worker processes that each convert whole documents.
+
+    Batches get their parallelism across documents rather than across the pages of
+    one document, so each worker processes its pages serially and keeps its storage
+    client, upload threads, caches and OCR engine warm from one document to the next.
+    Workers are started by a fork server rather than forked from the threaded service
+    process, so they begin with fresh state. The service's memory budget is split
+    evenly between the workers, and the metrics a worker records are sent back with
+    each result and merged into the service's registry, so batch conversions show up
+    on /metrics.
+    """
+
+    def __init__(self, workers: int = BATCH_WORKERS):
+        self.workers = max(1, workers)
+        self.lock = threading.Lock()
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                    initializer=_init_document_worker,
+                    initargs=(memory_budget() // self.workers,)
+                )
+            return self.executor
+
+    def convert(self, source: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert one document ({'pdf_path'} or {'storage_key'}) in a worker and return its result"""
+        executor = self._executor()
+        try:
+            result, metrics = executor.submit(_convert_document, source, options).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool for the documents that follow
+            with self.lock:
+                if self.executor is executor:
+                    self.executor = None
+            executor.shutdown(wait=False)
+            raise
+        REGISTRY.merge(metrics)
+        return result
+
+    def shutdown(self) -> None:
+        """Stop the workers once their current documents are done"""
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _init_document_worker(budget: int) -> None:
+    """Give a document worker its share of the memory budget"""
+    set_memory_budget(budget)
+
+def _convert_document(source: Dict[str, Any], options: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Convert one document inside a worker process, fetching it from storage first if needed.
+
+    Storage keys are read from the service's own bucket. Local files are written next
+    to the document, in a directory of its own, and the metrics recorded since the
+    last document are returned with the result.
+    """
+    download_dir = None
+    try:
+        if source.get('storage_key'):
+            download_dir = Path(tempfile.mkdtemp(prefix="batch-"))
+            pdf_path = download_dir / (Path(source['storage_key']).name or "document.pdf")
+            get_storage().download(source['storage_key'], pdf_path)
+        else:
+            pdf_path = Path(source['pdf_path'])
+        converter = PdfConverter(max_workers=1, **options)
+        result = converter.process_pdf(pdf_path, output_dir=pdf_path.parent / "output")
+    finally:
+        if download_dir:
+            shutil.rmtree(download_dir, ignore_errors=True)
+    return result, REGISTRY.drain()
+
+
+def batch_stats(jobs: List[Dict[str, Any]], now: Optional[float] = None) -> Dict[str, Any]:
+    """Aggregate progress and throughput of a batch from its jobs"""
+    now = now or time.time()
+    counts = {status: 0 for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)}
+    pages = cached = 0
+    for job in jobs:
+        counts[job['status']] = counts.get(job['status'], 0) + 1
+        if job['status'] == SUCCEEDED and job['result']:
+            pages += job['result'].get('page_count') or 0
+            cached += bool(job['result'].get('cached'))
+
+    done = counts[SUCCEEDED] + counts[FAILED]
+    started_at = min(job['created_at'] for job in jobs)
+    finished_at = max(job['updated_at'] for job in jobs) if done == len(jobs) else None
+    elapsed = max(1e-6, (finished_at or now) - started_at)
+    if finished_at:
+        status = "completed"
+    elif counts[QUEUED] == len(jobs):
+        status = "queued"
+    else:
+        status = "running"
+    return {
+        'status': status,
+        'document_count': len(jobs),
+        'queued': counts[QUEUED],
+        'running': counts[RUNNING],
+        'succeeded': counts[SUCCEEDED],
+        'failed': counts[FAILED],
+        'cached': cached,
+        'page_count': pages,
+        'started_at': started_at,
+        'finished_at': finished_at,
+        'elapsed_seconds': round(elapsed, 3),
+        'documents_per_second': round(done / elapsed, 3),
+        'pages_per_second': round(pages / elapsed, 3),
+    }
@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Page checkpoint settings (per deployment)
+PDF_CHECKPOINT_ENABLED = os.getenv("PDF_CHECKPOINT_ENABLED", "1") == "1"
+PDF_CHECKPOINT_PATH = os.getenv("PDF_CHECKPOINT_PATH", "cache/pdf_checkpoints.sqlite3")
+# A run that has not finished a page for this long is considered dead and may be resumed
+PDF_CHECKPOINT_LEASE_SECONDS = int(os.getenv("PDF_CHECKPOINT_LEASE_SECONDS", "60"))
+PDF_CHECKPOINT_MAX_AGE_HOURS = float(os.getenv("PDF_CHECKPOINT_MAX_AGE_HOURS", "24"))
+
+_store_lock = threading.Lock()
+_checkpoint_store = None
+
+
+class CheckpointStore:
+    """Per-page progress of PDF conversions in a local SQLite database.
+
+    A conversion claims its document (content hash plus options) and records every page
+    once the page's artifacts are uploaded and its markdown is final. If the conversion
+    fails or its process dies, the next conversion of the same document resumes after the
+    last recorded page, under the same storage prefix, instead of starting over.
+
+    Checkpoint failures are logged and never fail a conversion; at worst it starts over.
+    """
+
+    def __init__(self, db_path: str = PDF_CHECKPOINT_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "key TEXT PRIMARY KEY, owner TEXT, state TEXT NOT NULL, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "key TEXT NOT NULL, page_num INTEGER NOT NULL, page TEXT NOT NULL, "
+                "PRIMARY KEY (key, page_num))"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection in a transaction; connections are not shared across threads"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def claim(self, key: str, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Take ownership of a document's checkpoint, creating it with state if there is none.
+
+        Returns {'owner', 'state', 'pages'}, where state and the recorded pages come from an
+        earlier run when one left progress behind. Returns None while another live run
+        owns the document.
+        """
+        now = time.time()
+        owner = uuid.uuid4().hex
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "DELETE FROM pages WHERE key IN (SELECT key FROM documents WHERE created_at < ?)",
+                    (now - PDF_CHECKPOINT_MAX_AGE_HOURS * 3600,)
+                )
+                conn.execute("DELETE FROM documents WHERE created_at < ?", (now - PDF_CHECKPOINT_MAX_AGE_HOURS * 3600,))
+
+                row = conn.execute("SELECT owner, state, updated_at FROM documents WHERE key = ?", (key,)).fetchone()
+                if row and row[0] and row[2] >= now - PDF_CHECKPOINT_LEASE_SECONDS:
+                    return None
+                if row:
+                    conn.execute("UPDATE documents SET owner = ?, updated_at = ? WHERE key = ?", (owner, now, key))
+                    pages = [
+                        json.loads(page) for (page,) in conn.execute(
+                            "SELECT page FROM pages WHERE key = ? ORDER BY page_num", (key,)
+                        )
+                    ]
+                    # Only a gapless run of pages from the first recorded one can be replayed
+                    pages = [page for index, page in enumerate(pages) if page['page_num'] == pages[0]['page_num'] + index]
+                    return {'owner': owner, 'state': json.loads(row[1]), 'pages': pages}
+
+                conn.execute(
+                    "INSERT INTO documents (key, owner, state, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, owner, json.dumps(state), now, now)
+                )
+                return {'owner': owner, 'state': state, 'pages': []}
+        except Exception as e:
+            logger.error(f"Checkpoint claim failed: {str(e)}")
+            return None
+
+    def record_page(self, key: str, owner: str, page: Dict[str, Any]) -> None:
+        """Record a finished page and renew the owner's lease"""
+        try:
+            with self._connect() as conn:
+                updated = conn.execute(
+                    "UPDATE documents SET updated_at = ? WHERE key = ? AND owner = ?", (time.time(), key, owner)
+                ).rowcount
+                if updated:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO pages (key, page_num, page) VALUES (?, ?, ?)",
+                        (key, page['page_num'], json.dumps(page))
+                    )
+        except Exception as e:
+            logger.error(f"Checkpoint of page {page['page_num']} failed: {str(e)}")
+
+    def release(self, key: str, owner: str) -> None:
+        """Give up ownership after a failed run, keeping its pages for the next attempt"""
+        try:
+            with self._connect() as conn:
+                conn.execute("UPDATE documents SET owner = NULL WHERE key = ? AND owner = ?", (key, owner))
+        except Exception as e:
+            logger.error(f"Checkpoint release failed: {str(e)}")
+
+    def complete(self, key: str, owner: str) -> None:
+        """Drop a document's checkpoint once its conversion has succeeded"""
+        try:
+            with self._connect() as conn:
+                if conn.execute("DELETE FROM documents WHERE key = ? AND owner = ?", (key, owner)).rowcount:
+                    conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+        except Exception as e:
+            logger.error(f"Checkpoint cleanup failed: {str(e)}")
+
+
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    """Return the deployment's checkpoint store, or None when checkpointing is disabled"""
+    global _checkpoint_store
+    with _store_lock:
+        if _checkpoint_store is None and PDF_CHECKPOINT_ENABLED:
+            _checkpoint_store = CheckpointStore(PDF_CHECKPOINT_PATH)
+        return _checkpoint_store
@@ -0,0 +1,251 @@
+import re
+from typing import List, Optional, TextIO, Tuple
+from bs4.element import NavigableString, PreformattedString, Tag
+
+# Elements whose content never reaches the markdown
+SKIPPED_TAGS = {
+    'head', 'title', 'script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe', 'object', 'embed'
+}
+HEADING_LEVELS = {f'h{level}': level for level in range(1, 7)}
+# Elements that end the paragraph before them and start a new one
+BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'main', 'header', 'footer', 'nav', 'aside', 'address', 'center',
+    'figure', 'figcaption', 'details', 'summary', 'dialog', 'fieldset', 'form', 'dl', 'dt', 'dd', 'body', 'html'
+}
+WHITESPACE = re.compile(r'\s+')
+
+
+def write_markdown(root: Tag, out: TextIO) -> None:
+    """Convert a parsed HTML tree to Markdown, writing each block to out as it is completed"""
+    HtmlMarkdownWriter(out).convert(root)
+
+
+class HtmlMarkdownWriter:
+    """Single-pass HTML to Markdown conversion in document order.
+
+    The tree is walked once, iteratively, with an explicit stack of enter and leave
+    events, so deeply nested pages cannot hit the recursion limit. Inline content
+    (text, links, images) collects in a buffer for the current block. The buffer is
+    formatted and written out when the block ends: a heading, paragraph, list item,
+    quote or code block. Only the open block, and an open table, are ever held in
+    memory.
+    """
+
+    def __init__(self, out: TextIO):
+        self.out = out
+        self.inline: List[str] = []
+        # Innermost-last formatting contexts: ('heading', level), ('item', state) or ('quote', None)
+        self.contexts: List[Tuple[str, object]] = []
+        # Open lists as [ordered, items so far]
+        self.lists: List[list] = []
+        # Open links as (buffer position, href)
+        self.links: List[Tuple[int, str]] = []
+        self.table: Optional[List[List[str]]] = None
+        self.table_depth = 0
+        self.pre_depth = 0
+        self.pre_start = 0
+
+    def convert(self, root: Tag) -> None:
+        stack = [(root, False)]
+        while stack:
+            node, leaving = stack.pop()
+            if leaving:
+                self.leave(node)
+            elif isinstance(node, Tag):
+                if node.name in SKIPPED_TAGS:
+                    continue
+                self.enter(node)
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node.contents))
+            elif isinstance(node, NavigableString) and not isinstance(node, PreformattedString):
+                # Comments, doctypes and CDATA are PreformattedStrings and are dropped
+                self.text(str(node))
+        self.flush()
+
+    def text(self, text: str) -> None:
+        if self.pre_depth:
+            self.inline.append(text)
+        else:
+            text = WHITESPACE.sub(' ', text)
+            if text:
+                self.inline.append(text)
+
+    def enter(self, tag: Tag) -> None:
+        name = tag.name
+        if self.pre_depth:
+            if name == 'br':
+                self.inline.append('\n')
+            return
+
+        if self.table_depth:
+            if name == 'table':
+                self.table_depth += 1
+            elif self.table_depth > 1 or name not in ('tr', 'td', 'th'):
+                # Nested tables and block markup inside cells flatten into the cell's text
+                self.inline_tag(tag)
+            elif name == 'tr':
+                self.table.append([])
+                self.inline = []
+            else:
+                self.inline = []
+                self.links = []
+            return
+
+        if name in ('img', 'a', 'br'):
+            self.inline_tag(tag)
+        elif name in HEADING_LEVELS:
+            self.flush()
+            self.contexts.append(('heading', HEADING_LEVELS[name]))
+        elif name in BLOCK_TAGS:
+            self.flush()
+        elif name in ('ul', 'ol', 'menu'):
+            self.flush()
+            start = 1
+            if name == 'ol':
+                try:
+                    start = int(tag.get('start', 1))
+                except (TypeError, ValueError):
+                    pass
+            self.lists.append([name == 'ol', start - 1])
+        elif name == 'li':
+            self.flush()
+            if self.lists:
+                self.lists[-1][1] += 1
+            ordered, count = self.lists[-1] if self.lists else (False, 0)
+            self.contexts.append(('item', {
+                'marker': f"{count}. " if ordered else "* ",
+                'indent': "  " * max(0, len(self.lists) - 1),
+                'started': False
+            }))
+        elif name == 'blockquote':
+            self.flush()
+            self.contexts.append(('quote', None))
+        elif name == 'pre':
+            self.flush()
+            self.pre_depth = 1
+            self.pre_start = len(self.inline)
+        elif name == 'table':
+            self.flush()
+            self.table = []
+            self.table_depth = 1
+        elif name == 'hr':
+            self.flush()
+            self.out.write("---\n\n")
+
+    def inline_tag(self, tag: Tag) -> None:
+        """Inline handling of an opening tag, also used for markup flattened into a table cell"""
+        name = tag.name
+        if name == 'img':
+            src = tag.get('src', '')
+            alt = tag.get('alt', '') or 'Image'  # Default alt text if none provided
+            if src:
+                self.inline.append(f"![{alt}]({src})")
+        elif name == 'a':
+            self.links.append((len(self.inline), tag.get('href', '')))
+        elif name == 'br':
+            self.inline.append('\n')
+        elif name in BLOCK_TAGS or name in HEADING_LEVELS or name in ('li', 'tr', 'td', 'th', 'table'):
+            self.inline.append(' ')
+
+    def leave(self, tag: Tag) -> None:
+        name = tag.name
+        if name == 'pre' and self.pre_depth:
+            self.write_code()
+            return
+        if self.pre_depth:
+            return
+
+        if name == 'a':
+            self.close_link()
+            return
+        if self.table_depth:
+            if name == 'table':
+                self.table_depth -= 1
+                if not self.table_depth:
+                    self.write_table()
+            elif self.table_depth == 1 and name in ('td', 'th'):
+                self.close_cell()
+            elif name in BLOCK_TAGS or name in HEADING_LEVELS or name == 'li':
+                self.inline.append(' ')
+            return
+
+        if name in HEADING_LEVELS or name == 'li' or name == 'blockquote':
+            self.flush()
+            if self.contexts:
+                self.contexts.pop()
+        elif name in BLOCK_TAGS:
+            self.flush()
+        elif name in ('ul', 'ol', 'menu'):
+            self.flush()
+            if self.lists:
+                self.lists.pop()
+            if not self.lists:
+                self.out.write("\n")
+
+    def close_link(self) -> None:
+        """Wrap the text collected since the link opened as a Markdown link"""
+        if not self.links:
+            return
+        position, href = self.links.pop()
+        position = min(position, len(self.inline))
+        text = ' '.join(''.join(self.inline[position:]).split())
+        if href and text and not href.startswith('javascript:'):
+            self.inline[position:] = [f"[{text}]({href})"]
+
+    def close_cell(self) -> None:
+        if not self.table:
+            # A cell outside any row starts one
+            self.table.append([])
+        cell = ' '.join(''.join(self.inline).split()).replace('|', '\\|')
+        self.table[-1].append(cell)
+        self.inline = []
+        self.links = []
+
+    def write_table(self) -> None:
+        rows = [row for row in self.table if row]
+        self.table = None
+        self.inline = []
+        if not rows:
+            return
+        width = max(len(row) for row in rows)
+        lines = []
+        for index, row in enumerate(rows):
+            lines.append("| " + " | ".join(row + [''] * (width - len(row))) + " |\n")
+            if index == 0:
+                lines.append("|" + " --- |" * width + "\n")
+        self.out.write(''.join(lines) + "\n")
+
+    def write_code(self) -> None:
+        code = ''.join(self.inline[self.pre_start:]).strip('\n')
+        del self.inline[self.pre_start:]
+        self.pre_depth = 0
+        self.flush()
+        if code.strip():
+            self.out.write(f"```\n{code}\n```\n\n")
+
+    def flush(self) -> None:
+        """Format the buffered inline content as a block of the innermost context and write it"""
+        if not self.inline:
+            return
+        text = ''.join(self.inline)
+        self.inline = []
+        # Links still open continue in the next block
+        self.links = [(0, href) for _, href in self.links]
+        lines = [' '.join(line.split()) for line in text.split('\n')]
+        lines = [line for line in lines if line]
+        if not lines:
+            return
+
+        kind, state = self.contexts[-1] if self.contexts else ('paragraph', None)
+        if kind == 'heading':
+            self.out.write(f"{'#' * state} {' '.join(lines)}\n\n")
+        elif kind == 'item':
+            # Text after a nested block of the same item continues it, indented under the marker
+            indent = state['indent']
+            marker = indent + ("  " if state['started'] else state['marker'])
+            state['started'] = True
+            self.out.write(marker + ("\n" + indent + "  ").join(lines) + "\n")
+        elif kind == 'quote':
+            self.out.write("> " + "\n> ".join(lines) + "\n\n")
+        else:
+            self.out.write("\n".join(lines) + "\n\n")
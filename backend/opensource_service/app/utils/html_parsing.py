@@ -0,0 +1,19 @@
+import os
+from typing import Iterable, Optional
+from bs4 import BeautifulSoup, SoupStrainer
+
+# HTML parsing settings (per deployment)
+# lxml (C, fastest), html.parser (pure Python) or html5lib (browser-exact, slowest)
+HTML_PARSER = os.getenv("HTML_PARSER", "lxml")
+
+
+def parse_html(markup, only: Optional[Iterable[str]] = None, parser: Optional[str] = None) -> BeautifulSoup:
+    """Parse HTML with the configured parser.
+
+    With only, the tree holds just the named tags (and their contents): callers that
+    look for a few tag types skip building everything else. html5lib cannot parse
+    selectively and always builds the full tree.
+    """
+    parser = parser or HTML_PARSER
+    strainer = SoupStrainer(list(only)) if only and parser != "html5lib" else None
+    return BeautifulSoup(markup, parser, parse_only=strainer)
@@ -0,0 +1,204 @@
+import hashlib
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# HTTP cache settings (per deployment)
+WEB_HTTP_CACHE_DIR = os.getenv("WEB_HTTP_CACHE_DIR", "cache/http")
+WEB_HTTP_CACHE_MAX_MB = int(os.getenv("WEB_HTTP_CACHE_MAX_MB", "1024"))
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+MAX_AGE = re.compile(r'max-age\s*=\s*"?(\d+)')
+
+_cache_lock = threading.Lock()
+_http_cache = None
+_http_cache_pid = None
+
+def get_http_cache() -> Optional["HttpCache"]:
+    """Return the deployment's HTTP cache, or None when it is disabled"""
+    global _http_cache, _http_cache_pid
+    with _cache_lock:
+        if _http_cache_pid != os.getpid():
+            _http_cache = HttpCache(WEB_HTTP_CACHE_DIR) if WEB_HTTP_CACHE_DIR != "none" else None
+            _http_cache_pid = os.getpid()
+        return _http_cache
+
+
+def canonical_url(url: str) -> str:
+    """The cache key of a URL: lowercase scheme and host, no default port, no fragment"""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        host = f"{parts.username}{':' + parts.password if parts.password else ''}@{host}"
+    return urlunsplit((scheme, host, parts.path or '/', parts.query, ''))
+
+
+def freshness(headers: Mapping[str, str], now: float) -> Optional[float]:
+    """Time until which a response may be reused without revalidation, or None if it must not be stored"""
+    cache_control = headers.get('cache-control', '').lower()
+    if 'no-store' in cache_control:
+        return None
+    match = MAX_AGE.search(cache_control)
+    if match and 'no-cache' not in cache_control:
+        return now + int(match.group(1))
+    return now
+
+
+class HttpCache:
+    """On-disk cache of downloaded images, shared by every process of a deployment.
+
+    Bodies are files named by the hash of the canonical URL; an SQLite index holds
+    each entry's validators (ETag, Last-Modified), freshness, size, content digest and
+    the storage URL the image was last uploaded to. Fresh entries are reused without a
+    request, stale ones are revalidated with a conditional GET, and an entry whose
+    content is unchanged keeps its storage URL so the image is not uploaded again.
+    Least recently used entries are evicted above max_bytes. Cache failures are logged
+    and treated as misses so they never fail a download.
+    """
+
+    def __init__(self, cache_dir: str = WEB_HTTP_CACHE_DIR, max_bytes: int = WEB_HTTP_CACHE_MAX_MB * 2**20):
+        self.cache_dir = Path(cache_dir)
+        self.bodies_dir = self.cache_dir / "bodies"
+        self.bodies_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / "index.sqlite3"
+        self.max_bytes = max_bytes
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, url TEXT NOT NULL, etag TEXT, last_modified TEXT, "
+                "content_type TEXT, size INTEGER NOT NULL, digest TEXT NOT NULL, storage_url TEXT, "
+                "fresh_until REAL NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection in a transaction; connections are not shared across threads"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def body_path(self, key: str) -> Path:
+        return self.bodies_dir / hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the entry for a URL with a 'fresh' flag, or None if there is none (or its body is gone)"""
+        key = canonical_url(url)
+        try:
+            now = time.time()
+            with self._connect() as conn:
+                row = conn.execute("SELECT * FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            entry = dict(row)
+            entry['path'] = self.body_path(key)
+            if not entry['path'].is_file():
+                return None
+            entry['fresh'] = entry['fresh_until'] > now
+            return entry
+        except Exception as e:
+            logger.error(f"HTTP cache lookup failed for {url}: {str(e)}")
+            return None
+
+    def conditional_headers(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        """Request headers that revalidate an entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def revalidated(self, url: str, headers: Mapping[str, str]) -> None:
+        """Record a 304 response: the entry is current again, with any updated validators"""
+        now = time.time()
+        fresh_until = freshness(headers, now) or now
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "UPDATE entries SET etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified), "
+                    "fresh_until = ?, accessed_at = ? WHERE key = ?",
+                    (headers.get('etag'), headers.get('last-modified'), fresh_until, now, canonical_url(url))
+                )
+        except Exception as e:
+            logger.error(f"HTTP cache update failed for {url}: {str(e)}")
+
+    def store(self, url: str, headers: Mapping[str, str], file_path: Path, digest: str) -> Optional[str]:
+        """Cache a downloaded body; an unchanged body (same digest) keeps its storage URL, which is returned"""
+        now = time.time()
+        fresh_until = freshness(headers, now)
+        etag, last_modified = headers.get('etag'), headers.get('last-modified')
+        if fresh_until is None or not (etag or last_modified or fresh_until > now):
+            # Not storable, or could never be reused or revalidated
+            return None
+
+        key = canonical_url(url)
+        body_path = self.body_path(key)
+        try:
+            temp_path = body_path.with_name(f"{body_path.name}.{uuid.uuid4().hex}.tmp")
+            shutil.copyfile(file_path, temp_path)
+            os.replace(temp_path, body_path)
+            size = body_path.stat().st_size
+            with self._connect() as conn:
+                row = conn.execute("SELECT digest, storage_url FROM entries WHERE key = ?", (key,)).fetchone()
+                storage_url = row['storage_url'] if row and row['digest'] == digest else None
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, url, etag, last_modified, content_type, size, digest, "
+                    "storage_url, fresh_until, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, url, etag, last_modified, headers.get('content-type'), size, digest,
+                     storage_url, fresh_until, now, now)
+                )
+            self.evict()
+            return storage_url
+        except Exception as e:
+            logger.error(f"HTTP cache store failed for {url}: {str(e)}")
+            return None
+
+    def remember_upload(self, url: str, digest: str, storage_url: str) -> None:
+        """Record where an image was uploaded, if the cached body is still the one uploaded"""
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "UPDATE entries SET storage_url = ? WHERE key = ? AND digest = ?",
+                    (storage_url, canonical_url(url), digest)
+                )
+        except Exception as e:
+            logger.error(f"HTTP cache update failed for {url}: {str(e)}")
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the cached bodies fit in max_bytes"""
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            victims = []
+            for row in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+                if total <= self.max_bytes:
+                    break
+                victims.append(row['key'])
+                total -= row['size']
+            conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in victims])
+        for key in victims:
+            self.body_path(key).unlink(missing_ok=True)
+        logger.info(f"Evicted {len(victims)} HTTP cache entries")
+        return len(victims)
@@ -0,0 +1,260 @@
+import asyncio
+import hashlib
+import logging
+import os
+import queue
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+from urllib.parse import urlparse
+import httpx
+from app.utils.http_cache import HttpCache, get_http_cache
+from app.utils.metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+# httpx logs every request at INFO; one line per image drowns out the pipeline logs
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Web image fetch settings (per deployment)
+WEB_IMAGE_CONCURRENCY = int(os.getenv("WEB_IMAGE_CONCURRENCY", "32"))
+WEB_IMAGE_PER_HOST = int(os.getenv("WEB_IMAGE_PER_HOST", "6"))
+WEB_IMAGE_TIMEOUT_SECONDS = float(os.getenv("WEB_IMAGE_TIMEOUT_SECONDS", "10"))
+WEB_IMAGE_DEADLINE_SECONDS = float(os.getenv("WEB_IMAGE_DEADLINE_SECONDS", "60"))
+WEB_IMAGE_MAX_MB = int(os.getenv("WEB_IMAGE_MAX_MB", "25"))
+WEB_IMAGE_RETRIES = int(os.getenv("WEB_IMAGE_RETRIES", "3"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'image/avif,image/webp,image/*,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+_fetcher_lock = threading.Lock()
+_fetcher = None
+_fetcher_pid = None
+
+def get_image_fetcher() -> "ImageFetcher":
+    """Return the process-wide image fetcher, starting its event loop on first use"""
+    global _fetcher, _fetcher_pid
+    with _fetcher_lock:
+        if _fetcher_pid != os.getpid():
+            _fetcher = ImageFetcher(cache=get_http_cache())
+            _fetcher_pid = os.getpid()
+        return _fetcher
+
+
+class ImageFetcher:
+    """Downloads web images concurrently over one shared HTTP connection pool.
+
+    An asyncio event loop in a background thread owns a single HTTP client, so
+    connections are reused across images and across pages. At most `concurrency`
+    downloads run at once in the whole process and at most `per_host` against any one
+    host. Transient failures (connection errors, 429 and 5xx) are retried with
+    exponential backoff, and each call has an overall deadline after which downloads
+    still running are abandoned. With an HttpCache, fresh cached images are served
+    without a request and stale ones are revalidated with a conditional GET.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = WEB_IMAGE_CONCURRENCY,
+        per_host: int = WEB_IMAGE_PER_HOST,
+        timeout: float = WEB_IMAGE_TIMEOUT_SECONDS,
+        deadline: float = WEB_IMAGE_DEADLINE_SECONDS,
+        max_bytes: int = WEB_IMAGE_MAX_MB * 1024 * 1024,
+        retries: int = WEB_IMAGE_RETRIES,
+        cache: Optional[HttpCache] = None
+    ):
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_bytes = max_bytes
+        self.retries = retries
+        self.cache = cache
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="image-fetcher", daemon=True)
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self._open(), self.loop).result()
+
+    async def _open(self) -> None:
+        """Create the client and limits on the fetcher's loop, which they are bound to"""
+        self.client = httpx.AsyncClient(
+            headers=BROWSER_HEADERS,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        )
+        self.slots = asyncio.Semaphore(self.concurrency)
+        self.host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def fetch(self, urls: Iterable[str], output_dir: Path) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Download images into output_dir, yielding (url, image) in completion order.
+
+        image is a dict with the local 'path', the content 'digest', the 'storage_url' the
+        same content was already uploaded to (if the cache knows one) and how the 'cache'
+        served it (fresh, revalidated or miss). It is None for an image that could not be
+        downloaded, and also for those still pending at the deadline. Each distinct URL
+        is yielded once, so callers can act on (e.g. upload) early images while later
+        ones are still downloading.
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return
+        done: "queue.Queue[Tuple[str, Optional[Dict[str, Any]]]]" = queue.Queue()
+        task = asyncio.run_coroutine_threadsafe(self._fetch_all(urls, output_dir, done), self.loop)
+        try:
+            for _ in urls:
+                yield done.get()
+        finally:
+            task.cancel()
+
+    async def _fetch_all(self, urls: list, output_dir: Path, done: queue.Queue) -> None:
+        names: Set[str] = set()
+        reported: Set[str] = set()
+
+        async def fetch_one(url: str) -> None:
+            image = None
+            try:
+                image = await self._fetch(url, output_dir, names)
+            finally:
+                reported.add(url)
+                done.put((url, image))
+
+        tasks = [asyncio.ensure_future(fetch_one(url)) for url in urls]
+        _, pending = await asyncio.wait(tasks, timeout=self.deadline)
+        if pending:
+            logger.warning(f"Image fetch deadline of {self.deadline:.0f}s passed; abandoning {len(pending)} downloads")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        # Report anything that never got to run, so the consumer never waits on it
+        for url in urls:
+            if url not in reported:
+                done.put((url, None))
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        if host not in self.host_slots:
+            self.host_slots[host] = asyncio.Semaphore(self.per_host)
+        return self.host_slots[host]
+
+    async def _fetch(self, url: str, output_dir: Path, names: Set[str]) -> Optional[Dict[str, Any]]:
+        """Fetch one image from the cache or with retries; None if it fails or is not an image"""
+        entry = await asyncio.to_thread(self.cache.lookup, url) if self.cache else None
+        if entry and entry['fresh']:
+            try:
+                return await self._from_cache(entry, url, output_dir, names, "fresh")
+            except OSError:
+                # Evicted since the lookup; download it instead
+                entry = None
+
+        for attempt in range(self.retries + 1):
+            try:
+                # Slots are held per attempt, so a backoff never keeps other downloads waiting
+                async with self._host_slot(url), self.slots:
+                    with stage_timer("web", "image_download"):
+                        return await self._download(url, output_dir, names, entry)
+            except (httpx.TransportError, RetryableStatus) as e:
+                if attempt == self.retries:
+                    logger.error(f"Failed to download image from {url}: {str(e)}")
+                    return None
+            except Exception as e:
+                logger.error(f"Failed to download image from {url}: {str(e)}")
+                return None
+            await asyncio.sleep(2 ** attempt)
+
+    async def _from_cache(
+        self, entry: Dict[str, Any], url: str, output_dir: Path, names: Set[str], served: str
+    ) -> Dict[str, Any]:
+        """Copy a cached body into output_dir"""
+        image_path = output_dir / unique_image_name(url, names)
+        await asyncio.to_thread(shutil.copyfile, entry['path'], image_path)
+        return {'path': image_path, 'digest': entry['digest'], 'storage_url': entry['storage_url'], 'cache': served}
+
+    async def _download(
+        self, url: str, output_dir: Path, names: Set[str], entry: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        headers = self.cache.conditional_headers(entry) if entry else {}
+        async with self.client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and entry:
+                await asyncio.to_thread(self.cache.revalidated, url, response.headers)
+                return await self._from_cache(entry, url, output_dir, names, "revalidated")
+            if response.status_code in RETRY_STATUSES:
+                raise RetryableStatus(response.status_code)
+            response.raise_for_status()
+
+            # Verify content type is an image
+            content_type = response.headers.get('content-type', '')
+            if not content_type.startswith('image/'):
+                logger.warning(f"URL {url} does not point to an image (content-type: {content_type})")
+                return None
+
+            image_path = output_dir / unique_image_name(url, names)
+            size = 0
+            digest = hashlib.sha256()
+            try:
+                with open(image_path, 'wb') as f:
+                    async for chunk in response.aiter_bytes(64 * 1024):
+                        size += len(chunk)
+                        if size > self.max_bytes:
+                            raise ValueError(f"image exceeds {self.max_bytes // 2**20} MB")
+                        f.write(chunk)
+                        digest.update(chunk)
+            except BaseException:
+                image_path.unlink(missing_ok=True)
+                raise
+
+        if size == 0:
+            logger.error(f"Downloaded image {image_path} is empty")
+            image_path.unlink(missing_ok=True)
+            return None
+
+        image = {'path': image_path, 'digest': digest.hexdigest(), 'storage_url': None, 'cache': "miss"}
+        if self.cache:
+            image['storage_url'] = await asyncio.to_thread(
+                self.cache.store, url, response.headers, image_path, image['digest']
+            )
+        return image
+
+
+class RetryableStatus(Exception):
+    """An HTTP status worth retrying, such as 429 or 503"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def unique_image_name(url: str, names: Set[str]) -> str:
+    """File name for an image URL, made unique among the names already taken in one fetch"""
+    name = extract_image_name(url) or f"image_{uuid.uuid4()}.jpg"
+    stem, suffix = os.path.splitext(name)
+    candidate, index = name, 1
+    while candidate in names:
+        candidate = f"{stem}_{index}{suffix}"
+        index += 1
+    names.add(candidate)
+    return candidate
+
+
+def extract_image_name(url: str) -> Optional[str]:
+    """Extract image name from URL with improved handling."""
+    try:
+        filename = Path(urlparse(url).path).name
+
+        # If filename has no extension, return None
+        if '.' not in filename:
+            return None
+
+        # Clean the filename
+        filename = filename.lower()  # normalize to lowercase
+        filename = ''.join(c for c in filename if c.isalnum() or c in '._-')  # remove special chars
+        return filename if filename else None
+
+    except Exception as e:
+        logger.error(f"Error extracting image name from {url}: {str(e)}")
+        return None
@@ -0,0 +1,113 @@
+import logging
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from app.utils.s3_uploader import MultipartStream
+
+logger = logging.getLogger(__name__)
+
+IMAGE_PLACEHOLDER = "![image](placeholder)\n"
+
+class MarkdownPageWriter:
+    """Stream page markdown, in page order, to a local file and to S3.
+
+    Each page is queued together with the uploads of its artifacts (and its OCR, if any)
+    and is written once those have finished, so the markdown only links objects that
+    exist. Image placeholders on a page are resolved to that page's embedded images by
+    position; recognized text follows the page text, then tables and any images without
+    a placeholder. on_written callbacks receive the final lines and artifacts of their page,
+    which restore_page can replay into a later writer.
+    """
+
+    def __init__(self, markdown_path: Path, stream: Optional[MultipartStream] = None):
+        self.markdown_path = markdown_path
+        self.file = open(markdown_path, 'w', encoding='utf-8')
+        self.stream = stream
+        self.pending = deque()
+        self.started = False
+        self.pages_written = 0
+        self.artifacts: Dict[str, Dict[str, str]] = {}
+
+    def add_page(
+        self,
+        lines: List[str],
+        uploads: List[Tuple[Future, Dict[str, str]]],
+        ocr: Optional[Future] = None,
+        on_written: Optional[Callable[[List[str], List[Dict[str, str]]], None]] = None
+    ) -> None:
+        """Queue a page and write every leading page whose uploads and OCR are complete"""
+        self.pending.append((lines, uploads, ocr, on_written))
+        self._drain(block=False)
+
+    def restore_page(self, lines: List[str], artifacts: List[Dict[str, str]]) -> None:
+        """Write a page finished by an earlier run, as reported to its on_written callback"""
+        for line in lines:
+            self._write(line)
+        for artifact in artifacts:
+            self.artifacts.setdefault(artifact['s3_url'], artifact)
+        self.pages_written += 1
+
+    def _drain(self, block: bool) -> None:
+        """Write queued pages in order, optionally waiting for outstanding uploads"""
+        while self.pending:
+            lines, uploads, ocr, on_written = self.pending[0]
+            if not block and not (all(future.done() for future, _ in uploads) and (ocr is None or ocr.done())):
+                break
+            self.pending.popleft()
+            if ocr is not None:
+                lines = lines + ocr.result()
+            artifacts = [info for future, info in uploads if future.result()]
+            written = self._write_page(lines, artifacts)
+            if on_written:
+                on_written(written, artifacts)
+
+    def _write_page(self, lines: List[str], artifacts: List[Dict[str, str]]) -> List[str]:
+        """Resolve a page's placeholders against its artifacts, write it out and return the lines written"""
+        images = iter([artifact for artifact in artifacts if artifact['type'] == 'image'])
+        placed = set()
+        written = []
+
+        for line in lines:
+            if line == IMAGE_PLACEHOLDER:
+                artifact = next(images, None)
+                if artifact:
+                    line = f"![{artifact['type']}]({artifact['s3_url']})\n"
+                    placed.add(artifact['s3_url'])
+            written.append(line)
+
+        for artifact in artifacts:
+            if artifact['s3_url'] not in placed:
+                written.append(f"![{artifact['type']}]({artifact['s3_url']})\n")
+                placed.add(artifact['s3_url'])
+            self.artifacts.setdefault(artifact['s3_url'], artifact)
+
+        for line in written:
+            self._write(line)
+        self.pages_written += 1
+        return written
+
+    def _write(self, line: str) -> None:
+        """Append one markdown line, newline-joined with the previous one"""
+        text = f"\n{line}" if self.started else line
+        self.started = True
+        self.file.write(text)
+        if self.stream:
+            self.stream.write(text.encode('utf-8'))
+
+    def close(self) -> bool:
+        """Write any remaining pages and finish the local file and S3 object"""
+        try:
+            self._drain(block=True)
+        finally:
+            self.file.close()
+        if self.stream:
+            return self.stream.close()
+        return True
+
+    def abort(self) -> None:
+        """Stop writing without completing the S3 object"""
+        self.pending.clear()
+        self.file.close()
+        if self.stream:
+            self.stream.abort()
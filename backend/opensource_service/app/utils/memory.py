@@ -0,0 +1,265 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Memory governor settings (per deployment)
+# Resident memory the service and its page workers may use; 0 means 80% of the container (or host) limit
+PDF_MEMORY_BUDGET_MB = int(os.getenv("PDF_MEMORY_BUDGET_MB", "0"))
+# Fraction of the budget above which page concurrency and render scale are reduced
+PDF_MEMORY_SOFT_LIMIT = float(os.getenv("PDF_MEMORY_SOFT_LIMIT", "0.75"))
+PDF_MEMORY_MIN_RENDER_FACTOR = float(os.getenv("PDF_MEMORY_MIN_RENDER_FACTOR", "0.5"))
+PDF_MEMORY_MAX_WAIT_SECONDS = float(os.getenv("PDF_MEMORY_MAX_WAIT_SECONDS", "30"))
+PDF_MEMORY_SAMPLE_SECONDS = float(os.getenv("PDF_MEMORY_SAMPLE_SECONDS", "0.25"))
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+_governor_lock = threading.Lock()
+_governor = None
+_governor_pid = None
+
+def get_memory_governor() -> "MemoryGovernor":
+    """Return the process-wide memory governor"""
+    global _governor, _governor_pid
+    with _governor_lock:
+        if _governor_pid != os.getpid():
+            _governor = MemoryGovernor(memory_budget())
+            _governor_pid = os.getpid()
+        return _governor
+
+
+def set_memory_budget(budget: int) -> None:
+    """Govern this process with its own budget, for worker processes that split the service's budget"""
+    global _governor, _governor_pid
+    with _governor_lock:
+        _governor = MemoryGovernor(budget)
+        _governor_pid = os.getpid()
+
+
+def memory_budget() -> int:
+    """The configured budget in bytes"""
+    return PDF_MEMORY_BUDGET_MB * 2**20 or int(memory_limit() * 0.8)
+
+
+def process_rss(pid: object = "self") -> int:
+    """Resident set size of a process in bytes, or 0 where /proc is unavailable or the process is gone"""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def process_tree() -> Dict[int, List[int]]:
+    """Direct children of every process, from a single scan of /proc for parent pids"""
+    tree: Dict[int, List[int]] = {}
+    try:
+        names = os.listdir("/proc")
+    except OSError:
+        return tree
+    for name in names:
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                stat = f.read()
+            # The command name may contain spaces, so fields are counted from its closing parenthesis
+            parent = int(stat.rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        tree.setdefault(parent, []).append(int(name))
+    return tree
+
+
+def subtree_pids(roots: Iterable[int], tree: Dict[int, List[int]]) -> List[int]:
+    """The given processes and all of their descendants in a process_tree"""
+    pids, pending = [], list(roots)
+    seen = set()
+    while pending:
+        pid = pending.pop()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        pids.append(pid)
+        pending.extend(tree.get(pid, ()))
+    return pids
+
+
+def memory_limit() -> int:
+    """The container's memory limit from cgroups, or the host's physical memory"""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        # Unlimited cgroups report "max" (v2) or a number close to 2**63 (v1)
+        if value.isdigit() and int(value) < 2**60:
+            return int(value)
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * PAGE_SIZE
+    except (AttributeError, ValueError, OSError):
+        return 8 * 2**30
+
+
+class JobMemory:
+    """Peak resident memory attributable to one job while it runs.
+
+    That is the resident memory of the page workers that ran the job's pages, as they
+    reported it at the end of each range, plus what the service process has grown by
+    since the job started. Page workers are shared between jobs, so a worker's figure
+    is its whole footprint while it was working for this job; the growth of the
+    service process can still include other jobs running pages in-process at the
+    same time.
+    """
+
+    def __init__(self, baseline_rss: int = 0):
+        self.baseline = baseline_rss
+        self.peak = 0
+        self.waited = 0.0
+        self.throttled = False
+        self.own = 0
+        self.workers: Dict[int, int] = {}
+
+    def report_worker(self, pid: int, rss: int) -> None:
+        """Record the resident memory a worker process reported after running part of this job"""
+        self.workers[pid] = max(self.workers.get(pid, 0), rss)
+        self.peak = max(self.peak, self.own + sum(self.workers.values()))
+
+    def sample(self, own_rss: int) -> None:
+        """Record current usage given the service process's RSS"""
+        self.own = max(0, own_rss - self.baseline)
+        self.peak = max(self.peak, self.own + sum(self.workers.values()))
+
+
+class MemoryGovernor:
+    """Keeps PDF processing within a resident memory budget.
+
+    Usage is the RSS of the service process and all of its child processes (page
+    workers and OCR engines), sampled in a background thread while jobs run. Between
+    the soft limit and the budget, jobs render pages at a reduced scale and keep fewer
+    page ranges in flight; over the budget they also pause before starting more work,
+    for as long as other jobs are running that can free memory. Nothing is ever
+    rejected or killed, so a single oversized job still completes, just more slowly.
+    """
+
+    def __init__(
+        self,
+        budget: int,
+        soft_limit: float = PDF_MEMORY_SOFT_LIMIT,
+        min_render_factor: float = PDF_MEMORY_MIN_RENDER_FACTOR,
+        max_wait: float = PDF_MEMORY_MAX_WAIT_SECONDS,
+        sample_interval: float = PDF_MEMORY_SAMPLE_SECONDS
+    ):
+        self.budget = max(1, budget)
+        self.soft_limit = min(soft_limit, 1.0)
+        self.min_render_factor = min(max(min_render_factor, 0.1), 1.0)
+        self.max_wait = max_wait
+        self.sample_interval = sample_interval
+        self.lock = threading.Lock()
+        self.jobs: List[JobMemory] = []
+        self.sampler: Optional[threading.Thread] = None
+        self.last_usage = 0
+        self.last_sampled = 0.0
+
+    def usage(self) -> int:
+        """Resident memory of this process and its descendants, at most sample_interval old"""
+        now = time.monotonic()
+        if now - self.last_sampled < self.sample_interval:
+            return self.last_usage
+
+        own = process_rss()
+        tree = process_tree()
+        descendants = subtree_pids(tree.get(os.getpid(), ()), tree)
+        total = own + sum(process_rss(pid) for pid in descendants)
+
+        self.last_usage, self.last_sampled = total, now
+        with self.lock:
+            jobs = list(self.jobs)
+        for job in jobs:
+            job.sample(own)
+        return total
+
+    def pressure(self) -> float:
+        """Usage as a fraction of the budget"""
+        return self.usage() / self.budget
+
+    def render_factor(self) -> float:
+        """Scale to apply to page renders: 1.0 below the soft limit, down to min_render_factor at the budget"""
+        pressure = self.pressure()
+        if pressure <= self.soft_limit:
+            return 1.0
+        excess = min(1.0, (pressure - self.soft_limit) / max(1e-6, 1.0 - self.soft_limit))
+        return round(1.0 - excess * (1.0 - self.min_render_factor), 2)
+
+    def concurrency(self, limit: int) -> int:
+        """How many of limit units of work (e.g. page ranges) to keep in flight at the current pressure"""
+        pressure = self.pressure()
+        if pressure >= 1.0:
+            return 1
+        if pressure > self.soft_limit:
+            return max(1, limit // 2)
+        return limit
+
+    def wait_for_headroom(self, relieve: Optional[Callable[[], None]] = None, job: Optional[JobMemory] = None) -> bool:
+        """Block while over budget and other jobs may still free memory.
+
+        relieve is called first to drop caches the caller can rebuild. A job waits at
+        most max_wait seconds in total across calls. Returns whether usage is within the
+        budget on return.
+        """
+        if self.pressure() < 1.0:
+            return True
+        if relieve:
+            relieve()
+
+        started = time.monotonic()
+        allowance = self.max_wait - (job.waited if job else 0.0)
+        try:
+            while self.pressure() >= 1.0:
+                with self.lock:
+                    others_running = len(self.jobs) > 1
+                if not others_running or time.monotonic() - started >= allowance:
+                    if not (job and job.throttled):
+                        logger.warning(
+                            f"Memory use {self.last_usage / 2**20:.0f} MB is over the "
+                            f"{self.budget / 2**20:.0f} MB budget; continuing at reduced scale"
+                        )
+                    if job:
+                        job.throttled = True
+                    return False
+                time.sleep(self.sample_interval)
+            return True
+        finally:
+            if job:
+                job.waited += time.monotonic() - started
+
+    @contextmanager
+    def track(self) -> Iterator[JobMemory]:
+        """Register a job for the duration of a block, sampling its peak memory in the background"""
+        job = JobMemory(process_rss())
+        with self.lock:
+            self.jobs.append(job)
+            if self.sampler is None or not self.sampler.is_alive():
+                self.sampler = threading.Thread(target=self._sample_loop, name="memory-governor", daemon=True)
+                self.sampler.start()
+        try:
+            yield job
+        finally:
+            job.sample(process_rss())
+            with self.lock:
+                self.jobs.remove(job)
+
+    def _sample_loop(self) -> None:
+        """Sample usage while any job is registered, then exit"""
+        while True:
+            with self.lock:
+                if not self.jobs:
+                    self.sampler = None
+                    return
+            self.usage()
+            time.sleep(self.sample_interval)
@@ -0,0 +1,107 @@
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import pytesseract
+from app.utils.metrics import stage_timer
+from app.utils.result_cache import MemoryCacheStore, ResultCache, SQLiteCacheStore
+
+logger = logging.getLogger(__name__)
+
+# OCR settings (per deployment)
+PDF_OCR_ENABLED = os.getenv("PDF_OCR_ENABLED", "1") == "1"
+# Pages with fewer text-layer characters than this (and at least one image) are OCRed
+PDF_OCR_MIN_CHARS = int(os.getenv("PDF_OCR_MIN_CHARS", "20"))
+PDF_OCR_DPI = int(os.getenv("PDF_OCR_DPI", "300"))
+PDF_OCR_WORKERS = int(os.getenv("PDF_OCR_WORKERS", os.cpu_count() or 1))
+PDF_OCR_LANG = os.getenv("PDF_OCR_LANG", "eng")
+PDF_OCR_TIMEOUT_SECONDS = int(os.getenv("PDF_OCR_TIMEOUT_SECONDS", "120"))
+PDF_OCR_CACHE_PATH = os.getenv("PDF_OCR_CACHE_PATH", "cache/ocr.sqlite3")
+PDF_OCR_CACHE_MAX_ENTRIES = int(os.getenv("PDF_OCR_CACHE_MAX_ENTRIES", "100000"))
+
+# Parallelism comes from running several single-threaded Tesseract processes at once;
+# letting each one also start an OpenMP thread per core oversubscribes the CPUs
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+_engine_lock = threading.Lock()
+_engine = None
+_engine_pid = None
+
+def get_ocr_engine() -> Optional["OcrEngine"]:
+    """Return the process-wide OCR engine, or None when OCR is disabled or Tesseract is missing"""
+    global _engine, _engine_pid
+    with _engine_lock:
+        if _engine_pid != os.getpid():
+            _engine = _create_engine()
+            _engine_pid = os.getpid()
+        return _engine
+
+def _create_engine() -> Optional["OcrEngine"]:
+    if not PDF_OCR_ENABLED:
+        return None
+    if not shutil.which(pytesseract.pytesseract.tesseract_cmd):
+        logger.warning("Tesseract is not installed; scanned pages will be extracted without OCR")
+        return None
+    if PDF_OCR_CACHE_PATH == "none":
+        store = MemoryCacheStore()
+    else:
+        store = SQLiteCacheStore(PDF_OCR_CACHE_PATH)
+    # Recognized text does not go stale, so entries only leave the cache by LRU eviction
+    return OcrEngine(ResultCache(store, PDF_OCR_CACHE_MAX_ENTRIES, max_age_hours=24 * 365))
+
+
+def ocr_lines(text: str) -> List[str]:
+    """Turn recognized text into markdown lines, one paragraph per line"""
+    paragraphs = []
+    for block in text.split("\n\n"):
+        paragraph = " ".join(line.strip() for line in block.splitlines() if line.strip())
+        if paragraph:
+            paragraphs.append(f"{paragraph}\n")
+    return paragraphs
+
+
+class OcrEngine:
+    """Recognizes page images with a bounded number of concurrent Tesseract processes.
+
+    Each pool thread drives one Tesseract process, so at most `workers` run at a time.
+    Results are cached by the digest of the rendered page image together with the OCR
+    options, so a page seen before (in any document) is never recognized again.
+    """
+
+    def __init__(self, cache: ResultCache, workers: int = PDF_OCR_WORKERS, lang: str = PDF_OCR_LANG):
+        self.cache = cache
+        self.lang = lang
+        self.options = {'engine': 'tesseract', 'lang': lang, 'config': '--psm 3'}
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ocr")
+
+    def submit(self, page_image: Dict[str, Any]) -> Future:
+        """Queue OCR of a rendered page image ({'path', 'digest'}) and return a future of markdown lines.
+
+        The image file is removed once it has been recognized.
+        """
+        cache_key = ResultCache.make_key(page_image['digest'], self.options)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            Path(page_image['path']).unlink(missing_ok=True)
+            future = Future()
+            future.set_result(ocr_lines(cached['text']))
+            return future
+        return self.executor.submit(self._recognize, Path(page_image['path']), cache_key)
+
+    def _recognize(self, image_path: Path, cache_key: str) -> List[str]:
+        try:
+            with stage_timer('pdf', 'ocr'):
+                text = pytesseract.image_to_string(
+                    str(image_path), lang=self.lang, config=self.options['config'], timeout=PDF_OCR_TIMEOUT_SECONDS
+                )
+        except Exception as e:
+            logger.error(f"OCR failed for {image_path.name}: {str(e)}")
+            return []
+        finally:
+            image_path.unlink(missing_ok=True)
+
+        self.cache.put(cache_key, {'text': text})
+        return ocr_lines(text)
@@ -1,7 +1,14 @@
+import hashlib
 import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Optional
-import boto3
+from typing import Dict, Any, Callable, Iterator, List, Literal, Tuple, Optional
 import uuid
 from datetime import datetime
 import re
@@ -10,8 +17,14 @@ from PIL import Image
 import io
 import numpy as np
 import cv2
-import pytesseract
-from pdf2image import convert_from_path
+from app.utils.checkpoints import CheckpointStore, get_checkpoint_store
+from app.utils.markdown_writer import IMAGE_PLACEHOLDER, MarkdownPageWriter
+from app.utils.memory import JobMemory, get_memory_governor, process_rss
+from app.utils.metrics import accumulate, observe_document, observe_stages, stage_timer
+from app.utils.ocr import PDF_OCR_DPI, PDF_OCR_MIN_CHARS, get_ocr_engine
+from app.utils.result_cache import ResultCache, file_sha256, get_result_cache
+from app.utils.s3_uploader import MultipartStream, get_uploader
+from app.utils.storage import get_storage
 
 # Create logs directory if it doesn't exist
 log_dir = Path("logs")
@@ -28,31 +41,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-class PdfConverter:
-    def __init__(self, bucket_name: str = "damg7245-datanexus-pro"):
-        """Initialize PdfConverter with S3 bucket configuration"""
-        self.s3_client = boto3.client('s3')
-        self.bucket_name = bucket_name
-        self.image_scale = 2.0
-        self.dpi = 300
+# Page-parallel execution settings (per deployment)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", os.cpu_count() or 1))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+PDF_TIERED_RENDERING = os.getenv("PDF_TIERED_RENDERING", "1") == "1"
+PDF_DETECTION_SCALE = float(os.getenv("PDF_DETECTION_SCALE", "1.0"))
 
-    def get_s3_url(self, s3_key: str) -> str:
-        """Generate an S3 URL for a given key"""
-        return f"https://{self.bucket_name}.s3.amazonaws.com/{s3_key}"
+# Extraction fidelity levels, cheapest first:
+#   text   - text layer only; pages are never rendered and OpenCV is not used
+#   images - text plus embedded images
+#   full   - text, embedded images, table crops and OCR of scanned pages
+Fidelity = Literal["text", "images", "full"]
+FIDELITY_LEVELS = ("text", "images", "full")
 
-    def upload_to_s3(self, local_path: Path, s3_key: str) -> bool:
-        """Upload a file to S3 with error handling"""
-        try:
-            if not local_path.exists():
-                logger.error(f"File not found: {local_path}")
-                return False
-                
-            self.s3_client.upload_file(str(local_path), self.bucket_name, s3_key)
-            logger.info(f"Successfully uploaded {local_path} to s3://{self.bucket_name}/{s3_key}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to upload {local_path} to S3: {str(e)}")
-            return False
+class PageRenderer:
+    """Per-page rendering, table detection and extraction, configured by plain settings.
+
+    Page worker processes hold only this: it has no storage client, uploader, caches,
+    memory governor or OCR engine, so workers start quickly and share no state with
+    the service process.
+    """
+
+    # Attributes copied into page worker processes
+    PAGE_SETTINGS = (
+        'image_scale', 'dpi', 'detection_scale', 'tiered_rendering', 'save_page_images', 'vector_precheck',
+        'ocr_enabled', 'ocr_dpi', 'ocr_min_chars', 'extract_images', 'extract_tables'
+    )
+    # Table detection geometry, in rendered pixels
+    TABLE_LINE_MIN_PX = 40
+    TABLE_MIN_SIZE_PX = 100
+
+    def __init__(self, settings: Dict[str, Any], render_factor: float = 1.0):
+        for name in self.PAGE_SETTINGS:
+            setattr(self, name, settings[name])
+        self.render_factor = render_factor
 
     def save_image_safely(self, img_data: bytes, image_path: Path, format: str = 'PNG') -> bool:
         """Safely save image data to file with error handling"""
@@ -61,45 +83,129 @@ class PdfConverter:
                 logger.error("No image data provided")
                 return False
                 
-            img = Image.open(io.BytesIO(img_data))
-            img.save(str(image_path), format=format)
+            with Image.open(io.BytesIO(img_data)) as img:
+                img.save(str(image_path), format=format)
             return True
         except Exception as e:
             logger.error(f"Failed to save image: {str(e)}")
             return False
 
-    def detect_and_extract_tables(self, image_path: str) -> List[np.ndarray]:
-        """Detect and extract tables from an image using OpenCV with error handling"""
+    def render_page(
+        self,
+        page: fitz.Page,
+        page_image_path: Optional[Path] = None,
+        scale: Optional[float] = None,
+        color: bool = False
+    ) -> Tuple[fitz.Pixmap, np.ndarray]:
+        """Render a page and return the pixmap with a grayscale ndarray for table detection.
+
+        A colour render is made when the full page image is also written to
+        page_image_path or when color is set, e.g. because table crops are cut from the
+        pixmap; otherwise the page is rendered in grayscale and the array is a view of
+        the pixmap's samples, so the pixmap must outlive it.
+        """
+        scale = scale or self.image_scale
+        matrix = fitz.Matrix(scale, scale)
+        color = color or page_image_path is not None
+        colorspace = fitz.csRGB if color else fitz.csGRAY
+        pix = page.get_pixmap(matrix=matrix, colorspace=colorspace, alpha=False)
+        
+        if page_image_path:
+            pix.save(str(page_image_path))
+        if color:
+            return pix, cv2.cvtColor(self.rgb_view(pix), cv2.COLOR_RGB2GRAY)
+        samples = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride)
+        return pix, samples[:, :pix.width]
+
+    @staticmethod
+    def rgb_view(pix: fitz.Pixmap) -> np.ndarray:
+        """An (height, width, 3) ndarray view of an RGB pixmap's samples"""
+        samples = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride)
+        return samples[:, :pix.width * 3].reshape(pix.height, pix.width, 3)
+
+    def detect_table_regions(self, gray: np.ndarray, scale: Optional[float] = None) -> List[Tuple[int, int, int, int]]:
+        """Find ruled table bounding boxes (x, y, w, h) in a grayscale render made at the given scale.
+
+        Kernel and minimum region sizes are tuned for image_scale and are scaled with the
+        render, so detection behaves the same in page units at any resolution.
+        """
+        ratio = (scale or self.image_scale) / self.image_scale
+        line_px = max(3, round(self.TABLE_LINE_MIN_PX * ratio))
+        min_size_px = self.TABLE_MIN_SIZE_PX * ratio
+        
+        # Detect lines
+        thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
+        horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (line_px, 1))
+        vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, line_px))
+        
+        horizontal_lines = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, horizontal_kernel, iterations=2)
+        vertical_lines = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, vertical_kernel, iterations=2)
+        
+        table_mask = cv2.addWeighted(horizontal_lines, 0.5, vertical_lines, 0.5, 0.0)
+        contours, _ = cv2.findContours(table_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        
+        regions = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            if w > min_size_px and h > min_size_px:  # Filter small regions
+                regions.append((x, y, w, h))
+        return regions
+
+    def render_table_crops(
+        self,
+        page: fitz.Page,
+        regions: List[Tuple[int, int, int, int]],
+        scale: float,
+        page_prefix: str,
+        images_dir: Path
+    ) -> List[Path]:
+        """Re-render detected table regions from the page at self.dpi (times render_factor) and save them as PNGs"""
+        to_page = ~fitz.Matrix(scale, scale)
+        dpi = max(72, round(self.dpi * self.render_factor))
+        table_paths = []
+        for table_index, (x, y, w, h) in enumerate(regions, 1):
+            clip = fitz.Rect(x, y, x + w, y + h) * to_page
+            crop = page.get_pixmap(dpi=dpi, clip=clip, alpha=False)
+            table_path = images_dir / f"{page_prefix}_table_{table_index}.png"
+            crop.save(str(table_path))
+            table_paths.append(table_path)
+        return table_paths
+
+    def is_table_candidate(self, page: fitz.Page) -> bool:
+        """Decide from vector drawings and image placements whether a page can hold a ruled table.
+
+        OpenCV only finds regions built from horizontal and vertical strokes at least
+        TABLE_LINE_MIN_PX long, so pages without such strokes (and without placed images
+        large enough to contain a scanned table) are skipped before rendering.
+        """
+        if not self.vector_precheck:
+            return True
+        
+        min_line = self.TABLE_LINE_MIN_PX / self.image_scale
+        min_size = self.TABLE_MIN_SIZE_PX / self.image_scale
         try:
-            image = cv2.imread(str(image_path))
-            if image is None:
-                logger.error(f"Failed to read image: {image_path}")
-                return []
-                
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
-            # Detect lines
-            thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
-            horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
-            vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
+            for image in page.get_image_info():
+                x0, y0, x1, y1 = image['bbox']
+                if x1 - x0 > min_size and y1 - y0 > min_size:
+                    return True
             
-            horizontal_lines = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, horizontal_kernel, iterations=2)
-            vertical_lines = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, vertical_kernel, iterations=2)
-            
-            table_mask = cv2.addWeighted(horizontal_lines, 0.5, vertical_lines, 0.5, 0.0)
-            contours, _ = cv2.findContours(table_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            tables = []
-            for contour in contours:
-                x, y, w, h = cv2.boundingRect(contour)
-                if w > 100 and h > 100:  # Filter small regions
-                    table_region = image[y:y+h, x:x+w]
-                    tables.append(table_region)
-            
-            return tables
+            horizontal = vertical = False
+            for path in page.get_drawings():
+                for item in path['items']:
+                    if item[0] == 'l':
+                        dx, dy = abs(item[2].x - item[1].x), abs(item[2].y - item[1].y)
+                        horizontal = horizontal or (dy < 1 and dx >= min_line)
+                        vertical = vertical or (dx < 1 and dy >= min_line)
+                    elif item[0] in ('re', 'qu'):
+                        rect = item[1] if item[0] == 're' else item[1].rect
+                        horizontal = horizontal or rect.width >= min_line
+                        vertical = vertical or rect.height >= min_line
+                    if horizontal and vertical:
+                        return True
+            return False
         except Exception as e:
-            logger.error(f"Error extracting tables: {str(e)}")
-            return []
+            logger.error(f"Vector table pre-check failed, rendering page: {str(e)}")
+            return True
 
     def extract_image_safely(self, pdf_document: fitz.Document, xref: int) -> Optional[Dict]:
         """Safely extract image from PDF with error handling"""
@@ -111,131 +217,408 @@ class PdfConverter:
             logger.error(f"Failed to extract image {xref}: {str(e)}")
         return None
 
-    def process_and_upload_images(
+    def process_page_artifacts(
         self,
         pdf_document: fitz.Document,
+        page_num: int,
         images_dir: Path,
         base_filename: str,
-        base_s3_path: str
-    ) -> Tuple[List[Dict[str, str]], int, int]:
-        """Process and upload images from PDF pages with robust error handling"""
-        image_info = []
-        table_count = 0
-        image_count = 0
+        seen_xrefs: Optional[set] = None
+    ) -> Dict[str, Any]:
+        """Render one page, extract its tables and embedded images to page-scoped local files.
+
+        Tables and images are only extracted when the fidelity level asks for them; at
+        the text level nothing is rendered or decoded.
+
+        Images whose xref is already in seen_xrefs are recorded as references only and
+        are not extracted again. Per-stage durations are returned in 'timings' so that
+        pages processed in worker processes are still measured.
+        """
+        result = {
+            'page_num': page_num, 'tables': [], 'images': [], 'image_hits': 0,
+            'table_scan_skipped': False, 'render_factor': self.render_factor, 'timings': {}
+        }
+        timings = result['timings']
+        page_prefix = f"{base_filename}_page_{page_num+1}"
         
         try:
-            # Ensure images directory exists
-            images_dir.mkdir(parents=True, exist_ok=True)
+            page = pdf_document[page_num]
             
-            for page_num in range(len(pdf_document)):
-                try:
-                    page = pdf_document[page_num]
-                    
-                    # Convert page to image with error handling
-                    try:
-                        pix = page.get_pixmap(matrix=fitz.Matrix(self.image_scale, self.image_scale))
-                        img_data = pix.tobytes()
-                        img = Image.frombytes("RGB", [pix.width, pix.height], img_data)
-                        
-                        page_image_path = images_dir / f"{base_filename}_page_{page_num+1}.png"
-                        img.save(str(page_image_path))
-                        
-                        # Process tables
-                        tables = self.detect_and_extract_tables(str(page_image_path))
-                        
-                        for table_img in tables:
-                            table_count += 1
-                            table_filename = f"{base_filename}_table_{table_count}.png"
-                            table_path = images_dir / table_filename
-                            
-                            cv2.imwrite(str(table_path), table_img)
-                            
-                            table_s3_key = f"{base_s3_path}/images/tables/{table_filename}"
-                            if self.upload_to_s3(table_path, table_s3_key):
-                                image_info.append({
-                                    'type': 'table',
-                                    'local_path': str(table_path),
-                                    's3_url': self.get_s3_url(table_s3_key)
-                                })
+            # Render page and detect tables on the in-memory pixmap, unless no table is possible
+            try:
+                with accumulate(timings, 'table_precheck'):
+                    table_candidate = self.extract_tables and self.is_table_candidate(page)
+                result['table_scan_skipped'] = self.extract_tables and not table_candidate
+                
+                if table_candidate or self.save_page_images:
+                    # Full page images are kept at image_scale; otherwise detect on a cheap render
+                    tiered = self.tiered_rendering and not self.save_page_images
+                    scale = (self.detection_scale if tiered else self.image_scale) * self.render_factor
+                    page_image_path = images_dir / f"{page_prefix}.png" if self.save_page_images else None
+                    with accumulate(timings, 'render'):
+                        # Without a second render, table crops are cut from this one and keep their colour
+                        pix, gray = self.render_page(page, page_image_path, scale, color=table_candidate and not tiered)
                     
-                    except Exception as e:
-                        logger.error(f"Error processing page {page_num}: {str(e)}")
-                        continue
+                    # Process tables
+                    with accumulate(timings, 'table_detection'):
+                        regions = self.detect_table_regions(gray, scale) if table_candidate else []
+                    with accumulate(timings, 'table_crop'):
+                        if tiered:
+                            del pix, gray
+                            result['tables'] = self.render_table_crops(page, regions, scale, page_prefix, images_dir)
+                        else:
+                            rgb = self.rgb_view(pix) if regions else None
+                            for table_index, (x, y, w, h) in enumerate(regions, 1):
+                                table_path = images_dir / f"{page_prefix}_table_{table_index}.png"
+                                crop = cv2.cvtColor(rgb[y:y+h, x:x+w], cv2.COLOR_RGB2BGR)
+                                if cv2.imwrite(str(table_path), crop):
+                                    result['tables'].append(table_path)
+                            del pix, gray, rgb
+            
+            except Exception as e:
+                logger.error(f"Error processing page {page_num}: {str(e)}")
+            
+            # Extract regular images, once per xref
+            if not self.extract_images:
+                return result
+            try:
+                with accumulate(timings, 'image_extraction'):
+                    for img in page.get_images():
+                        result['image_hits'] += 1
+                        xref = img[0]
+                        if seen_xrefs is not None and xref in seen_xrefs:
+                            result['images'].append({'hit': result['image_hits'], 'xref': xref, 'path': None, 'digest': None})
+                            continue
                     
-                    # Extract and process regular images
-                    try:
-                        for img in page.get_images():
-                            image_count += 1
-                            image_info_dict = self.extract_image_safely(pdf_document, img[0])
-                            
-                            if image_info_dict:
-                                image_ext = image_info_dict.get("ext", "png")
-                                image_filename = f"{base_filename}_image_{image_count}.{image_ext}"
-                                image_path = images_dir / image_filename
-                                
-                                if self.save_image_safely(image_info_dict["image"], image_path):
-                                    image_s3_key = f"{base_s3_path}/images/content/{image_filename}"
-                                    if self.upload_to_s3(image_path, image_s3_key):
-                                        image_info.append({
-                                            'type': 'image',
-                                            'local_path': str(image_path),
-                                            's3_url': self.get_s3_url(image_s3_key)
-                                        })
+                        image_info_dict = self.extract_image_safely(pdf_document, xref)
                     
-                    except Exception as e:
-                        logger.error(f"Error extracting images from page {page_num}: {str(e)}")
-                        continue
-                
-                except Exception as e:
-                    logger.error(f"Error processing page {page_num}: {str(e)}")
-                    continue
+                        if image_info_dict:
+                            image_ext = image_info_dict.get("ext", "png")
+                            image_path = images_dir / f"{page_prefix}_image_{result['image_hits']}.{image_ext}"
+                        
+                            if self.save_image_safely(image_info_dict["image"], image_path):
+                                result['images'].append({
+                                    'hit': result['image_hits'],
+                                    'xref': xref,
+                                    'path': image_path,
+                                    'digest': hashlib.sha256(image_info_dict["image"]).hexdigest()
+                                })
+                                if seen_xrefs is not None:
+                                    seen_xrefs.add(xref)
+                        # Drop the encoded image before extracting the next one
+                        del image_info_dict
             
-            return image_info, table_count, image_count
+            except Exception as e:
+                logger.error(f"Error extracting images from page {page_num}: {str(e)}")
         
         except Exception as e:
-            logger.error(f"Error in process_and_upload_images: {str(e)}")
-            return [], 0, 0
+            logger.error(f"Error processing page {page_num}: {str(e)}")
+        
+        return result
 
-    def extract_text_with_layout(self, pdf_document: fitz.Document) -> str:
-        """Extract text while preserving layout with error handling"""
+    def extract_page_text(self, page: fitz.Page) -> List[str]:
+        """Extract markdown lines for a single page"""
+        markdown_content = []
+        
         try:
-            markdown_content = []
+            # Image blocks (with their decoded pixels) are only needed to place extracted images
+            flags = fitz.TEXTFLAGS_DICT if self.extract_images else fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+            blocks = page.get_text("dict", flags=flags)["blocks"]
             
-            for page in pdf_document:
-                try:
-                    blocks = page.get_text("dict")["blocks"]
-                    
-                    for block in blocks:
-                        if block["type"] == 0:  # Text
-                            for line in block["lines"]:
-                                try:
-                                    text = " ".join(span["text"] for span in line["spans"])
-                                    font_size = line["spans"][0]["size"]
-                                    if font_size > 14:
-                                        markdown_content.append(f"## {text}\n")
-                                    else:
-                                        markdown_content.append(f"{text}\n")
-                                except Exception as e:
-                                    logger.error(f"Error processing line: {str(e)}")
-                                    continue
-                        elif block["type"] == 1:  # Image
-                            markdown_content.append("![image](placeholder)\n")
-                
-                except Exception as e:
-                    logger.error(f"Error processing page text: {str(e)}")
-                    continue
-            
-            return "\n".join(markdown_content)
+            for block in blocks:
+                if block["type"] == 0:  # Text
+                    for line in block["lines"]:
+                        try:
+                            text = " ".join(span["text"] for span in line["spans"])
+                            font_size = line["spans"][0]["size"]
+                            if font_size > 14:
+                                markdown_content.append(f"## {text}\n")
+                            else:
+                                markdown_content.append(f"{text}\n")
+                        except Exception as e:
+                            logger.error(f"Error processing line: {str(e)}")
+                            continue
+                elif block["type"] == 1:  # Image
+                    markdown_content.append("![image](placeholder)\n")
         
         except Exception as e:
-            logger.error(f"Error in extract_text_with_layout: {str(e)}")
-            return ""
+            logger.error(f"Error processing page text: {str(e)}")
+        
+        return markdown_content
+
+    def needs_ocr(self, markdown_lines: List[str]) -> bool:
+        """Whether a page's text layer is empty or negligible while it shows images, as scans do"""
+        if IMAGE_PLACEHOLDER not in markdown_lines:
+            return False
+        text_chars = sum(len(line.strip()) for line in markdown_lines if line != IMAGE_PLACEHOLDER)
+        return text_chars < self.ocr_min_chars
+
+    def render_ocr_image(self, page: fitz.Page, image_path: Path) -> Dict[str, str]:
+        """Render a page in grayscale at ocr_dpi for Tesseract, returning its path and content digest"""
+        pix = page.get_pixmap(dpi=self.ocr_dpi, colorspace=fitz.csGRAY, alpha=False)
+        digest = hashlib.sha256(f"{pix.width}x{pix.height}:".encode('utf-8'))
+        digest.update(pix.samples_mv)
+        pix.save(str(image_path))
+        return {'path': str(image_path), 'digest': digest.hexdigest()}
+
+    def process_page(
+        self,
+        pdf_document: fitz.Document,
+        page_num: int,
+        images_dir: Path,
+        base_filename: str,
+        seen_xrefs: Optional[set] = None
+    ) -> Dict[str, Any]:
+        """Run the full per-page pipeline: artifacts plus markdown lines.
+
+        Pages that need OCR get a rendered page image in 'ocr_image'; recognition itself
+        runs in the OCR engine's pool so it overlaps the processing of later pages.
+        """
+        result = self.process_page_artifacts(pdf_document, page_num, images_dir, base_filename, seen_xrefs)
+        with accumulate(result['timings'], 'text_extraction'):
+            result['markdown'] = self.extract_page_text(pdf_document[page_num])
+        if self.ocr_enabled and self.needs_ocr(result['markdown']):
+            with accumulate(result['timings'], 'ocr_render'):
+                image_path = images_dir / f"{base_filename}_page_{page_num+1}_ocr.png"
+                result['ocr_image'] = self.render_ocr_image(pdf_document[page_num], image_path)
+        return result
+
+
+class PdfConverter(PageRenderer):
+    def __init__(
+        self,
+        bucket_name: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        save_page_images: bool = False,
+        result_cache: Optional[ResultCache] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        fidelity: Fidelity = "full",
+        first_page: int = 1,
+        last_page: Optional[int] = None
+    ):
+        """Initialize PdfConverter with artifact storage configuration.
+
+        Only pages first_page..last_page (1-based, inclusive; last_page defaults to the
+        end of the document) are converted, at the given fidelity level.
+        """
+        if fidelity not in FIDELITY_LEVELS:
+            raise ValueError(f"Unknown fidelity {fidelity!r}; expected one of {FIDELITY_LEVELS}")
+        if first_page < 1 or (last_page is not None and last_page < first_page):
+            raise ValueError(f"Invalid page range {first_page}-{last_page}")
+        self.storage = get_storage()
+        self.uploader = get_uploader()
+        self.bucket_name = bucket_name or self.storage.bucket_name
+        # Per-page settings (PAGE_SETTINGS) follow from the options rather than being passed in
+        self.image_scale = 2.0
+        self.dpi = 300
+        # Two-tier rendering: detect tables on a low-resolution render, crop them at self.dpi
+        self.tiered_rendering = PDF_TIERED_RENDERING
+        self.detection_scale = PDF_DETECTION_SCALE
+        self.max_workers = max(1, max_workers or PDF_WORKERS)
+        self.parallel_min_pages = PDF_PARALLEL_MIN_PAGES
+        self.save_page_images = save_page_images
+        self.vector_precheck = True
+        # Requested extraction scope
+        self.fidelity = fidelity
+        self.first_page = first_page
+        self.last_page = last_page
+        self.extract_images = fidelity != "text"
+        self.extract_tables = fidelity == "full"
+        # Render scale multiplier the memory governor lowers under pressure
+        self.memory = get_memory_governor()
+        self.render_factor = 1.0
+        # OCR fallback for pages without a usable text layer
+        self.ocr = get_ocr_engine()
+        self.ocr_enabled = self.ocr is not None and fidelity == "full"
+        self.ocr_dpi = PDF_OCR_DPI
+        self.ocr_min_chars = PDF_OCR_MIN_CHARS
+        self.result_cache = result_cache or get_result_cache()
+        self.checkpoints = checkpoint_store or get_checkpoint_store()
+
+    def page_settings(self) -> Dict[str, Any]:
+        """Settings a page worker needs to reproduce this converter's per-page behaviour"""
+        return {name: getattr(self, name) for name in self.PAGE_SETTINGS}
+
+    def cache_options(self) -> Dict[str, Any]:
+        """Options that change the output for a given document, used in result cache keys"""
+        return {
+            'artifact_url_prefix': self.get_s3_url(''),
+            'page_range': [self.first_page, self.last_page],
+            **self.page_settings()
+        }
 
-    def process_pdf(self, pdf_path: Path) -> Dict[str, Any]:
-        """Process a single PDF file with comprehensive error handling"""
+    def governed_render_factor(self) -> float:
+        """Render scale multiplier for the next pages: lowered under memory pressure, 1.0 when nothing is rendered"""
+        if not (self.extract_tables or self.save_page_images):
+            return 1.0
+        return self.memory.render_factor()
+
+    def page_span(self, page_count: int) -> Tuple[int, int]:
+        """The requested pages of a page_count-page document as a 0-based [start, end) range"""
+        if self.first_page > page_count:
+            raise ValueError(f"Page range starts at page {self.first_page} but the document has {page_count} pages")
+        return self.first_page - 1, min(self.last_page or page_count, page_count)
+
+    def get_s3_url(self, s3_key: str) -> str:
+        """Generate the public artifact URL for a given key"""
+        return self.storage.public_url(s3_key, self.bucket_name)
+
+    def page_checkpointer(
+        self,
+        document_key: str,
+        owner: str,
+        page_result: Dict[str, Any],
+        publisher_state: Dict[str, Any],
+        ocr: bool
+    ) -> Callable[[List[str], List[Dict[str, str]]], None]:
+        """Build the callback that records a page once the markdown writer has written it"""
+        def record(lines: List[str], artifacts: List[Dict[str, str]]) -> None:
+            self.checkpoints.record_page(document_key, owner, {
+                'page_num': page_result['page_num'],
+                'lines': lines,
+                'artifacts': artifacts,
+                'table_scan_skipped': page_result['table_scan_skipped'],
+                'reduced_scale': page_result['render_factor'] < 1.0,
+                'ocr': ocr,
+                'publisher': publisher_state
+            })
+        return record
+
+    def estimate_cost(self, pdf_path: Path) -> float:
+        """Estimate processing cost as requested pages times render area, for admission control"""
+        scale = self.detection_scale if self.tiered_rendering else self.image_scale
+        page_cost = scale * scale if self.extract_tables else 1.0
+        with fitz.open(pdf_path) as pdf_document:
+            page_count = len(pdf_document)
+        pages = max(0, min(self.last_page or page_count, page_count) - self.first_page + 1)
+        return max(1.0, pages * page_cost)
+
+    def page_ranges(self, page_count: int, start_page: int = 0) -> List[Tuple[int, int]]:
+        """Split pages [start_page, page_count) into contiguous ranges, several per worker for load balancing"""
+        chunk_size = max(1, -(-(page_count - start_page) // (self.max_workers * 4)))
+        return [(start, min(start + chunk_size, page_count)) for start in range(start_page, page_count, chunk_size)]
+
+    def process_pages_parallel(
+        self,
+        pdf_path: Path,
+        page_count: int,
+        images_dir: Path,
+        base_filename: str,
+        start_page: int = 0,
+        job_memory: Optional[JobMemory] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Process page ranges in worker processes, yielding page results in page order.
+
+        Ranges are submitted as earlier ones are consumed, so finished results do not pile
+        up; the memory governor decides how many are in flight and at what render scale.
+        """
+        ranges = deque(self.page_ranges(page_count, start_page))
+        pool = get_page_pool()
+        settings = self.page_settings()
+        futures = deque()
         try:
+            while ranges or futures:
+                # Two ranges per worker keep every worker busy; under memory pressure fewer run at once
+                limit = self.memory.concurrency(self.max_workers)
+                if limit == self.max_workers:
+                    limit *= 2
+                # Over budget with nothing of ours in flight, give other jobs a chance to free memory
+                if ranges and not futures:
+                    self.memory.wait_for_headroom(release_caches, job_memory)
+                while ranges and len(futures) < limit:
+                    start, end = ranges.popleft()
+                    futures.append(pool.submit(
+                        _process_page_range, settings, str(pdf_path), start, end, str(images_dir), base_filename,
+                        self.governed_render_factor()
+                    ))
+                done = futures.popleft().result()
+                if job_memory:
+                    job_memory.report_worker(done['pid'], done['rss'])
+                yield from done['pages']
+        finally:
+            # Ranges not yet started are dropped if the caller stops early or a range fails
+            for future in futures:
+                future.cancel()
+        
+        logger.info(f"Processed {page_count - start_page} pages across {self.max_workers} workers")
+
+    def iter_page_results(
+        self,
+        pdf_document: fitz.Document,
+        pdf_path: Path,
+        images_dir: Path,
+        base_filename: str,
+        start_page: int,
+        end_page: int,
+        job_memory: Optional[JobMemory] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield results for pages [start_page, end_page) in page order, in worker processes for long ranges"""
+        if self.max_workers > 1 and end_page - start_page >= self.parallel_min_pages:
+            yield from self.process_pages_parallel(
+                pdf_path, end_page, images_dir, base_filename, start_page, job_memory
+            )
+            return
+        
+        seen_xrefs = set()
+        for page_num in range(start_page, end_page):
+            self.memory.wait_for_headroom(release_caches, job_memory)
+            self.render_factor = self.governed_render_factor()
+            yield self.process_page(pdf_document, page_num, images_dir, base_filename, seen_xrefs)
+
+    def process_pdf(
+        self,
+        pdf_path: Path,
+        content_hash: Optional[str] = None,
+        progress: Optional[Callable[[float], None]] = None,
+        output_dir: Optional[Path] = None
+    ) -> Dict[str, Any]:
+        """Process a single PDF file with comprehensive error handling.
+
+        Results are cached by content hash and extraction options, so a repeated
+        submission of the same document returns the existing artifacts. progress, if
+        given, is called with the fraction of pages completed. The result reports the
+        peak resident memory seen while the document was processed.
+
+        Local markdown and images are written under output_dir (default: output/), named
+        after the PDF. Conversions that may run concurrently with another of the same
+        file name need their own output_dir, which the caller removes afterwards, so the
+        result (and the cached copy of it) refers only to the stored artifacts.
+        """
+        start = time.perf_counter()
+        with self.memory.track() as job_memory:
+            result = self._process_pdf(pdf_path, content_hash, progress, job_memory, output_dir)
+        result['peak_rss_mb'] = round(job_memory.peak / 2**20, 1)
+        
+        try:
+            bytes_in = pdf_path.stat().st_size
+        except OSError:
+            bytes_in = None
+        status = 'cached' if result.get('cached') else result['status']
+        observe_document('pdf', status, time.perf_counter() - start, result.get('page_count'), bytes_in)
+        return result
+
+    def _process_pdf(
+        self,
+        pdf_path: Path,
+        content_hash: Optional[str],
+        progress: Optional[Callable[[float], None]],
+        job_memory: Optional[JobMemory] = None,
+        output_dir: Optional[Path] = None
+    ) -> Dict[str, Any]:
+        """Convert a PDF to markdown and S3 artifacts, consulting the result cache first"""
+        try:
+            # Serve repeated submissions from the result cache
+            document_key = None
+            if self.result_cache or self.checkpoints:
+                with stage_timer('pdf', 'cache_lookup'):
+                    document_key = ResultCache.make_key(content_hash or file_sha256(pdf_path), self.cache_options())
+                    cached_result = self.result_cache.get(document_key) if self.result_cache else None
+                if cached_result:
+                    logger.info(f"Result cache hit for {pdf_path.name}")
+                    return {**cached_result, 'cached': True}
+            
             # Create output directories
-            output_dir = Path("output")
+            output_dir = output_dir or Path("output")
             markdown_dir = output_dir / "markdown"
             images_dir = output_dir / "images"
             
@@ -250,57 +633,119 @@ class PdfConverter:
 
             # Open PDF with error handling
             try:
+                # Opened by path: MuPDF reads the file on demand, so memory does not grow with its size
                 pdf_document = fitz.open(pdf_path)
             except Exception as e:
                 logger.error(f"Failed to open PDF: {str(e)}")
                 return {'status': 'error', 'message': f"Failed to open PDF: {str(e)}"}
-
+            
             try:
-                base_filename = pdf_path.stem
-                
-                # Process images first
-                image_info, table_count, image_count = self.process_and_upload_images(
-                    pdf_document, images_dir, base_filename, base_s3_path
+                start_page, end_page = self.page_span(len(pdf_document))
+            except ValueError as e:
+                pdf_document.close()
+                return {'status': 'error', 'message': str(e)}
+
+            # Continue an interrupted conversion of the same document under its storage prefix
+            checkpoint = None
+            if self.checkpoints and document_key:
+                checkpoint = self.checkpoints.claim(
+                    document_key, {'base_s3_path': base_s3_path, 'base_filename': pdf_path.stem}
                 )
-                
-                # Extract text
-                markdown_content = self.extract_text_with_layout(pdf_document)
-                
-                # Update markdown content with image URLs
-                for img in image_info:
-                    markdown_content = markdown_content.replace(
-                        "![image](placeholder)",
-                        f"![{img['type']}]({img['s3_url']})",
-                        1
-                    )
-                
-                # Save and upload markdown
+            if checkpoint:
+                base_s3_path = checkpoint['state']['base_s3_path']
+            base_filename = checkpoint['state']['base_filename'] if checkpoint else pdf_path.stem
+            result: Dict[str, Any] = {}
+
+            try:
                 markdown_path = markdown_dir / f"{base_filename}.md"
+                markdown_s3_key = f"{base_s3_path}/markdown/{base_filename}.md"
+                
+                # Stream markdown page by page to disk and S3 as artifacts finish uploading
+                publisher = ArtifactPublisher(self, images_dir, base_filename, base_s3_path)
+                skipped_table_pages = 0
+                ocr_pages = 0
+                reduced_scale_pages = 0
+                resume_from = start_page
                 try:
-                    markdown_path.write_text(markdown_content)
+                    writer = MarkdownPageWriter(
+                        markdown_path,
+                        MultipartStream(self.uploader, self.bucket_name, markdown_s3_key, {'ContentType': 'text/markdown'})
+                    )
                 except Exception as e:
                     logger.error(f"Failed to save markdown: {str(e)}")
                     return {'status': 'error', 'message': f"Failed to save markdown: {str(e)}"}
                 
-                markdown_s3_key = f"{base_s3_path}/markdown/{base_filename}.md"
-                if not self.upload_to_s3(markdown_path, markdown_s3_key):
+                try:
+                    if checkpoint and checkpoint['pages']:
+                        # Replay the pages an earlier run finished; their artifacts are already stored
+                        publisher.restore(checkpoint['pages'])
+                        for page in checkpoint['pages']:
+                            writer.restore_page(page['lines'], page['artifacts'])
+                            skipped_table_pages += page['table_scan_skipped']
+                            ocr_pages += page['ocr']
+                            reduced_scale_pages += page.get('reduced_scale', False)
+                        resume_from += len(checkpoint['pages'])
+                        logger.info(f"Resuming {pdf_path.name} at page {resume_from + 1} of {end_page}")
+                        if progress:
+                            progress((resume_from - start_page) / (end_page - start_page))
+                    
+                    pages = self.iter_page_results(
+                        pdf_document, pdf_path, images_dir, base_filename, resume_from, end_page, job_memory
+                    )
+                    for page_result in pages:
+                        observe_stages('pdf', page_result['timings'])
+                        skipped_table_pages += page_result['table_scan_skipped']
+                        ocr = self.ocr.submit(page_result['ocr_image']) if page_result.get('ocr_image') else None
+                        ocr_pages += ocr is not None
+                        reduced_scale_pages += page_result['render_factor'] < 1.0
+                        uploads = publisher.publish(page_result)
+                        on_written = None
+                        if checkpoint:
+                            on_written = self.page_checkpointer(
+                                document_key, checkpoint['owner'], page_result, publisher.checkpoint(), ocr is not None
+                            )
+                        writer.add_page(page_result['markdown'], uploads, ocr, on_written)
+                        if progress:
+                            progress((page_result['page_num'] + 1 - start_page) / (end_page - start_page))
+                except Exception:
+                    writer.abort()
+                    raise
+                
+                with stage_timer('pdf', 'upload_wait'):
+                    uploaded = writer.close()
+                if not uploaded:
                     return {'status': 'error', 'message': "Failed to upload markdown to S3"}
                 
-                return {
+                result = {
                     'status': 'success',
-                    'markdown_path': str(markdown_path),
-                    'markdown_content': markdown_content,
                     'markdown_s3_url': self.get_s3_url(markdown_s3_key),
-                    's3_base_path': f"s3://{self.bucket_name}/{base_s3_path}",
+                    's3_base_path': self.storage.location(base_s3_path, self.bucket_name),
                     'images': [{
                         'type': img['type'],
                         's3_url': img['s3_url']
-                    } for img in image_info],
-                    'table_count': table_count,
-                    'image_count': image_count
+                    } for img in writer.artifacts.values()],
+                    'page_count': writer.pages_written,
+                    'first_page': start_page + 1,
+                    'last_page': end_page,
+                    'fidelity': self.fidelity,
+                    'skipped_table_pages': skipped_table_pages,
+                    'ocr_page_count': ocr_pages,
+                    'resumed_pages': resume_from - start_page,
+                    'reduced_scale_pages': reduced_scale_pages,
+                    'table_count': publisher.table_count,
+                    'image_count': publisher.image_count
                 }
+                # Pages rendered at a reduced scale under memory pressure are redone next time
+                if self.result_cache and not reduced_scale_pages:
+                    self.result_cache.put(document_key, result)
+                return {**result, 'cached': False}
             
             finally:
+                if checkpoint:
+                    if result.get('status') == 'success':
+                        self.checkpoints.complete(document_key, checkpoint['owner'])
+                    else:
+                        self.checkpoints.release(document_key, checkpoint['owner'])
                 try:
                     pdf_document.close()
                 except:
@@ -308,4 +753,180 @@ class PdfConverter:
 
         except Exception as e:
             logger.error(f"Error processing PDF: {str(e)}")
-            return {'status': 'error', 'message': str(e)}
\ No newline at end of file
+            return {'status': 'error', 'message': str(e)}
+
+
+class ArtifactPublisher:
+    """Names a document's page artifacts in page order and queues their uploads.
+
+    Repeated embedded images (same xref, or same content digest across page ranges)
+    are uploaded once; later occurrences reuse the first occurrence's upload and URL.
+    """
+
+    def __init__(self, converter: PdfConverter, images_dir: Path, base_filename: str, base_s3_path: str):
+        self.converter = converter
+        self.images_dir = images_dir
+        self.base_filename = base_filename
+        self.base_s3_path = base_s3_path
+        self.batch = converter.uploader.batch()
+        self.uploaded_images = {}
+        self.new_images = []
+        self.table_count = 0
+        self.image_count = 0
+
+    def publish(self, page_result: Dict[str, Any]) -> List[Tuple[Future, Dict[str, str]]]:
+        """Rename and queue uploads for one page's artifacts, tables first"""
+        uploads = []
+        
+        for table_path in page_result['tables']:
+            self.table_count += 1
+            table_filename = f"{self.base_filename}_table_{self.table_count}.png"
+            uploads.append(self._upload(table_path, table_filename, 'table', 'tables'))
+        
+        for image in page_result['images']:
+            upload = (self.uploaded_images.get(('xref', image['xref']))
+                      or self.uploaded_images.get(('digest', image['digest'])))
+            if upload:
+                uploads.append(upload)
+                self.uploaded_images.setdefault(('xref', image['xref']), upload)
+                if image['path']:
+                    image['path'].unlink(missing_ok=True)
+                continue
+            if image['path'] is None:
+                continue
+            
+            image_filename = f"{self.base_filename}_image_{self.image_count + image['hit']}{image['path'].suffix}"
+            upload = self._upload(image['path'], image_filename, 'image', 'content')
+            uploads.append(upload)
+            self.uploaded_images[('xref', image['xref'])] = upload
+            self.uploaded_images[('digest', image['digest'])] = upload
+            self.new_images.append({'xref': image['xref'], 'digest': image['digest'], 'info': upload[1]})
+        
+        self.image_count += page_result['image_hits']
+        return uploads
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """Numbering state after the last published page, plus the images it uploaded first"""
+        state = {'table_count': self.table_count, 'image_count': self.image_count, 'images': self.new_images}
+        self.new_images = []
+        return state
+
+    def restore(self, pages: List[Dict[str, Any]]) -> None:
+        """Continue numbering and image reuse from pages recorded by an earlier run"""
+        for page in pages:
+            stored = {artifact['s3_url'] for artifact in page['artifacts']}
+            for image in page['publisher']['images']:
+                future = Future()
+                future.set_result(image['info']['s3_url'] in stored)
+                upload = (future, image['info'])
+                self.uploaded_images[('xref', image['xref'])] = upload
+                self.uploaded_images[('digest', image['digest'])] = upload
+        self.table_count = pages[-1]['publisher']['table_count']
+        self.image_count = pages[-1]['publisher']['image_count']
+
+    def _upload(self, local_path: Path, filename: str, artifact_type: str, folder: str) -> Tuple[Future, Dict[str, str]]:
+        """Move an artifact to its document-wide name and queue its upload"""
+        final_path = self.images_dir / filename
+        local_path.replace(final_path)
+        
+        s3_key = f"{self.base_s3_path}/images/{folder}/{filename}"
+        future = self.batch.submit(final_path, self.converter.bucket_name, s3_key)
+        return future, {
+            'type': artifact_type,
+            'local_path': str(final_path),
+            's3_url': self.converter.get_s3_url(s3_key)
+        }
+
+
+class PagePool:
+    """Long-lived worker processes that render page ranges for every conversion in the service.
+
+    One pool of PDF_WORKERS processes is shared by all documents, so concurrent
+    conversions do not each start their own workers. Workers are started by a fork
+    server rather than forked from the threaded service process, and they receive
+    each range's PageRenderer settings as plain data.
+    """
+
+    def __init__(self, workers: int = PDF_WORKERS):
+        self.workers = max(1, workers)
+        self.lock = threading.Lock()
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def submit(self, func: Callable[..., Any], *args) -> Future:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("forkserver")
+                )
+            executor = self.executor
+        try:
+            future = executor.submit(func, *args)
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+        future.add_done_callback(lambda done: self._check(executor, done))
+        return future
+
+    def _check(self, executor: ProcessPoolExecutor, future: Future) -> None:
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard(executor)
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        """A worker died (e.g. OOM-killed); start a fresh pool for the ranges that follow"""
+        with self.lock:
+            if self.executor is executor:
+                self.executor = None
+        executor.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        """Stop the workers once their current ranges are done"""
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_page_pool_lock = threading.Lock()
+_page_pool = None
+
+def get_page_pool() -> PagePool:
+    """Return the service's page worker pool"""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = PagePool(PDF_WORKERS)
+        return _page_pool
+
+
+def _process_page_range(
+    settings: Dict[str, Any],
+    pdf_path: str,
+    start: int,
+    end: int,
+    images_dir: str,
+    base_filename: str,
+    render_factor: float = 1.0
+) -> Dict[str, Any]:
+    """Process pages [start, end) of a PDF inside a worker process.
+
+    Returns the page results with the worker's pid and resident memory at the end of
+    the range, before MuPDF's caches are released, for the job's memory accounting.
+    """
+    renderer = PageRenderer(settings, render_factor)
+    pdf_document = fitz.open(pdf_path)
+    seen_xrefs = set()
+    try:
+        pages = [
+            renderer.process_page(pdf_document, page_num, Path(images_dir), base_filename, seen_xrefs)
+            for page_num in range(start, end)
+        ]
+        return {'pid': os.getpid(), 'rss': process_rss(), 'pages': pages}
+    finally:
+        pdf_document.close()
+        # Return MuPDF's cached fonts and images so idle workers do not hold on to them
+        release_caches()
+
+
+def release_caches() -> None:
+    """Empty MuPDF's resource store; it is refilled on demand"""
+    fitz.TOOLS.store_shrink(100)
@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.utils.storage import ArtifactStorage, get_storage
+
+# Presigned URL settings (per deployment)
+PRESIGN_EXPIRATION_SECONDS = int(os.getenv("PRESIGN_EXPIRATION_SECONDS", "3600"))
+PRESIGN_MIN_REMAINING_SECONDS = int(os.getenv("PRESIGN_MIN_REMAINING_SECONDS", "900"))
+PRESIGN_CACHE_SIZE = int(os.getenv("PRESIGN_CACHE_SIZE", "10000"))
+
+_presigner_lock = threading.Lock()
+_presigner = None
+
+def get_presigner() -> "Presigner":
+    """Return the process-wide presigner for the configured artifact storage"""
+    global _presigner
+    with _presigner_lock:
+        if _presigner is None:
+            _presigner = Presigner(get_storage())
+        return _presigner
+
+
+class Presigner:
+    """Issues presigned download URLs, reusing each one until it is close to expiry.
+
+    Signing goes through the storage's long-lived client. Issued URLs are cached by
+    (bucket, key) in LRU order; a cached URL is handed out again only while at least
+    min_remaining seconds of its validity are left, so callers always get a URL that is
+    good for a predictable window while repeat requests cost a dict lookup.
+    """
+
+    def __init__(
+        self,
+        storage: ArtifactStorage,
+        expiration: int = PRESIGN_EXPIRATION_SECONDS,
+        min_remaining: int = PRESIGN_MIN_REMAINING_SECONDS,
+        max_entries: int = PRESIGN_CACHE_SIZE
+    ):
+        self.storage = storage
+        self.expiration = expiration
+        self.min_remaining = min(min_remaining, expiration)
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.cache: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+
+    def _cached(self, cache_key: Tuple[str, str], now: float) -> Optional[str]:
+        """Return a cached URL that is still valid long enough; call with the lock held"""
+        entry = self.cache.get(cache_key)
+        if entry is None:
+            return None
+        url, expires_at = entry
+        if expires_at - now < self.min_remaining:
+            del self.cache[cache_key]
+            return None
+        self.cache.move_to_end(cache_key)
+        return url
+
+    def _store(self, issued: Dict[Tuple[str, str], str], expires_at: float) -> None:
+        with self.lock:
+            for cache_key, url in issued.items():
+                self.cache[cache_key] = (url, expires_at)
+                self.cache.move_to_end(cache_key)
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+
+    def presign_many(self, keys: Iterable[str], bucket_name: Optional[str] = None) -> Dict[str, str]:
+        """Presigned URLs for a list of object keys, signing only those not already cached"""
+        bucket_name = bucket_name or self.storage.bucket_name
+        now = time.monotonic()
+        urls: Dict[str, str] = {}
+        missing = []
+        with self.lock:
+            for key in keys:
+                if key in urls:
+                    continue
+                url = self._cached((bucket_name, key), now)
+                if url is None:
+                    missing.append(key)
+                else:
+                    urls[key] = url
+
+        if missing:
+            # Sign outside the lock; the expiry is taken from before signing so it is never overstated
+            signed_at = time.monotonic()
+            issued = {}
+            for key in dict.fromkeys(missing):
+                issued[(bucket_name, key)] = urls[key] = self.storage.presigned_url(key, bucket_name, self.expiration)
+            self._store(issued, signed_at + self.expiration)
+        return urls
+
+    def presign(self, key: str, bucket_name: Optional[str] = None) -> str:
+        """Presigned URL for one object key"""
+        return self.presign_many([key], bucket_name)[key]
+
+    def presign_urls(self, artifact_urls: List[str]) -> List[str]:
+        """Presigned URLs for artifact URLs built by the storage, in the same order"""
+        by_bucket: Dict[str, List[str]] = {}
+        locations = []
+        for artifact_url in artifact_urls:
+            bucket_name, key = self.storage.parse_url(artifact_url)
+            by_bucket.setdefault(bucket_name, []).append(key)
+            locations.append((bucket_name, key))
+
+        signed = {bucket_name: self.presign_many(keys, bucket_name) for bucket_name, keys in by_bucket.items()}
+        return [signed[bucket_name][key] for bucket_name, key in locations]
+
+    def presign_url(self, artifact_url: str) -> str:
+        """Presigned URL for one artifact URL built by the storage"""
+        return self.presign_urls([artifact_url])[0]
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Result cache settings (per deployment)
+PDF_RESULT_CACHE_BACKEND = os.getenv("PDF_RESULT_CACHE_BACKEND", "sqlite")
+PDF_RESULT_CACHE_PATH = os.getenv("PDF_RESULT_CACHE_PATH", "cache/pdf_results.sqlite3")
+PDF_RESULT_CACHE_MAX_ENTRIES = int(os.getenv("PDF_RESULT_CACHE_MAX_ENTRIES", "1000"))
+PDF_RESULT_CACHE_MAX_AGE_HOURS = float(os.getenv("PDF_RESULT_CACHE_MAX_AGE_HOURS", "168"))
+
+_cache_lock = threading.Lock()
+_result_cache = None
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Hash a file's content without reading it into memory at once"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CacheStore:
+    """Backing store interface for ResultCache"""
+
+    def get(self, key: str, min_created_at: float) -> Optional[str]:
+        """Return the stored value if it was created at or after min_created_at"""
+        raise NotImplementedError
+
+    def put(self, key: str, value: str) -> None:
+        """Store a value, replacing any existing entry for the key"""
+        raise NotImplementedError
+
+    def evict(self, min_created_at: float, max_entries: int) -> int:
+        """Drop expired entries, then least recently used ones above max_entries"""
+        raise NotImplementedError
+
+
+class MemoryCacheStore(CacheStore):
+    """Process-local store, useful for tests and benchmarks"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str, min_created_at: float) -> Optional[str]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] < min_created_at:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, value: str) -> None:
+        with self.lock:
+            self.entries[key] = (value, time.time())
+            self.entries.move_to_end(key)
+
+    def evict(self, min_created_at: float, max_entries: int) -> int:
+        with self.lock:
+            expired = [key for key, (_, created_at) in self.entries.items() if created_at < min_created_at]
+            for key in expired:
+                del self.entries[key]
+            removed = len(expired)
+            while len(self.entries) > max_entries:
+                self.entries.popitem(last=False)
+                removed += 1
+            return removed
+
+
+class SQLiteCacheStore(CacheStore):
+    """Local SQLite store shared by every process of a deployment"""
+
+    def __init__(self, db_path: str = PDF_RESULT_CACHE_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection in a transaction; connections are not shared across threads"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str, min_created_at: float) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM results WHERE key = ? AND created_at >= ?", (key, min_created_at)
+            ).fetchone()
+            if row:
+                conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            return row[0] if row else None
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+
+    def evict(self, min_created_at: float, max_entries: int) -> int:
+        with self._connect() as conn:
+            removed = conn.execute("DELETE FROM results WHERE created_at < ?", (min_created_at,)).rowcount
+            removed += conn.execute(
+                "DELETE FROM results WHERE key IN ("
+                "SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (max_entries,)
+            ).rowcount
+            return removed
+
+
+class ResultCache:
+    """Processing results keyed by document content hash plus extraction options.
+
+    Eviction runs in batches, once per tenth of max_entries stores, so a cache can
+    hold up to 10% more entries than max_entries between evictions but stores do not
+    each pay for a scan of the whole cache. Expired entries are never returned, even
+    before they are evicted. Cache failures are logged and treated as misses so they
+    never fail a request.
+    """
+
+    def __init__(
+        self,
+        store: CacheStore,
+        max_entries: int = PDF_RESULT_CACHE_MAX_ENTRIES,
+        max_age_hours: float = PDF_RESULT_CACHE_MAX_AGE_HOURS
+    ):
+        self.store = store
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_hours * 3600
+        self.evict_every = max(1, max_entries // 10)
+        self.lock = threading.Lock()
+        self.puts_since_evict = 0
+
+    @staticmethod
+    def make_key(content_hash: str, options: Dict[str, Any]) -> str:
+        """Combine a document hash with the options that affect its output"""
+        options_json = json.dumps(options, sort_keys=True, default=str)
+        return f"{content_hash}:{hashlib.sha256(options_json.encode('utf-8')).hexdigest()[:16]}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result, or None on a miss"""
+        try:
+            value = self.store.get(key, time.time() - self.max_age_seconds)
+            return json.loads(value) if value else None
+        except Exception as e:
+            logger.error(f"Result cache lookup failed: {str(e)}")
+            return None
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a successful result, evicting once enough stores have accumulated"""
+        try:
+            self.store.put(key, json.dumps(result))
+            with self.lock:
+                self.puts_since_evict += 1
+                if self.puts_since_evict < self.evict_every:
+                    return
+                self.puts_since_evict = 0
+            removed = self.store.evict(time.time() - self.max_age_seconds, self.max_entries)
+            if removed:
+                logger.info(f"Evicted {removed} result cache entries")
+        except Exception as e:
+            logger.error(f"Result cache store failed: {str(e)}")
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Return the deployment's result cache, or None when caching is disabled"""
+    global _result_cache
+    with _cache_lock:
+        if _result_cache is None and PDF_RESULT_CACHE_BACKEND != "none":
+            if PDF_RESULT_CACHE_BACKEND == "memory":
+                store = MemoryCacheStore()
+            else:
+                store = SQLiteCacheStore(PDF_RESULT_CACHE_PATH)
+            _result_cache = ResultCache(store)
+        return _result_cache
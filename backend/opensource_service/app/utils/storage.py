@@ -0,0 +1,239 @@
+import logging
+import os
+import re
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+from urllib.parse import quote, unquote, urlparse
+import boto3
+from botocore.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Artifact storage settings (per deployment)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "s3")
+STORAGE_BUCKET = os.getenv("STORAGE_BUCKET", "damg7245-datanexus-pro")
+LOCAL_STORAGE_ROOT = os.getenv("LOCAL_STORAGE_ROOT", "storage")
+LOCAL_STORAGE_BASE_URL = os.getenv("LOCAL_STORAGE_BASE_URL", "http://localhost:8000").rstrip("/")
+# Every upload thread plus request-path presigning gets a pooled connection
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_UPLOAD_WORKERS", "16")) * 2
+
+# Path the service mounts local artifacts under
+LOCAL_STORAGE_ROUTE = "/storage"
+
+# S3 endpoints: s3.amazonaws.com, s3.<region>.amazonaws.com, s3-<region>.amazonaws.com (and .cn),
+# prefixed by "<bucket>." in virtual-hosted-style URLs, where the bucket name may itself contain dots
+S3_ENDPOINT = r's3(?:[.-][a-z0-9-]+)*\.amazonaws\.com(?:\.cn)?'
+S3_VIRTUAL_HOSTED = re.compile(rf'(?P<bucket>.+?)\.{S3_ENDPOINT}')
+S3_PATH_STYLE = re.compile(S3_ENDPOINT)
+
+_storage_lock = threading.Lock()
+_storage = None
+
+def get_storage() -> "ArtifactStorage":
+    """Return the process-wide artifact storage selected by STORAGE_BACKEND"""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            if STORAGE_BACKEND == "s3":
+                _storage = S3Storage(STORAGE_BUCKET)
+            elif STORAGE_BACKEND == "local":
+                _storage = LocalStorage(STORAGE_BUCKET, Path(LOCAL_STORAGE_ROOT), LOCAL_STORAGE_BASE_URL)
+            else:
+                raise ValueError(f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r}; expected 's3' or 'local'")
+        return _storage
+
+
+class ArtifactStorage:
+    """Where pipeline artifacts are written and how their URLs are built.
+
+    Uploads go through client(), which exposes the subset of the boto3 S3 client API
+    used by S3Uploader, so the upload pool works the same against every backend.
+    """
+
+    def __init__(self, bucket_name: str):
+        self.bucket_name = bucket_name
+        self.lock = threading.Lock()
+        self._client = None
+        self._client_pid = None
+
+    def create_client(self) -> Any:
+        raise NotImplementedError
+
+    def client(self) -> Any:
+        """Return this process's client, creating it on first use.
+
+        Clients are thread-safe but must not cross a fork, so each process gets its own.
+        """
+        with self.lock:
+            if self._client is None or self._client_pid != os.getpid():
+                self._client = self.create_client()
+                self._client_pid = os.getpid()
+            return self._client
+
+    def public_url(self, key: str, bucket_name: Optional[str] = None) -> str:
+        """Permanent URL of an object, as embedded in generated markdown"""
+        raise NotImplementedError
+
+    def parse_url(self, url: str) -> Tuple[str, str]:
+        """Split a URL built by public_url back into bucket name and object key"""
+        raise NotImplementedError
+
+    def location(self, key: str, bucket_name: Optional[str] = None) -> str:
+        """Backend-native location of an object or prefix, for logs and API responses"""
+        raise NotImplementedError
+
+    def download(self, key: str, filename: Path, bucket_name: Optional[str] = None) -> None:
+        """Copy an object to a local file"""
+        self.client().download_file(bucket_name or self.bucket_name, key, str(filename))
+
+    def presigned_url(self, key: str, bucket_name: Optional[str] = None, expiration: int = 3600) -> str:
+        """Time-limited download URL for an object"""
+        return self.client().generate_presigned_url(
+            'get_object',
+            Params={'Bucket': bucket_name or self.bucket_name, 'Key': key},
+            ExpiresIn=expiration
+        )
+
+
+class S3Storage(ArtifactStorage):
+    """Artifacts in S3, addressed by virtual-hosted-style URLs"""
+
+    def create_client(self) -> Any:
+        return boto3.client(
+            's3',
+            config=Config(
+                signature_version='s3v4',
+                max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                retries={'max_attempts': 5, 'mode': 'adaptive'}
+            )
+        )
+
+    def public_url(self, key: str, bucket_name: Optional[str] = None) -> str:
+        return f"https://{bucket_name or self.bucket_name}.s3.amazonaws.com/{key}"
+
+    def parse_url(self, url: str) -> Tuple[str, str]:
+        """Accepts virtual-hosted-style, path-style and s3:// URLs"""
+        parsed = urlparse(url)
+        host = (parsed.hostname or '').lower()
+        path = unquote(parsed.path.lstrip('/'))
+        if parsed.scheme == 's3':
+            return parsed.netloc, path
+        match = S3_VIRTUAL_HOSTED.fullmatch(host)
+        if match:
+            return match.group('bucket'), path
+        if S3_PATH_STYLE.fullmatch(host):
+            bucket_name, _, key = path.partition('/')
+            return bucket_name, key
+        raise ValueError(f"Not an S3 URL: {url}")
+
+    def location(self, key: str, bucket_name: Optional[str] = None) -> str:
+        return f"s3://{bucket_name or self.bucket_name}/{key}"
+
+
+class LocalStorage(ArtifactStorage):
+    """Artifacts on local disk under root/<bucket>/<key>, served by the service itself.
+
+    No network round trip is made for uploads or URL signing; the service mounts
+    LOCAL_STORAGE_ROUTE to return the files, and base_url is its externally visible address.
+    """
+
+    def __init__(self, bucket_name: str, root: Path, base_url: str):
+        super().__init__(bucket_name)
+        self.root = root.resolve()
+        self.base_url = base_url
+
+    def create_client(self) -> "LocalStorageClient":
+        return LocalStorageClient(self.root, self.public_url)
+
+    def public_url(self, key: str, bucket_name: Optional[str] = None) -> str:
+        return f"{self.base_url}{LOCAL_STORAGE_ROUTE}/{bucket_name or self.bucket_name}/{quote(key)}"
+
+    def parse_url(self, url: str) -> Tuple[str, str]:
+        path = unquote(urlparse(url).path)
+        bucket_name, _, key = path[len(LOCAL_STORAGE_ROUTE):].lstrip('/').partition('/')
+        return bucket_name, key
+
+    def location(self, key: str, bucket_name: Optional[str] = None) -> str:
+        return str(self.root / (bucket_name or self.bucket_name) / key)
+
+    def object_path(self, bucket_name: str, key: str) -> Optional[Path]:
+        """Resolve an object to its file, or None if the key escapes the bucket directory"""
+        bucket_dir = (self.root / bucket_name).resolve()
+        path = (bucket_dir / key).resolve()
+        if bucket_name.startswith('.') or bucket_dir.parent != self.root or not path.is_relative_to(bucket_dir):
+            return None
+        return path
+
+
+class LocalStorageClient:
+    """The S3 client calls made by S3Uploader, implemented on the local filesystem.
+
+    Objects appear atomically: each is written to a temporary file that is renamed into place.
+    """
+
+    def __init__(self, root: Path, url_builder):
+        self.root = root
+        self.url_builder = url_builder
+        self.multipart_dir = root / ".multipart"
+
+    def _object_path(self, bucket: str, key: str) -> Path:
+        path = self.root / bucket / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _write(self, bucket: str, key: str, write) -> None:
+        path = self._object_path(bucket, key)
+        partial_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.partial")
+        try:
+            with open(partial_path, 'wb') as f:
+                write(f)
+            os.replace(partial_path, path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+
+    def upload_file(self, filename: str, bucket: str, key: str, ExtraArgs: Optional[Dict[str, Any]] = None, Config=None) -> None:
+        def copy(f):
+            with open(filename, 'rb') as source:
+                shutil.copyfileobj(source, f)
+        self._write(bucket, key, copy)
+
+    def upload_fileobj(self, fileobj: BinaryIO, bucket: str, key: str, ExtraArgs: Optional[Dict[str, Any]] = None, Config=None) -> None:
+        self._write(bucket, key, lambda f: shutil.copyfileobj(fileobj, f))
+
+    def create_multipart_upload(self, Bucket: str, Key: str, **kwargs) -> Dict[str, str]:
+        upload_id = uuid.uuid4().hex
+        (self.multipart_dir / upload_id).mkdir(parents=True)
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body: bytes) -> Dict[str, str]:
+        (self.multipart_dir / UploadId / f"{PartNumber:05d}").write_bytes(Body)
+        return {'ETag': f'"{UploadId}-{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket: str, Key: str, UploadId: str, MultipartUpload: Dict[str, Any]) -> None:
+        parts_dir = self.multipart_dir / UploadId
+
+        def concatenate(f):
+            for part in sorted(MultipartUpload['Parts'], key=lambda p: p['PartNumber']):
+                with open(parts_dir / f"{part['PartNumber']:05d}", 'rb') as source:
+                    shutil.copyfileobj(source, f)
+        self._write(Bucket, Key, concatenate)
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str) -> None:
+        shutil.rmtree(self.multipart_dir / UploadId, ignore_errors=True)
+
+    def download_file(self, Bucket: str, Key: str, Filename: str, ExtraArgs=None, Callback=None, Config=None) -> None:
+        bucket_dir = (self.root / Bucket).resolve()
+        source = (bucket_dir / Key).resolve()
+        inside = not Bucket.startswith('.') and bucket_dir.parent == self.root.resolve() and source.is_relative_to(bucket_dir)
+        if not inside or not source.is_file():
+            raise FileNotFoundError(f"No such object: {Bucket}/{Key}")
+        shutil.copyfile(source, Filename)
+
+    def generate_presigned_url(self, ClientMethod: str, Params: Dict[str, str], ExpiresIn: int = 3600) -> str:
+        # The service serves local artifacts directly, so the permanent URL is the download URL
+        return self.url_builder(Params['Key'], Params['Bucket'])
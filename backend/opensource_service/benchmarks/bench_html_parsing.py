@@ -0,0 +1,123 @@
+"""Benchmark of HTML parsing backends on synthetic multi-megabyte pages.
+
+Times BeautifulSoup with each parser, building the full tree and parsing only the
+<img>/<base> tags the image pass needs, and the full parse plus Markdown conversion
+done by the web pipeline. Run from backend/opensource_service:
+
+    python -m benchmarks.bench_html_parsing --sizes 1,4,16 --repeat 3 --output html.json
+"""
+import argparse
+import io
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+WORDS = ("data", "pipeline", "extract", "markdown", "service", "document", "table", "image",
+         "storage", "parser", "latency", "throughput", "request", "cache", "worker", "page")
+
+
+def generate_html(size_mb: float, seed: int = 0) -> str:
+    """A page of repeated article sections (text, lists, tables, images, scripts and styles) of about size_mb"""
+    rng = random.Random(seed)
+    target = int(size_mb * 2**20)
+
+    def sentence(words: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+    parts = ["<!DOCTYPE html><html><head><title>Synthetic page</title>"
+             "<base href='https://example.com/'><style>body { font-family: sans-serif; }</style></head><body>"]
+    size = len(parts[0])
+    section = 0
+    while size < target:
+        section += 1
+        rows = "".join(
+            f"<tr><td>{sentence(2)}</td><td>{rng.randint(0, 10**6)}</td><td><a href='/r/{section}/{row}'>view</a></td></tr>"
+            for row in range(5)
+        )
+        chunk = (
+            f"<section id='s{section}'><h2>Section {section}</h2>"
+            f"<script>window.analytics && analytics.track('section', {{id: {section}, "
+            f"payload: '{'x' * rng.randint(200, 800)}'}});</script>"
+            f"<style>#s{section} .card {{ margin: {rng.randint(0, 20)}px; }}</style>"
+            f"<p>{sentence(40)} <a href='/doc/{section}'>{sentence(3)}</a> {sentence(25)}</p>"
+            f"<div class='card'><img src='/images/{section}.png' alt='{sentence(3)}'><span>{sentence(8)}</span></div>"
+            f"<ul>{''.join(f'<li>{sentence(6)}</li>' for _ in range(4))}</ul>"
+            f"<table><tr><th>Name</th><th>Value</th><th>Link</th></tr>{rows}</table>"
+            f"<p>{sentence(60)}</p></section>"
+        )
+        parts.append(chunk)
+        size += len(chunk)
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def time_runs(func, repeat: int) -> Dict[str, Any]:
+    """Best and median wall time of repeated calls"""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    runs.sort()
+    return {'best': runs[0], 'median': runs[len(runs) // 2], 'runs': runs}
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,4,16", help="comma-separated page sizes in MB")
+    parser.add_argument("--parsers", default="html.parser,lxml", help="comma-separated BeautifulSoup parsers")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case")
+    parser.add_argument("--output", type=Path, default=Path("html_benchmark_results.json"), help="JSON results file")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(SERVICE_DIR))
+    import bs4
+    from app.utils.html_markdown import write_markdown
+    from app.utils.html_parsing import parse_html
+
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'beautifulsoup4': bs4.__version__,
+        },
+        'settings': {'repeat': args.repeat},
+        'cases': [],
+    }
+
+    print(f"{'size':>7} {'parser':<12}{'full s':>9}{'MB/s':>8}{'img-only s':>12}{'convert s':>11}")
+    for size_mb in (float(s) for s in args.sizes.split(",")):
+        html = generate_html(size_mb)
+        actual_mb = len(html.encode('utf-8')) / 2**20
+        for name in args.parsers.split(","):
+            full = time_runs(lambda: parse_html(html, parser=name), args.repeat)
+            images = time_runs(lambda: parse_html(html, only=("img", "base"), parser=name), args.repeat)
+            convert = time_runs(lambda: write_markdown(parse_html(html, parser=name), io.StringIO()), args.repeat)
+            case = {
+                'size_mb': round(actual_mb, 2),
+                'parser': name,
+                'full_parse_s': full,
+                'image_parse_s': images,
+                'parse_and_convert_s': convert,
+                'full_parse_mb_per_sec': actual_mb / full['median'],
+            }
+            results['cases'].append(case)
+            print(f"{actual_mb:>6.1f}M {name:<12}{full['median']:>9.3f}{case['full_parse_mb_per_sec']:>8.1f}"
+                  f"{images['median']:>12.3f}{convert['median']:>11.3f}", flush=True)
+
+    output_path = args.output.resolve()
+    output_path.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output_path}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
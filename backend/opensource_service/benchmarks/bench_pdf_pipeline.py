@@ -0,0 +1,222 @@
+"""End-to-end benchmark of PdfConverter.process_pdf on synthetic documents.
+
+Runs the full opensource pipeline (render, table detection, image extraction,
+markdown streaming, uploads) against a local S3 stand-in and writes the results
+as JSON. Run from backend/opensource_service:
+
+    python -m benchmarks.bench_pdf_pipeline --pages 10,100 --repeat 3 --output before.json
+    python -m benchmarks.bench_pdf_pipeline --pages 10,100 --repeat 3 --output after.json --baseline before.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+
+class RssSampler:
+    """Track this process's peak resident set size while a block runs"""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.peak = 0
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def current_rss() -> int:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            # Lifetime peak where /proc is unavailable; ru_maxrss is bytes on macOS, KiB elsewhere
+            scale = 1 if sys.platform == "darwin" else 1024
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+    def _run(self) -> None:
+        while not self.stopping.wait(self.interval):
+            self.peak = max(self.peak, self.current_rss())
+
+    def __enter__(self) -> "RssSampler":
+        self.peak = self.current_rss()
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stopping.set()
+        self.thread.join()
+        self.peak = max(self.peak, self.current_rss())
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def children_peak_rss() -> int:
+    """Peak RSS of the largest reaped child process (page workers), in bytes"""
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SERVICE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_case(converter, s3_client, pdf_path: Path, pages: int, repeat: int, warmup: int) -> Dict[str, Any]:
+    """Process one document repeatedly and summarise latency, throughput, memory and S3 traffic"""
+    for _ in range(warmup):
+        converter.process_pdf(pdf_path)
+
+    before = s3_client.snapshot()
+    latencies = []
+    result = {}
+    with RssSampler() as rss:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = converter.process_pdf(pdf_path)
+            latencies.append(time.perf_counter() - start)
+            if result['status'] != 'success':
+                raise RuntimeError(f"Processing {pdf_path.name} failed: {result.get('message')}")
+    after = s3_client.snapshot()
+
+    requests = {
+        operation: (count - before['requests'].get(operation, 0)) / repeat
+        for operation, count in after['requests'].items()
+    }
+    return {
+        'latency_s': {
+            'p50': percentile(latencies, 0.50),
+            'p95': percentile(latencies, 0.95),
+            'mean': sum(latencies) / len(latencies),
+            'runs': latencies,
+        },
+        'pages_per_sec': pages * len(latencies) / sum(latencies),
+        'peak_rss_mb': rss.peak / 2**20,
+        'children_peak_rss_mb': children_peak_rss() / 2**20,
+        's3_requests_per_doc': requests,
+        's3_puts_per_doc': requests.get('PutObject', 0) + requests.get('UploadPart', 0),
+        's3_bytes_per_doc': (after['bytes_written'] - before['bytes_written']) / repeat,
+        'input_bytes': pdf_path.stat().st_size,
+        'table_count': result.get('table_count'),
+        'image_count': result.get('image_count'),
+        'skipped_table_pages': result.get('skipped_table_pages'),
+        'ocr_page_count': result.get('ocr_page_count'),
+        'job_peak_rss_mb': result.get('peak_rss_mb'),
+        'reduced_scale_pages': result.get('reduced_scale_pages'),
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print per-case changes against an earlier results file"""
+    previous = {(case['profile'], case['pages']): case for case in baseline['cases']}
+    print(f"\n{'case':<18}{'pages/s':>12}{'change':>9}{'p50 s':>10}{'change':>9}{'PUTs':>8}")
+    for case in results['cases']:
+        old = previous.get((case['profile'], case['pages']))
+        name = f"{case['profile']}/{case['pages']}p"
+        if not old:
+            print(f"{name:<18}{case['pages_per_sec']:>12.1f}{'new':>9}")
+            continue
+        throughput = (case['pages_per_sec'] / old['pages_per_sec'] - 1) * 100
+        latency = (case['latency_s']['p50'] / old['latency_s']['p50'] - 1) * 100
+        print(f"{name:<18}{case['pages_per_sec']:>12.1f}{throughput:>+8.1f}%"
+              f"{case['latency_s']['p50']:>10.3f}{latency:>+8.1f}%{case['s3_puts_per_doc']:>8.0f}")
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", default="text,images,tables,scanned",
+                        help="comma-separated document profiles (text, images, tables, scanned)")
+    parser.add_argument("--pages", default="10,100,1000", help="comma-separated page counts")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per document")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs per document")
+    parser.add_argument("--fidelity", default="full", choices=("text", "images", "full"),
+                        help="extraction fidelity level (default: full)")
+    parser.add_argument("--workers", type=int, default=None, help="page worker processes (default: PDF_WORKERS)")
+    parser.add_argument("--work-dir", type=Path, default=None, help="where PDFs and outputs are kept (default: temp dir)")
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"), help="JSON results file")
+    parser.add_argument("--baseline", type=Path, default=None, help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    output_path = args.output.resolve()
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    work_dir = (args.work_dir or Path(tempfile.mkdtemp(prefix="pdf-bench-"))).resolve()
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    # Every run must do the full work, and the pipeline writes logs/ and output/ relative to the cwd
+    os.environ["PDF_RESULT_CACHE_BACKEND"] = "none"
+    os.environ["STORAGE_BACKEND"] = "local"
+    os.environ["LOCAL_STORAGE_ROOT"] = str(work_dir / "s3")
+    os.chdir(work_dir)
+    sys.path.insert(0, str(SERVICE_DIR))
+
+    import fitz
+    from app.utils.pdf_utils import PdfConverter
+    from app.utils.storage import get_storage
+    from benchmarks.local_s3 import LocalS3Client
+    from benchmarks.synthetic_pdfs import generate_pdf
+
+    # Count the requests the uploader makes against local storage as S3 calls
+    storage = get_storage()
+    s3_client = LocalS3Client(storage.root, storage.public_url)
+    storage._client = s3_client
+    storage._client_pid = os.getpid()
+
+    converter = PdfConverter(max_workers=args.workers, fidelity=args.fidelity)
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'pymupdf': fitz.VersionBind,
+        },
+        'settings': {
+            'repeat': args.repeat,
+            'warmup': args.warmup,
+            'fidelity': converter.fidelity,
+            'max_workers': converter.max_workers,
+            'parallel_min_pages': converter.parallel_min_pages,
+            **converter.page_settings(),
+        },
+        'cases': [],
+    }
+
+    for profile in args.profiles.split(","):
+        for pages in (int(p) for p in args.pages.split(",")):
+            pdf_path = generate_pdf(profile, pages, work_dir / "pdfs")
+            case = {'profile': profile, 'pages': pages,
+                    **run_case(converter, s3_client, pdf_path, pages, args.repeat, args.warmup)}
+            results['cases'].append(case)
+            print(f"{profile:>8} {pages:>5}p  {case['pages_per_sec']:8.1f} pages/s  "
+                  f"p50 {case['latency_s']['p50']:7.3f}s  p95 {case['latency_s']['p95']:7.3f}s  "
+                  f"rss {case['peak_rss_mb']:6.0f} MB  PUTs {case['s3_puts_per_doc']:.0f}", flush=True)
+
+    output_path.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output_path}")
+    if baseline:
+        compare(results, baseline)
+    return results
+
+
+if __name__ == "__main__":
+    main()
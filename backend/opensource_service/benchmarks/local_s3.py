@@ -0,0 +1,53 @@
+"""In-process S3 stand-in that writes objects to a local directory and counts requests.
+
+Wraps the local storage backend's client, so the pipeline under benchmark runs
+unmodified against local disk while every S3-equivalent request is tallied.
+"""
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict
+
+from app.utils.storage import LocalStorageClient
+
+
+class LocalS3Client(LocalStorageClient):
+    def __init__(self, root: Path, url_builder):
+        super().__init__(root, url_builder)
+        self.lock = threading.Lock()
+        self.requests = Counter()
+        self.bytes_written = 0
+
+    def _count(self, operation: str, size: int = 0) -> None:
+        with self.lock:
+            self.requests[operation] += 1
+            self.bytes_written += size
+
+    def upload_file(self, filename: str, bucket: str, key: str, *args, **kwargs) -> None:
+        super().upload_file(filename, bucket, key, *args, **kwargs)
+        self._count('PutObject', Path(filename).stat().st_size)
+
+    def upload_fileobj(self, fileobj, bucket: str, key: str, *args, **kwargs) -> None:
+        super().upload_fileobj(fileobj, bucket, key, *args, **kwargs)
+        self._count('PutObject', (self.root / bucket / key).stat().st_size)
+
+    def create_multipart_upload(self, Bucket: str, Key: str, **kwargs) -> Dict[str, str]:
+        self._count('CreateMultipartUpload')
+        return super().create_multipart_upload(Bucket, Key, **kwargs)
+
+    def upload_part(self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body: bytes) -> Dict[str, str]:
+        self._count('UploadPart', len(Body))
+        return super().upload_part(Bucket, Key, UploadId, PartNumber, Body)
+
+    def complete_multipart_upload(self, *args, **kwargs) -> None:
+        self._count('CompleteMultipartUpload')
+        super().complete_multipart_upload(*args, **kwargs)
+
+    def abort_multipart_upload(self, *args, **kwargs) -> None:
+        self._count('AbortMultipartUpload')
+        super().abort_multipart_upload(*args, **kwargs)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Request counts and bytes written so far"""
+        with self.lock:
+            return {'requests': dict(self.requests), 'bytes_written': self.bytes_written}
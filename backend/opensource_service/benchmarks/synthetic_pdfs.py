@@ -0,0 +1,121 @@
+"""Deterministic synthetic PDFs for benchmarking the opensource PDF pipeline.
+
+Every profile is generated from a fixed seed, so a given (profile, pages) pair
+always produces the same document and results stay comparable across runs.
+"""
+import io
+import random
+from pathlib import Path
+from typing import Callable, Dict
+
+import fitz
+from PIL import Image
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+MARGIN = 72
+
+WORDS = (
+    "data pipeline extraction document table figure markdown storage service request "
+    "latency throughput page render image upload bucket cache worker process result "
+    "analysis report quarterly revenue growth segment region summary appendix method"
+).split()
+
+
+def _sentence(rng: random.Random, words: int = 14) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _image_bytes(rng: random.Random, width: int, height: int) -> bytes:
+    """A PNG of coloured blocks; distinct seeds give distinct (non-deduplicable) images"""
+    image = Image.new("RGB", (width, height), tuple(rng.randrange(256) for _ in range(3)))
+    for _ in range(12):
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        block = Image.new("RGB", (rng.randrange(8, 64), rng.randrange(8, 64)), tuple(rng.randrange(256) for _ in range(3)))
+        image.paste(block, (x0, y0))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _write_text(page: fitz.Page, rng: random.Random, top: float = MARGIN, bottom: float = PAGE_HEIGHT - MARGIN) -> None:
+    """Fill a region with a heading and body paragraphs"""
+    page.insert_text((MARGIN, top + 10), _sentence(rng, 5), fontsize=18)
+    y = top + 40
+    while y < bottom:
+        page.insert_text((MARGIN, y), _sentence(rng, 11), fontsize=10)
+        y += 14
+
+
+def _text_page(doc: fitz.Document, rng: random.Random, page_num: int) -> None:
+    _write_text(doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT), rng)
+
+
+def _image_page(doc: fitz.Document, rng: random.Random, page_num: int, logo: bytes = None) -> None:
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    _write_text(page, rng, bottom=250)
+    # A logo repeated on every page plus two page-specific photos
+    page.insert_image(fitz.Rect(480, 30, 560, 70), stream=logo)
+    page.insert_image(fitz.Rect(MARGIN, 280, 300, 480), stream=_image_bytes(rng, 480, 420))
+    page.insert_image(fitz.Rect(320, 280, 540, 480), stream=_image_bytes(rng, 480, 420))
+    _write_text(page, rng, top=500)
+
+
+def _table_page(doc: fitz.Document, rng: random.Random, page_num: int) -> None:
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    _write_text(page, rng, bottom=150)
+    # Two ruled tables per page
+    for top in (180, 470):
+        rows, cols = rng.randrange(5, 9), rng.randrange(3, 6)
+        row_height, col_width = 28, (PAGE_WIDTH - 2 * MARGIN) / cols
+        for r in range(rows + 1):
+            page.draw_line((MARGIN, top + r * row_height), (PAGE_WIDTH - MARGIN, top + r * row_height))
+        for c in range(cols + 1):
+            page.draw_line((MARGIN + c * col_width, top), (MARGIN + c * col_width, top + rows * row_height))
+        for r in range(rows):
+            for c in range(cols):
+                page.insert_text((MARGIN + c * col_width + 4, top + r * row_height + 18), rng.choice(WORDS), fontsize=9)
+
+
+def _scanned_page(doc: fitz.Document, rng: random.Random, page_num: int) -> None:
+    """A page with no text layer: a full-page raster of a text page, as a scanner would produce"""
+    source = fitz.open()
+    _write_text(source.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT), rng)
+    pixmap = source[0].get_pixmap(dpi=150, colorspace=fitz.csGRAY)
+    source.close()
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    page.insert_image(page.rect, pixmap=pixmap)
+
+
+PROFILES: Dict[str, Callable] = {
+    'text': _text_page,
+    'images': _image_page,
+    'tables': _table_page,
+    'scanned': _scanned_page,
+}
+
+
+def generate_pdf(profile: str, pages: int, output_dir: Path, seed: int = 7245) -> Path:
+    """Return the path of the synthetic PDF for a profile and page count, creating it if needed"""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile {profile!r}; expected one of {sorted(PROFILES)}")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    pdf_path = output_dir / f"{profile}_{pages}p_seed{seed}.pdf"
+    if pdf_path.exists():
+        return pdf_path
+
+    rng = random.Random(f"{seed}:{profile}:{pages}")
+    make_page = PROFILES[profile]
+    doc = fitz.open()
+    logo = _image_bytes(random.Random(seed), 160, 80)
+    for page_num in range(pages):
+        if profile == 'images':
+            make_page(doc, rng, page_num, logo)
+        else:
+            make_page(doc, rng, page_num)
+
+    partial_path = pdf_path.with_suffix(".partial")
+    doc.save(partial_path, garbage=3, deflate=True)
+    doc.close()
+    partial_path.replace(pdf_path)
+    return pdf_path
@@ -1,10 +1,20 @@
 # app/main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
 import logging
+import time
 
 from app.routes import web_routes
 from app.routes import web_handler_routes as web_handler
 from app.routes import pdf_routes
+from app.routes import job_routes
+from app.routes import batch_routes
+from app.routes import storage_routes
+from app.utils.admission import AdmissionRejected
+from app.utils.batch import get_document_pool
+from app.utils.metrics import CONTENT_TYPE, HTTP_REQUEST_SECONDS, REGISTRY
+from app.utils.pdf_utils import get_page_pool
+from app.utils.storage import STORAGE_BACKEND
 
 
 # Configure logging
@@ -23,6 +33,57 @@ app = FastAPI(
 app.include_router(web_handler.router)
 app.include_router(web_routes.router)
 app.include_router(pdf_routes.router)
+app.include_router(job_routes.router)
+app.include_router(batch_routes.router)
+
+# Artifacts on local disk are downloaded from this service instead of S3
+if STORAGE_BACKEND == "local":
+    app.include_router(storage_routes.router)
+
+# Record request latency by route template, keeping label cardinality bounded
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status
+        )
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+# Shed load with 429 instead of queueing work without bound
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+# Run queued jobs for the lifetime of the application
+@app.on_event("startup")
+async def start_job_workers():
+    job_routes.job_runner.start()
+    batch_routes.batch_runner.start()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    job_routes.job_runner.stop()
+    batch_routes.batch_runner.stop()
+    get_document_pool().shutdown()
+    get_page_pool().shutdown()
 
 # Root endpoint
 @app.get("/")
@@ -34,6 +95,15 @@ async def root():
         "/web-scraping/opensource/": "Scrape content from website using opensource method",
         "/web-process/opensource": "Process content from website using opensource method",
         "/pdf-process/opensource/": "Process PDF content using opensource method",
+        "/jobs/pdf-process/opensource": "Queue PDF processing and return a job id",
+        "/jobs/web-process/opensource": "Queue website processing and return a job id",
+        "/jobs/{job_id}": "Get the status and progress of a queued job",
+        "/jobs/{job_id}/result": "Get the result of a finished job",
+        "/batch/pdf-process/opensource": "Queue many uploaded PDFs as one batch",
+        "/batch/pdf-process/opensource/keys": "Queue PDFs already in artifact storage as one batch",
+        "/batch/{batch_id}": "Get the progress, throughput and per-document status of a batch",
+        "/batch/{batch_id}/results": "Get the results of a batch's finished documents",
+        "/metrics": "Prometheus metrics",
           
     }
     }
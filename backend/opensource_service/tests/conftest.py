@@ -0,0 +1,57 @@
+"""Shared fixtures. Run from backend/opensource_service with: python -m pytest -q
+
+The services read their settings from the environment at import time, so the test
+settings (local storage, no shared caches, no OCR) are set here before any app module
+is imported.
+"""
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+TEST_ROOT = Path(tempfile.mkdtemp(prefix="opensource-tests-"))
+
+os.environ.update({
+    'STORAGE_BACKEND': 'local',
+    'LOCAL_STORAGE_ROOT': str(TEST_ROOT / "storage"),
+    'PDF_RESULT_CACHE_BACKEND': 'none',
+    'PDF_CHECKPOINT_ENABLED': '0',
+    'PDF_OCR_ENABLED': '0',
+    'WEB_HTTP_CACHE_DIR': 'none',
+    'JOB_STORE_PATH': str(TEST_ROOT / "jobs.sqlite3"),
+    'JOB_UPLOAD_DIR': str(TEST_ROOT / "uploads"),
+    'BATCH_WORKERS': '2',
+})
+sys.path.insert(0, str(SERVICE_DIR))
+
+from benchmarks.synthetic_pdfs import generate_pdf  # noqa: E402
+from app.utils.storage import get_storage  # noqa: E402
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TEST_ROOT, ignore_errors=True)
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """Build a synthetic PDF: make_pdf(profile, pages, seed=...)"""
+    def make(profile: str, pages: int, seed: int = 7245) -> Path:
+        return generate_pdf(profile, pages, tmp_path / "generated", seed)
+    return make
+
+
+@pytest.fixture
+def read_artifact(tmp_path):
+    """Download an artifact URL returned by a pipeline and return its bytes"""
+    def read(url: str) -> bytes:
+        storage = get_storage()
+        bucket_name, key = storage.parse_url(url)
+        path = tmp_path / "downloads" / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        storage.download(key, path, bucket_name)
+        return path.read_bytes()
+    return read
@@ -0,0 +1,49 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.utils.admission import ADMISSION_MAX_RETRY_AFTER, AdmissionController, AdmissionRejected, get_admission_controller
+from main import app
+
+
+def test_admits_within_budget_and_rejects_past_it():
+    controller = AdmissionController(max_cost=10)
+    with controller.admit(6):
+        with pytest.raises(AdmissionRejected) as rejected:
+            with controller.admit(6):
+                pass
+        assert 1 <= rejected.value.retry_after <= ADMISSION_MAX_RETRY_AFTER
+        with controller.admit(4):
+            assert controller.in_flight == 10
+    assert controller.in_flight == 0
+
+
+def test_oversized_request_is_admitted_when_idle():
+    controller = AdmissionController(max_cost=10)
+    with controller.admit(50):
+        assert not controller.try_acquire(1)
+
+
+@pytest.fixture
+def saturated():
+    """Fill the service's admission budget for the duration of a test"""
+    controller = get_admission_controller()
+    assert controller.try_acquire(controller.max_cost)
+    yield controller
+    controller.release(controller.max_cost, 0.0)
+
+
+def test_pdf_request_over_capacity_gets_429(saturated, make_pdf):
+    with TestClient(app) as client:
+        with open(make_pdf("text", 2), 'rb') as f:
+            response = client.post("/pdf-process/opensource", files={'file': ("report.pdf", f, "application/pdf")})
+    assert response.status_code == 429
+    assert 1 <= int(response.headers['Retry-After']) <= ADMISSION_MAX_RETRY_AFTER
+
+
+def test_pdf_request_is_admitted_once_capacity_frees(make_pdf):
+    with TestClient(app) as client:
+        with open(make_pdf("text", 2), 'rb') as f:
+            response = client.post("/pdf-process/opensource", files={'file': ("report.pdf", f, "application/pdf")})
+    assert response.status_code == 200
+    assert response.json()['status'] == "success"
+    assert get_admission_controller().in_flight == 0
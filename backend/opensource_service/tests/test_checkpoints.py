@@ -0,0 +1,87 @@
+import fitz
+import pytest
+
+from app.utils.checkpoints import CheckpointStore
+from app.utils.pdf_utils import PdfConverter
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+
+
+def page(page_num):
+    return {'page_num': page_num, 'lines': [f"page {page_num}\n"]}
+
+
+def test_live_claim_blocks_a_second_run(store):
+    first = store.claim("doc", {'base_s3_path': "a"})
+    assert first == {'owner': first['owner'], 'state': {'base_s3_path': "a"}, 'pages': []}
+    assert store.claim("doc", {'base_s3_path': "b"}) is None
+
+
+def test_released_claim_resumes_with_recorded_pages(store):
+    first = store.claim("doc", {'base_s3_path': "a"})
+    for page_num in (0, 1):
+        store.record_page("doc", first['owner'], page(page_num))
+    store.release("doc", first['owner'])
+
+    second = store.claim("doc", {'base_s3_path': "b"})
+    assert second['owner'] != first['owner']
+    assert second['state'] == {'base_s3_path': "a"}
+    assert [p['page_num'] for p in second['pages']] == [0, 1]
+
+
+def test_resume_stops_at_the_first_gap(store):
+    first = store.claim("doc", {})
+    for page_num in (0, 1, 3):
+        store.record_page("doc", first['owner'], page(page_num))
+    store.release("doc", first['owner'])
+    assert [p['page_num'] for p in store.claim("doc", {})['pages']] == [0, 1]
+
+
+def test_stale_owner_cannot_record_or_complete(store):
+    first = store.claim("doc", {})
+    store.release("doc", first['owner'])
+    second = store.claim("doc", {})
+    store.record_page("doc", first['owner'], page(0))
+    store.complete("doc", first['owner'])
+    store.release("doc", second['owner'])
+    assert store.claim("doc", {})['pages'] == []
+
+
+def test_completed_document_starts_over(store):
+    first = store.claim("doc", {'base_s3_path': "a"})
+    store.record_page("doc", first['owner'], page(0))
+    store.complete("doc", first['owner'])
+    second = store.claim("doc", {'base_s3_path': "b"})
+    assert second['state'] == {'base_s3_path': "b"}
+    assert second['pages'] == []
+
+
+def test_interrupted_conversion_resumes_where_it_stopped(store, make_pdf, tmp_path, monkeypatch, read_artifact):
+    pdf_path = make_pdf("text", 5)
+    iter_page_results = PdfConverter.iter_page_results
+
+    def fail_after_two_pages(self, *args, **kwargs):
+        for count, page_result in enumerate(iter_page_results(self, *args, **kwargs)):
+            if count == 2:
+                raise RuntimeError("worker lost")
+            yield page_result
+
+    monkeypatch.setattr(PdfConverter, "iter_page_results", fail_after_two_pages)
+    failed = PdfConverter(max_workers=1, checkpoint_store=store).process_pdf(pdf_path, output_dir=tmp_path / "a")
+    assert failed['status'] == 'error'
+
+    monkeypatch.setattr(PdfConverter, "iter_page_results", iter_page_results)
+    resumed = PdfConverter(max_workers=1, checkpoint_store=store).process_pdf(pdf_path, output_dir=tmp_path / "b")
+    assert resumed['status'] == 'success'
+    assert resumed['resumed_pages'] == 2
+    assert resumed['page_count'] == 5
+
+    fresh = PdfConverter(max_workers=1).process_pdf(pdf_path, output_dir=tmp_path / "c")
+    assert read_artifact(resumed['markdown_s3_url']) == read_artifact(fresh['markdown_s3_url'])
+    with fitz.open(pdf_path) as document:
+        headings = [document[page_num].get_text().splitlines()[0] for page_num in range(5)]
+    markdown = read_artifact(resumed['markdown_s3_url']).decode('utf-8')
+    assert all(heading in markdown for heading in headings)
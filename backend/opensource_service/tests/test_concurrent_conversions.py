@@ -0,0 +1,143 @@
+"""Conversions running at the same time must never see each other's files.
+
+Every document here is called report.pdf (and every web image logo.png), as happens
+when users upload files with common names, but each has different content.
+"""
+import functools
+import http.server
+import io
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import fitz
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.routes.job_routes import JOB_UPLOAD_DIR, run_pdf_job
+from app.utils.batch import DocumentPool
+from app.utils.metrics import DOCUMENTS_TOTAL
+from app.utils.web_handler import process_html_with_docling
+from main import app
+
+SEEDS = (1, 2, 3, 4)
+
+
+def pixels(data: bytes) -> bytes:
+    with Image.open(io.BytesIO(data)) as image:
+        return image.convert("RGB").tobytes()
+
+
+def expected_content(pdf_path: Path):
+    """The first line of every page and the pixels of every embedded image"""
+    with fitz.open(pdf_path) as document:
+        headings = [page.get_text().splitlines()[0] for page in document]
+        images = {pixels(document.extract_image(xref)['image']) for xref, *_ in (
+            image for page in document for image in page.get_images()
+        )}
+    return headings, images
+
+
+def assert_own_content(result, pdf_path, read_artifact):
+    assert result['status'] == 'success', result.get('message')
+    headings, images = expected_content(pdf_path)
+    markdown = read_artifact(result['markdown_s3_url']).decode('utf-8')
+    assert all(heading in markdown for heading in headings)
+    uploaded = [image for image in result['images'] if image['type'] == 'image']
+    assert uploaded
+    assert all(pixels(read_artifact(image['s3_url'])) in images for image in uploaded)
+
+
+def upload_as_report(pdf_path: Path) -> Path:
+    """Copy a PDF into its own upload directory under the shared file name"""
+    upload_dir = JOB_UPLOAD_DIR / f"test-{pdf_path.stem}"
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    return Path(shutil.copy(pdf_path, upload_dir / "report.pdf"))
+
+
+def test_concurrent_jobs_with_the_same_file_name(make_pdf, read_artifact):
+    sources = [make_pdf("images", 3, seed) for seed in SEEDS]
+    uploads = [upload_as_report(pdf_path) for pdf_path in sources]
+
+    with ThreadPoolExecutor(len(uploads)) as executor:
+        results = list(executor.map(lambda path: run_pdf_job({'pdf_path': str(path)}, lambda done: None), uploads))
+
+    for result, pdf_path in zip(results, sources):
+        assert_own_content(result, pdf_path, read_artifact)
+    assert not any(path.parent.exists() for path in uploads)
+
+
+def test_concurrent_requests_with_the_same_file_name(make_pdf, read_artifact):
+    sources = [make_pdf("images", 3, seed) for seed in SEEDS]
+
+    def convert(client, pdf_path):
+        with open(pdf_path, 'rb') as f:
+            response = client.post("/pdf-process/opensource", files={'file': ("report.pdf", f, "application/pdf")})
+        assert response.status_code == 200
+        return response.json()
+
+    with TestClient(app) as client, ThreadPoolExecutor(len(sources)) as executor:
+        responses = list(executor.map(functools.partial(convert, client), sources))
+
+    for response, pdf_path in zip(responses, sources):
+        headings, images = expected_content(pdf_path)
+        markdown = read_artifact(response['markdown_url']).decode('utf-8')
+        assert all(heading in markdown for heading in headings)
+        uploaded = [image for image in response['images'] if image['type'] == 'image']
+        assert all(pixels(read_artifact(image['s3_url'])) in images for image in uploaded)
+
+
+def test_concurrent_batch_documents_with_the_same_file_name(make_pdf, read_artifact):
+    sources = [make_pdf("images", 3, seed) for seed in SEEDS]
+    uploads = [upload_as_report(pdf_path) for pdf_path in sources]
+    options = {'fidelity': "full", 'first_page': 1, 'last_page': None}
+    succeeded = DOCUMENTS_TOTAL.values.get(("pdf", "success"), 0)
+
+    pool = DocumentPool(workers=2)
+    try:
+        with ThreadPoolExecutor(len(uploads)) as executor:
+            results = list(executor.map(lambda path: pool.convert({'pdf_path': str(path)}, options), uploads))
+    finally:
+        pool.shutdown()
+
+    for result, pdf_path in zip(results, sources):
+        assert_own_content(result, pdf_path, read_artifact)
+    # Metrics recorded in the worker processes reach the service's registry
+    assert DOCUMENTS_TOTAL.values.get(("pdf", "success"), 0) == succeeded + len(sources)
+
+
+@pytest.fixture
+def image_server(tmp_path):
+    """Serve a differently coloured logo.png under /<n>/ for each page"""
+    root = tmp_path / "site"
+    for index in range(len(SEEDS) * 2):
+        (root / str(index)).mkdir(parents=True)
+        Image.new("RGB", (8, 8), (index * 20, 100, 200)).save(root / str(index) / "logo.png")
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(root))
+    handler.log_message = lambda *args: None
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_concurrent_web_pages(image_server, tmp_path, read_artifact):
+    pages = []
+    for index in range(len(SEEDS) * 2):
+        html_path = tmp_path / f"page{index}.html"
+        html_path.write_text(
+            f"<html><body><h1>Page {index}</h1><p>marker-{index}-end</p>"
+            f"<img src='{image_server}/{index}/logo.png'></body></html>"
+        )
+        pages.append(html_path)
+
+    with ThreadPoolExecutor(len(pages)) as executor:
+        markdown_urls = list(executor.map(lambda path: process_html_with_docling(str(path)), pages))
+
+    for index, markdown_url in enumerate(markdown_urls):
+        markdown = read_artifact(markdown_url).decode('utf-8')
+        assert f"marker-{index}-end" in markdown
+        image_url = markdown.split("](", 1)[1].split(")", 1)[0]
+        assert pixels(read_artifact(image_url)) == Image.new("RGB", (8, 8), (index * 20, 100, 200)).tobytes()
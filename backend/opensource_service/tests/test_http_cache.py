@@ -0,0 +1,12 @@
+from app.utils.http_cache import canonical_url
+
+
+def test_canonical_url_normalizes_equivalent_urls():
+    assert canonical_url("HTTPS://Example.COM:443/a.png#top") == "https://example.com/a.png"
+    assert canonical_url("http://example.com") == "http://example.com/"
+    assert canonical_url("http://example.com:8080/a.png") == "http://example.com:8080/a.png"
+
+
+def test_canonical_url_keeps_distinguishing_parts():
+    assert canonical_url("https://example.com/a.png?v=2") != canonical_url("https://example.com/a.png?v=1")
+    assert canonical_url("https://example.com/A.png") != canonical_url("https://example.com/a.png")
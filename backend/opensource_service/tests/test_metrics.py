@@ -0,0 +1,24 @@
+from app.utils.metrics import BYTES_IN, DOCUMENT_SECONDS, PAGES_TOTAL, observe_document
+
+
+def count(histogram, *key):
+    state = histogram.values.get(key)
+    return state[2] if state else 0
+
+
+def test_failed_documents_record_time_and_bytes_but_not_pages():
+    bytes_before = BYTES_IN.values.get(("test",), 0)
+    pages_before = PAGES_TOTAL.values.get(("test",), 0)
+    errors_before = count(DOCUMENT_SECONDS, "test", "error")
+
+    observe_document("test", "error", 2.0, pages=5, bytes_in=1000)
+
+    assert count(DOCUMENT_SECONDS, "test", "error") == errors_before + 1
+    assert BYTES_IN.values.get(("test",), 0) == bytes_before + 1000
+    assert PAGES_TOTAL.values.get(("test",), 0) == pages_before
+
+
+def test_document_time_is_labelled_by_outcome():
+    before = count(DOCUMENT_SECONDS, "test", "success")
+    observe_document("test", "success", 1.0, pages=5, bytes_in=1000)
+    assert count(DOCUMENT_SECONDS, "test", "success") == before + 1
@@ -0,0 +1,35 @@
+import re
+
+import pytest
+
+from app.utils.pdf_utils import PdfConverter, get_page_pool
+
+
+def markdown(result, read_artifact):
+    """The Markdown of a conversion without its per-run storage prefix"""
+    return re.sub(r"PDF_Extract_\w+/", "", read_artifact(result['markdown_s3_url']).decode('utf-8'))
+
+
+@pytest.mark.parametrize("profile", ["text", "tables"])
+def test_page_workers_match_serial_conversion(profile, make_pdf, tmp_path, read_artifact):
+    pdf_path = make_pdf(profile, 6)
+    serial = PdfConverter(max_workers=1).process_pdf(pdf_path, output_dir=tmp_path / "serial")
+
+    converter = PdfConverter(max_workers=2)
+    converter.parallel_min_pages = 1
+    parallel = converter.process_pdf(pdf_path, output_dir=tmp_path / "parallel")
+
+    assert parallel['status'] == 'success', parallel.get('message')
+    assert markdown(parallel, read_artifact) == markdown(serial, read_artifact)
+    assert len(parallel['images']) == len(serial['images'])
+    # The page workers' resident memory is counted, not just the service process's growth
+    assert parallel['peak_rss_mb'] >= 20
+
+
+def test_documents_share_one_page_pool(make_pdf, tmp_path):
+    converter = PdfConverter(max_workers=2)
+    converter.parallel_min_pages = 1
+    converter.process_pdf(make_pdf("text", 4, seed=1), output_dir=tmp_path / "a")
+    executor = get_page_pool().executor
+    converter.process_pdf(make_pdf("text", 4, seed=2), output_dir=tmp_path / "b")
+    assert executor is not None and get_page_pool().executor is executor
@@ -0,0 +1,52 @@
+from app.utils.pdf_utils import PdfConverter
+from app.utils.result_cache import MemoryCacheStore, ResultCache
+
+
+def test_key_ignores_option_order():
+    assert ResultCache.make_key("abc", {'a': 1, 'b': 2}) == ResultCache.make_key("abc", {'b': 2, 'a': 1})
+
+
+def test_key_depends_on_content_and_options():
+    key = ResultCache.make_key("abc", {'fidelity': "full"})
+    assert ResultCache.make_key("abd", {'fidelity': "full"}) != key
+    assert ResultCache.make_key("abc", {'fidelity': "text"}) != key
+    assert key.startswith("abc:")
+
+
+def test_converter_options_split_cache_entries():
+    full = PdfConverter().cache_options()
+    assert PdfConverter(fidelity="text").cache_options() != full
+    assert PdfConverter(first_page=2).cache_options() != full
+    assert PdfConverter(max_workers=1).cache_options() == full
+
+
+def test_repeated_conversion_is_served_from_cache(make_pdf, tmp_path):
+    cache = ResultCache(MemoryCacheStore())
+    pdf_path = make_pdf("text", 3)
+
+    first = PdfConverter(max_workers=1, result_cache=cache).process_pdf(pdf_path, output_dir=tmp_path / "a")
+    second = PdfConverter(max_workers=1, result_cache=cache).process_pdf(pdf_path, output_dir=tmp_path / "b")
+    other = PdfConverter(max_workers=1, result_cache=cache, fidelity="text").process_pdf(pdf_path, output_dir=tmp_path / "c")
+
+    assert first['status'] == 'success' and not first['cached']
+    assert second['cached'] and second['markdown_s3_url'] == first['markdown_s3_url']
+    # Local files belong to the conversion that wrote them, so only stored artifacts are cached
+    assert 'markdown_path' not in second
+    assert not other['cached'] and other['markdown_s3_url'] != first['markdown_s3_url']
+
+
+
+def test_eviction_runs_in_batches():
+    store = MemoryCacheStore()
+    evictions = []
+    evict = store.evict
+    store.evict = lambda *args: evictions.append(len(store.entries)) or evict(*args)
+    cache = ResultCache(store, max_entries=50)
+
+    for index in range(200):
+        cache.put(f"key-{index}", {'index': index})
+        assert len(store.entries) <= 55
+
+    # One eviction per 5 stores, each trimming the cache back to 50 entries
+    assert len(evictions) == 40 and evictions[-1] == 55
+    assert cache.get("key-199") == {'index': 199}
@@ -0,0 +1,29 @@
+import threading
+
+from app.utils.s3_uploader import MultipartStream, S3Uploader
+from app.utils.storage import get_storage
+
+
+def test_stream_parts_wait_for_upload_slots(monkeypatch):
+    uploader = S3Uploader(max_workers=4, queue_size=1)
+    release = threading.Event()
+    upload_part = MultipartStream._upload_part
+
+    def slow_part(self, part_number, body):
+        release.wait(5)
+        return upload_part(self, part_number, body)
+
+    monkeypatch.setattr(MultipartStream, "_upload_part", slow_part)
+    stream = MultipartStream(uploader, get_storage().bucket_name, "tests/stream.bin")
+    stream.write(b"a" * stream.part_size)
+
+    # The only slot is held by the first part, so the second part waits for it
+    second = threading.Thread(target=stream.write, args=(b"b" * stream.part_size,))
+    second.start()
+    second.join(0.5)
+    assert second.is_alive() and len(stream.parts) == 1
+
+    release.set()
+    second.join(5)
+    assert stream.close()
+    assert len(stream.parts) == 2
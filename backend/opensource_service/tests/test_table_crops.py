@@ -0,0 +1,19 @@
+import fitz
+import pytest
+from PIL import Image
+
+from app.utils.pdf_utils import PageRenderer, PdfConverter
+
+
+@pytest.mark.parametrize("tiered", [True, False])
+def test_table_crops_keep_their_colour(tiered, make_pdf, tmp_path):
+    settings = {**PdfConverter().page_settings(), 'tiered_rendering': tiered}
+    renderer = PageRenderer(settings)
+
+    with fitz.open(make_pdf("tables", 1)) as document:
+        result = renderer.process_page_artifacts(document, 0, tmp_path, "doc")
+
+    assert result['tables']
+    for table_path in result['tables']:
+        with Image.open(table_path) as image:
+            assert image.mode == "RGB"